@@ -0,0 +1,109 @@
+# 压缩方案基准：对样本 PDF 目录逐个跑全部 Ghostscript 方案，比较各方案压缩率、耗时和自适应模式的选择
+import argparse
+import concurrent.futures
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+import main
+
+
+def _collect_pdfs(corpus_dir, min_kb):
+    paths = []
+    for root, _, files in os.walk(corpus_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if name.lower().endswith(".pdf") and os.path.getsize(path) >= min_kb * 1024:
+                paths.append(path)
+    return sorted(paths)
+
+
+def _compress_one(input_path, profile):
+    name, settings, _, extra_args = profile
+    fd, output_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        returncode, message = main._run_ghostscript(input_path, output_path, settings, extra_args)
+        elapsed = time.perf_counter() - start
+        if returncode != 0:
+            return name, None, elapsed, message.splitlines()[-1] if message else ""
+        return name, os.path.getsize(output_path), elapsed, ""
+    finally:
+        os.remove(output_path)
+
+
+def bench_file(pool, input_path, profiles):
+    start = time.perf_counter()
+    results = list(pool.map(lambda p: _compress_one(input_path, p), profiles))
+    return results, time.perf_counter() - start
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Compare Ghostscript compression profiles over a corpus of PDFs")
+    parser.add_argument("corpus", help="directory of sample PDFs (searched recursively)")
+    parser.add_argument("--dpi-floor", type=int, default=main.DEFAULT_CONFIG["compression_dpi_floor"])
+    parser.add_argument("--min-kb", type=int, default=0, help="skip PDFs smaller than this")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--gs", help="path to the Ghostscript executable")
+    args = parser.parse_args()
+
+    if args.gs:
+        main.GS_CMD = args.gs
+    pdfs = _collect_pdfs(args.corpus, args.min_kb)
+    if not pdfs:
+        sys.exit(f"no PDFs found in {args.corpus}")
+
+    profiles = main._COMPRESSION_PROFILES
+    eligible = {p[0] for p in main._profiles_for_dpi_floor(args.dpi_floor)}
+    ratios = {p[0]: [] for p in profiles}
+    seconds = {p[0]: [] for p in profiles}
+    totals = {"original": 0, "screen": 0, "adaptive": 0}
+    wall = 0.0
+    print(f"{len(pdfs)} PDFs, {args.workers} workers, DPI floor {args.dpi_floor} "
+          f"(adaptive candidates: {', '.join(p[0] for p in profiles if p[0] in eligible)})")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for path in pdfs:
+            original = os.path.getsize(path)
+            results, elapsed = bench_file(pool, path, profiles)
+            wall += elapsed
+            sizes = {}
+            cells = []
+            for name, size, took, error in results:
+                seconds[name].append(took)
+                if size is None:
+                    cells.append(f"{name}=fail({error})")
+                    continue
+                sizes[name] = size
+                ratios[name].append(size / original)
+                cells.append(f"{name}={size / original:.2f}")
+            # 与应用内一致：输出不小于原文件时保留原文件
+            candidates = {n: s for n, s in sizes.items() if n in eligible}
+            chosen = min(candidates, key=candidates.get) if candidates else None
+            totals["original"] += original
+            totals["screen"] += min(sizes.get("screen", original), original)
+            totals["adaptive"] += min(candidates[chosen], original) if chosen else original
+            print(f"{os.path.relpath(path, args.corpus)} {original / (1024 * 1024):.1f}MB "
+                  f"{' '.join(cells)} -> {chosen or 'original'} ({elapsed:.1f}s)")
+
+    print()
+    print(f"{'profile':12s} {'dpi':>4s} {'median ratio':>13s} {'best ratio':>11s} {'median time':>12s}")
+    for name, _, dpi, _ in profiles:
+        if not ratios[name]:
+            print(f"{name:12s} {dpi:4d} {'-':>13s} {'-':>11s} {'-':>12s}")
+            continue
+        print(f"{name:12s} {dpi:4d} {statistics.median(ratios[name]):13.3f} {min(ratios[name]):11.3f} "
+              f"{statistics.median(seconds[name]) * 1000:10.0f}ms")
+    mb = 1024 * 1024
+    print(f"\ntotal original {totals['original'] / mb:.1f}MB, /screen only {totals['screen'] / mb:.1f}MB, "
+          f"adaptive {totals['adaptive'] / mb:.1f}MB; parallel wall time {wall:.1f}s "
+          f"vs sequential {sum(sum(v) for v in seconds.values()):.1f}s")
+
+
+if __name__ == "__main__":
+    main_cli()
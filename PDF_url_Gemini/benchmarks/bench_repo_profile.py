@@ -0,0 +1,116 @@
+# 仓库配置基准：默认 git 配置 vs _ensure_repo_profile（*.pdf -delta、bigFileThreshold、pack 设置）
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+import main
+
+
+def _git(repo_path, *args):
+    subprocess.run(["git", "-C", repo_path, *args], check=True, capture_output=True)
+
+
+def _fake_pdf(rng, size):
+    # 与真实 PDF 相近：大部分内容是 Flate 压缩后的流，几乎不可再压缩
+    raw = rng.randbytes(size)
+    stream = zlib.compress(raw, 1)
+    return (b"%PDF-1.4\n1 0 obj\n<< /Length " + str(len(stream)).encode() + b" /Filter /FlateDecode >>\n"
+            b"stream\n" + stream + b"\nendstream\nendobj\n%%EOF\n")
+
+
+def make_synthetic_repo(root, file_count, file_kb, revisions, seed):
+    rng = random.Random(seed)
+    _git(root, "init", "-q")
+    _git(root, "config", "user.email", "bench@example.com")
+    _git(root, "config", "user.name", "bench")
+    paths = []
+    for i in range(file_count):
+        folder = os.path.join(root, f"dir_{i // 50:03d}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"doc_{i:05d}.pdf")
+        with open(path, "wb") as f:
+            f.write(_fake_pdf(rng, rng.randint(file_kb // 2, file_kb * 2) * 1024))
+        paths.append(path)
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "init")
+
+    # 模拟“重新导出”的 PDF：整体内容变化，但体积相近，恰好是 delta 搜索最费力又最无效的情况
+    for rev in range(revisions):
+        for path in rng.sample(paths, max(1, file_count // 5)):
+            with open(path, "wb") as f:
+                f.write(_fake_pdf(rng, rng.randint(file_kb // 2, file_kb * 2) * 1024))
+        _git(root, "add", "-A")
+        _git(root, "commit", "-q", "-m", f"rev {rev}")
+
+
+def _pack_size(repo_path):
+    pack_dir = os.path.join(repo_path, ".git", "objects", "pack")
+    return sum(os.path.getsize(os.path.join(pack_dir, n)) for n in os.listdir(pack_dir) if n.endswith(".pack"))
+
+
+def bench_repack(repo_path, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        _git(repo_path, "repack", "-a", "-d", "-f", "-q")
+        samples.append(time.perf_counter() - start)
+    return min(samples), _pack_size(repo_path)
+
+
+def bench_push(repo_path, work_root, rounds):
+    samples = []
+    for i in range(rounds):
+        bare = os.path.join(work_root, f"remote_{os.path.basename(repo_path)}_{i}.git")
+        subprocess.run(["git", "init", "-q", "--bare", bare], check=True, capture_output=True)
+        start = time.perf_counter()
+        _git(repo_path, "push", "-q", bare, "HEAD:refs/heads/master")
+        samples.append(time.perf_counter() - start)
+        shutil.rmtree(bare, ignore_errors=True)
+    return min(samples)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Measure push/repack time with and without the binary repo profile")
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--kb", type=int, default=256, help="average PDF size in KB")
+    parser.add_argument("--revisions", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic repositories")
+    args = parser.parse_args()
+
+    work_root = tempfile.mkdtemp(prefix="gitcloud_profile_bench_")
+    try:
+        baseline = os.path.join(work_root, "baseline")
+        profiled = os.path.join(work_root, "profiled")
+        os.makedirs(baseline)
+        start = time.perf_counter()
+        make_synthetic_repo(baseline, args.files, args.kb, args.revisions, args.seed)
+        shutil.copytree(baseline, profiled)
+        main._ensure_repo_profile(profiled)
+        _git(profiled, "add", ".gitattributes")
+        _git(profiled, "commit", "-q", "-m", "profile")
+        _git(baseline, "commit", "-q", "--allow-empty", "-m", "profile")
+        print(f"synthetic repo: {args.files} PDFs x {args.revisions + 1} revisions "
+              f"in {time.perf_counter() - start:.1f}s ({work_root})")
+
+        for label, repo_path in (("default config", baseline), ("repo profile", profiled)):
+            repack_time, pack_bytes = bench_repack(repo_path, args.rounds)
+            push_time = bench_push(repo_path, work_root, args.rounds)
+            print(f"{label:16s} repack={repack_time * 1000:8.1f} ms push={push_time * 1000:8.1f} ms "
+                  f"pack={pack_bytes / (1024 * 1024):8.1f} MB")
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,91 @@
+# 状态检测基准：旧版 GitStatusWorker（三次 GitPython 调用） vs 单次 porcelain v2 GitStatusEngine
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from git import Repo
+
+import main
+
+
+def _git(repo_path, *args):
+    subprocess.run(["git", "-C", repo_path, *args], check=True, capture_output=True)
+
+
+def make_synthetic_repo(root, file_count, files_per_dir=100):
+    _git(root, "init", "-q")
+    _git(root, "config", "user.email", "bench@example.com")
+    _git(root, "config", "user.name", "bench")
+    for i in range(file_count):
+        folder = os.path.join(root, f"dir_{i // files_per_dir:04d}")
+        if i % files_per_dir == 0:
+            os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"file_{i:06d}.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4\n" + str(i).encode() + b"\n%%EOF\n")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "init")
+
+    for i in range(0, file_count, max(1, file_count // 20)):
+        path = os.path.join(root, f"dir_{i // files_per_dir:04d}", f"file_{i:06d}.pdf")
+        with open(path, "ab") as f:
+            f.write(b"modified\n")
+    for i in range(10):
+        with open(os.path.join(root, "dir_0000", f"untracked_{i}.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4\n")
+
+
+def legacy_status(repo_path):
+    repo = Repo(repo_path)
+    changed = set()
+    for diff in repo.index.diff(None):
+        changed.add(diff.a_path or diff.b_path)
+    for diff in repo.index.diff("HEAD"):
+        changed.add(diff.a_path or diff.b_path)
+    for path in repo.untracked_files:
+        changed.add(path)
+    return len(changed)
+
+
+def engine_status(repo_path):
+    return len(main.GitStatusEngine(repo_path).status())
+
+
+def timed(fn, repo_path, rounds):
+    samples = []
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn(repo_path)
+        samples.append(time.perf_counter() - start)
+    return result, min(samples), sum(samples) / len(samples)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Compare legacy GitStatusWorker with GitStatusEngine")
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic repository")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="gitcloud_status_bench_")
+    try:
+        start = time.perf_counter()
+        make_synthetic_repo(root, args.files)
+        print(f"synthetic repo: {args.files} files in {time.perf_counter() - start:.1f}s ({root})")
+
+        for label, fn in (("legacy GitStatusWorker", legacy_status), ("GitStatusEngine", engine_status)):
+            count, best, avg = timed(fn, root, args.rounds)
+            print(f"{label:24s} changes={count:6d} best={best * 1000:8.1f} ms avg={avg * 1000:8.1f} ms")
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_cli()
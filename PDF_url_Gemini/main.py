@@ -9,20 +9,39 @@ import tempfile
 import ctypes
 import time
 import json
+import queue
+import re
+import hashlib
+import mmap
+import statistics
+import zlib
+import signal
 import threading
+import sqlite3
+import concurrent.futures
+from collections import OrderedDict
 from ctypes import wintypes
 from git import Repo, GitCommandError
 import pyperclip
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
 
 # PyQt6 基础库 (注意：此处仅导入基础UI组件，绝对不要导入 WebEngine 或 ActiveX)
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QTreeView, 
                              QLineEdit, QMessageBox, QMenu, QInputDialog,
                              QSplitter, QFrame, QProgressBar, QDialog, QDialogButtonBox,
-                             QListWidget, QListWidgetItem, QAbstractItemView, QStyledItemDelegate,
-                             QSizePolicy, QFormLayout, QStackedWidget, QPlainTextEdit)
-from PyQt6.QtCore import Qt, QDir, QSize, QRectF, QThread, pyqtSignal, QByteArray, QBuffer, QFile, QIODevice, QFileInfo, QMimeData, QSortFilterProxyModel, QTimer, QUrl, QObject, QEvent
+                             QListView, QFileIconProvider, QAbstractItemView, QStyledItemDelegate,
+                             QSizePolicy, QFormLayout, QStackedWidget, QPlainTextEdit,
+                             QCheckBox, QSpinBox, QFileDialog, QScrollArea, QComboBox)
+from PyQt6.QtCore import Qt, QDir, QSize, QRectF, QThread, pyqtSignal, QByteArray, QBuffer, QFile, QIODevice, QFileInfo, QMimeData, QSortFilterProxyModel, QTimer, QUrl, QObject, QEvent, QAbstractListModel, QModelIndex, QFileSystemWatcher
 from PyQt6.QtGui import QAction, QIcon, QFileSystemModel, QKeySequence, QFont, QShortcut, QColor, QPainter, QPixmap, QPen
+try:
+    from PyQt6.QtPdf import QPdfDocument
+except ImportError:
+    QPdfDocument = None
 
 # --- 配置文件路径 ---
 def _get_user_data_dir():
@@ -48,9 +67,21 @@ def _get_legacy_config_file():
         return "app_config.json"
 
 CONFIG_FILE = os.path.join(_get_user_data_dir(), "app_config.json")
+SYNC_QUEUE_FILE = os.path.join(_get_user_data_dir(), "sync_queue.json")
+SYNC_TIMINGS_FILE = os.path.join(_get_user_data_dir(), "sync_timings.jsonl")
+MAINTENANCE_STATE_FILE = os.path.join(_get_user_data_dir(), "maintenance_state.json")
+MAINTENANCE_LOG_FILE = os.path.join(_get_user_data_dir(), "maintenance_log.jsonl")
+COMPRESSION_CACHE_DIR = os.path.join(_get_user_data_dir(), "compression_cache")
+COMPRESSION_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+COMPRESSION_STATS_FILE = os.path.join(_get_user_data_dir(), "compression_stats.jsonl")
 DEFAULT_CONFIG = {
     "repo_path": r"D:\Github\pdf-document",
-    "base_url": "https://zhangzhh95.github.io/pdf-document/"
+    "base_url": "https://zhangzhh95.github.io/pdf-document/",
+    "auto_sync": False,
+    "auto_sync_quiet_sec": 30,
+    "auto_sync_min_interval_sec": 300,
+    "compression_adaptive": True,
+    "compression_dpi_floor": 150,
 }
 
 # --- Ghostscript 路径配置 ---
@@ -436,7 +467,7 @@ def _get_windows_inet_proxy():
     except Exception:
         return None
 
-def _run_git_cli(repo_path, git_args, env_overrides=None, timeout_sec=90):
+def _git_popen(repo_path, git_args, env_overrides=None, **popen_kwargs):
     cmd = ["git", "-C", repo_path] + list(git_args)
     env = os.environ.copy()
     env.setdefault("GIT_TERMINAL_PROMPT", "0")
@@ -450,41 +481,533 @@ def _run_git_cli(repo_path, git_args, env_overrides=None, timeout_sec=90):
         startupinfo = subprocess.STARTUPINFO()
         startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
         creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
-
+    return subprocess.Popen(cmd, env=env, startupinfo=startupinfo, creationflags=creationflags, **popen_kwargs)
+
+def _run_git_cli(repo_path, git_args, env_overrides=None, timeout_sec=90, input_text=None):
+    proc = _git_popen(
+        repo_path, git_args, env_overrides,
+        stdin=subprocess.PIPE if input_text is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
     try:
-        r = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            errors="replace",
-            env=env,
-            startupinfo=startupinfo,
-            creationflags=creationflags,
-            timeout=timeout_sec,
-        )
+        out, err = proc.communicate(input_text, timeout=timeout_sec)
     except subprocess.TimeoutExpired:
-        raise GitCommandError(cmd, status="timeout", stderr=f"git timeout after {timeout_sec}s")
-
-    if r.returncode != 0:
-        raise GitCommandError(cmd, status=r.returncode, stderr=r.stderr, stdout=r.stdout)
-    return r.stdout, r.stderr
+        proc.kill()
+        proc.communicate()
+        raise GitCommandError(proc.args, status="timeout", stderr=f"git timeout after {timeout_sec}s")
+
+    if proc.returncode != 0:
+        raise GitCommandError(proc.args, status=proc.returncode, stderr=err, stdout=out)
+    return out, err
+
+_PUSH_PROGRESS_RE = re.compile(
+    r"^(?P<phase>[A-Za-z ]+):\s+(?P<pct>\d+)% \((?P<cur>\d+)/(?P<total>\d+)\)"
+    r"(?:, (?P<amount>[\d.]+) (?P<unit>bytes|[KMG]iB)(?: \| (?P<rate>[\d.]+) (?P<rate_unit>bytes|[KMG]iB)/s)?)?"
+)
+_BYTE_UNITS = {"bytes": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+
+class PushProgress:
+    # 各阶段在总进度中的区间：计数/压缩占前 10%，写入对象占其余部分
+    PHASE_SPANS = {
+        "Enumerating objects": (0, 2),
+        "Counting objects": (2, 5),
+        "Compressing objects": (5, 10),
+        "Writing objects": (10, 100),
+    }
+
+    def __init__(self, total_bytes=None):
+        self.total_bytes = total_bytes
+        self.percent = 0
+        self.phase = ""
+        self.sent_bytes = 0
+        self.rate = 0.0
+        self.eta_sec = None
+
+    def feed(self, line):
+        m = _PUSH_PROGRESS_RE.match(line.strip())
+        if not m or m.group("phase") not in self.PHASE_SPANS:
+            return False
+        lo, hi = self.PHASE_SPANS[m.group("phase")]
+        pct = int(m.group("pct"))
+        self.phase = m.group("phase")
+        if m.group("amount"):
+            self.sent_bytes = float(m.group("amount")) * _BYTE_UNITS[m.group("unit")]
+        if m.group("rate"):
+            self.rate = float(m.group("rate")) * _BYTE_UNITS[m.group("rate_unit")]
+        self.eta_sec = None
+        # 对象数百分比和字节数无关（几个大 PDF 就占了绝大部分流量），有预估总字节数时按字节计算进度和剩余时间
+        if self.phase == "Writing objects" and self.total_bytes and pct < 100:
+            fraction = min(0.99, self.sent_bytes / self.total_bytes)
+            if self.rate > 0:
+                self.eta_sec = max(0.0, (self.total_bytes - self.sent_bytes) / self.rate)
+        else:
+            fraction = pct / 100
+        self.percent = max(self.percent, lo + int((hi - lo) * fraction))
+        return True
+
+    def describe(self):
+        if self.phase != "Writing objects":
+            return f"正在准备上传 ({self.phase})..."
+        text = f"正在上传 {self.percent}% · 已发送 {self.sent_bytes / (1024 * 1024):.1f} MB"
+        if self.rate:
+            text += f" · {self.rate / (1024 * 1024):.2f} MB/s"
+        if self.eta_sec is not None:
+            text += f" · 剩余约 {int(self.eta_sec // 60)}分{int(self.eta_sec % 60)}秒"
+        return text
+
+def _estimate_push_bytes(repo_path):
+    try:
+        objects = _unpushed_objects(repo_path)
+        if not objects.strip():
+            return None
+        # 格式里带 %(rest) 时 cat-file 才会把 rev-list 输出中对象名后面的路径切掉
+        out, _ = _run_git_cli(repo_path, ["cat-file", "--batch-check=%(objectsize:disk) %(rest)"],
+                              timeout_sec=120, input_text=objects)
+        sizes = [line.split(" ", 1)[0] for line in out.splitlines()]
+        return sum(int(size) for size in sizes if size.isdigit()) or None
+    except GitCommandError:
+        return None
 
-def _git_push_with_timeout(repo_path, proxy=None, timeout_sec=180):
+def _git_push_with_timeout(repo_path, proxy=None, timeout_sec=180, on_progress=None):
     git_args = [
         "-c", "http.connectTimeout=10",
         "-c", "http.lowSpeedLimit=1",
         "-c", "http.lowSpeedTime=20",
-        "push", "--porcelain", "origin",
+        "push", "--porcelain", "--progress", "origin",
     ]
-    env_overrides = None
-    if proxy:
-        env_overrides = {
-            "HTTP_PROXY": proxy,
-            "HTTPS_PROXY": proxy,
-            "http_proxy": proxy,
-            "https_proxy": proxy,
-        }
-    _run_git_cli(repo_path, git_args, env_overrides=env_overrides, timeout_sec=timeout_sec)
+    total_bytes = _estimate_push_bytes(repo_path) if on_progress else None
+    proc = _git_popen(repo_path, git_args, _proxy_env(proxy), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    cmd = proc.args
+    chunks = queue.Queue()
+
+    def pump(stream, tag):
+        while True:
+            data = stream.read1(4096)
+            if not data:
+                break
+            chunks.put((tag, data))
+        chunks.put((tag, None))
+
+    for stream, tag in ((proc.stdout, "out"), (proc.stderr, "err")):
+        threading.Thread(target=pump, args=(stream, tag), daemon=True).start()
+
+    # timeout_sec 为无输出超时：只要 git 仍在报告进度就不中断大文件上传
+    progress = PushProgress(total_bytes)
+    stdout_parts = []
+    message_lines = []
+    pending = ""
+    open_streams = 2
+    while open_streams:
+        try:
+            tag, data = chunks.get(timeout=timeout_sec)
+        except queue.Empty:
+            proc.kill()
+            proc.wait()
+            raise GitCommandError(cmd, status="timeout",
+                                  stderr=f"git push stalled for {timeout_sec}s\n" + "\n".join(message_lines[-20:]))
+        if data is None:
+            open_streams -= 1
+            continue
+        text = data.decode("utf-8", errors="replace")
+        if tag == "out":
+            stdout_parts.append(text)
+            continue
+        pending += text
+        lines = re.split(r"[\r\n]", pending)
+        pending = lines.pop()
+        for line in lines:
+            if not line.strip():
+                continue
+            if progress.feed(line):
+                if on_progress:
+                    on_progress(progress)
+            else:
+                message_lines.append(line)
+    if pending.strip():
+        message_lines.append(pending)
+    proc.wait()
+    if proc.returncode != 0:
+        raise GitCommandError(cmd, status=proc.returncode, stderr="\n".join(message_lines),
+                              stdout="".join(stdout_parts))
+    if on_progress:
+        progress.percent = 100
+        on_progress(progress)
+
+# 只认传输层故障；"unable to access" 同样出现在 401/403 认证失败里，不能用来判断断网
+_NETWORK_ERROR_MARKERS = (
+    "Could not resolve host",
+    "Could not resolve hostname",
+    "Connection timed out",
+    "Operation timed out",
+    "Connection refused",
+    "Connection reset",
+    "Connection was reset",
+    "Failed to connect",
+    "Could not connect to server",
+    "Couldn't connect to server",
+    "git push stalled",
+    "git timeout after",
+    "The requested URL returned error: 5",
+)
+
+def _is_network_error(err_msg):
+    return any(marker in err_msg for marker in _NETWORK_ERROR_MARKERS)
+
+def _pending_push_count(repo_path):
+    try:
+        out, _ = _run_git_cli(repo_path, ["rev-list", "--count", "@{upstream}..HEAD"], timeout_sec=20)
+    except GitCommandError:
+        try:
+            out, _ = _run_git_cli(repo_path, ["rev-list", "--count", "HEAD", "--not", "--remotes=origin"],
+                                  timeout_sec=20)
+        except GitCommandError:
+            return 0
+    try:
+        return int(out.strip() or 0)
+    except ValueError:
+        return 0
+
+class SyncQueue:
+    BASE_DELAY_SEC = 30
+    MAX_DELAY_SEC = 60 * 60
+
+    def __init__(self, path=SYNC_QUEUE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get("repos"), dict):
+                return data
+        except Exception:
+            pass
+        return {"repos": {}}
+
+    def _save(self, data):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Sync queue save failed: {e}")
+
+    @staticmethod
+    def _key(repo_path):
+        return os.path.normcase(os.path.abspath(repo_path))
+
+    def entries(self):
+        with self._lock:
+            return self._load()["repos"]
+
+    def get(self, repo_path):
+        return self.entries().get(self._key(repo_path))
+
+    def enqueue(self, repo_path, error=""):
+        with self._lock:
+            data = self._load()
+            entry = data["repos"].get(self._key(repo_path))
+            now = time.time()
+            if entry is None:
+                entry = {
+                    "repo_path": repo_path,
+                    "queued_at": now,
+                    "attempts": 0,
+                }
+            entry["attempts"] = entry.get("attempts", 0) + 1
+            entry["last_error"] = (error or "")[-500:]
+            entry["next_retry_at"] = now + self.backoff(entry["attempts"])
+            data["repos"][self._key(repo_path)] = entry
+            self._save(data)
+            return entry
+
+    def mark_done(self, repo_path):
+        with self._lock:
+            data = self._load()
+            if data["repos"].pop(self._key(repo_path), None) is not None:
+                self._save(data)
+
+    def due(self, now=None):
+        now = time.time() if now is None else now
+        return [e for e in self.entries().values() if e.get("next_retry_at", 0) <= now]
+
+    @classmethod
+    def backoff(cls, attempts):
+        return min(cls.MAX_DELAY_SEC, cls.BASE_DELAY_SEC * (2 ** max(0, attempts - 1)))
+
+# --- 拉取远程变更 (fetch + 快进/变基) ---
+class SyncConflictError(Exception):
+    def __init__(self, paths, detail=""):
+        super().__init__(detail or "sync conflict")
+        self.paths = paths
+
+def _proxy_env(proxy):
+    if not proxy:
+        return None
+    return {"HTTP_PROXY": proxy, "HTTPS_PROXY": proxy, "http_proxy": proxy, "https_proxy": proxy}
+
+def _split_z(out):
+    return [p for p in out.split("\0") if p]
+
+def _blocking_untracked_paths(err_msg):
+    # "untracked working tree files would be overwritten" 后面是以制表符缩进的路径列表
+    paths = []
+    capture = False
+    for line in err_msg.splitlines():
+        if "would be overwritten" in line:
+            capture = True
+            continue
+        if capture:
+            if line.startswith("\t"):
+                paths.append(line.strip())
+            else:
+                capture = False
+    return paths
+
+def _unmerged_stages(repo_path):
+    # ls-files -u 每行 "<mode> <sha> <stage>\t<path>"；缺少某个 stage 说明那一边删除了该文件
+    out, _ = _run_git_cli(repo_path, ["-c", "core.quotePath=false", "ls-files", "-u", "-z"], timeout_sec=60)
+    stages = {}
+    for entry in _split_z(out):
+        info, _, path = entry.partition("\t")
+        stages.setdefault(path, set()).add(info.split()[2])
+    return stages
+
+def _git_pathspec_cmd(repo_path, git_args, paths):
+    _run_git_cli(repo_path, ["--literal-pathspecs", *git_args, "--pathspec-from-file=-", "--pathspec-file-nul"],
+                 input_text="\0".join(paths) + "\0", timeout_sec=600)
+
+def _rebase_in_progress(repo_path):
+    return os.path.isdir(os.path.join(repo_path, ".git", "rebase-merge")) or \
+        os.path.isdir(os.path.join(repo_path, ".git", "rebase-apply"))
+
+def _resolve_rebase_conflicts(repo_path, strategy):
+    # 逐个路径取选定一边的版本；那一边删除了文件就删除，覆盖修改/删除冲突。
+    # 变基时 stage 2 (--ours) 是远程，stage 3 (--theirs) 是正在重放的本地提交
+    side, stage = ("--theirs", "3") if strategy == "local" else ("--ours", "2")
+    while _rebase_in_progress(repo_path):
+        stages = _unmerged_stages(repo_path)
+        keep = sorted(p for p, present in stages.items() if stage in present)
+        drop = sorted(p for p, present in stages.items() if stage not in present)
+        if keep:
+            _git_pathspec_cmd(repo_path, ["checkout", side], keep)
+            _git_pathspec_cmd(repo_path, ["add", "--sparse"], keep)
+        if drop:
+            _git_pathspec_cmd(repo_path, ["rm", "-q", "-f", "--sparse", "--ignore-unmatch"], drop)
+        try:
+            _run_git_cli(repo_path, ["rebase", "--continue"], env_overrides={"GIT_EDITOR": "true"}, timeout_sec=600)
+        except GitCommandError:
+            if _unmerged_stages(repo_path):
+                continue
+            if _git_has_staged_changes(repo_path):
+                raise
+            # 取舍后这个本地提交已与远程一致，跳过它
+            _run_git_cli(repo_path, ["rebase", "--skip"], timeout_sec=600)
+
+def _integrate_upstream(repo_path, fast_forward, strategy):
+    if fast_forward:
+        _run_git_cli(repo_path, ["merge", "--ff-only", "--autostash", "-q", "@{upstream}"], timeout_sec=300)
+        return
+    try:
+        _run_git_cli(repo_path, ["rebase", "--autostash", "-q", "@{upstream}"], timeout_sec=600)
+    except GitCommandError:
+        if not strategy or not _rebase_in_progress(repo_path) or not _unmerged_stages(repo_path):
+            raise
+        _resolve_rebase_conflicts(repo_path, strategy)
+
+def _set_aside_untracked(repo_path, rel_paths):
+    # 本地未跟踪文件挡住了远程文件：先挪到 .git 下，合并完成后按选择放回或移入 .trash_bin
+    aside_dir = os.path.join(repo_path, ".git", "sync-aside", datetime.datetime.now().strftime("%Y%m%d_%H%M%S"))
+    out, _ = _run_git_cli(repo_path, ["--literal-pathspecs", "-c", "core.quotePath=false", "ls-files", "-z", "--",
+                                      *rel_paths], timeout_sec=60)
+    tracked = set(_split_z(out))
+    moved = []
+    for rel in rel_paths:
+        if rel in tracked:
+            continue
+        src = os.path.join(repo_path, *rel.split("/"))
+        if not os.path.lexists(src):
+            continue
+        dst = os.path.join(aside_dir, *rel.split("/"))
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.move(src, dst)
+        moved.append(rel)
+    return aside_dir, moved
+
+def _put_back_aside(repo_path, aside_dir, moved):
+    for rel in moved:
+        dst = os.path.join(repo_path, *rel.split("/"))
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        os.replace(os.path.join(aside_dir, *rel.split("/")), dst)
+    shutil.rmtree(aside_dir, ignore_errors=True)
+
+def _finish_aside(repo_path, aside_dir, moved, strategy):
+    if strategy == "local":
+        # 用本地文件覆盖刚合并进来的远程版本，并作为新提交一起推送
+        _put_back_aside(repo_path, aside_dir, moved)
+        _git_pathspec_cmd(repo_path, ["add", "--all", "--sparse"], moved)
+        if _git_has_staged_changes(repo_path):
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            _run_git_cli(repo_path, ["commit", "-q", "--no-verify", "-m", f"Update: {timestamp}"])
+        return
+    trash_dir = os.path.join(repo_path, ".trash_bin")
+    os.makedirs(trash_dir, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_")
+    for rel in moved:
+        shutil.move(os.path.join(aside_dir, *rel.split("/")), os.path.join(trash_dir, timestamp + rel.rsplit("/", 1)[-1]))
+    shutil.rmtree(aside_dir, ignore_errors=True)
+
+def _pull_remote(repo_path, proxy=None, strategy=None):
+    try:
+        upstream, _ = _run_git_cli(repo_path, ["rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{upstream}"],
+                                   timeout_sec=20)
+    except GitCommandError:
+        return []
+    upstream = upstream.strip()
+    remote, _, branch = upstream.partition("/")
+    if not branch:
+        return []
+
+    _run_git_cli(
+        repo_path,
+        ["-c", "http.connectTimeout=10", "-c", "http.lowSpeedLimit=1", "-c", "http.lowSpeedTime=20",
+         "fetch", "--quiet", "--no-tags", remote, f"+refs/heads/{branch}:refs/remotes/{remote}/{branch}"],
+        env_overrides=_proxy_env(proxy),
+        timeout_sec=300,
+    )
+
+    old_head, _ = _run_git_cli(repo_path, ["rev-parse", "HEAD"], timeout_sec=20)
+    old_head = old_head.strip()
+    try:
+        _run_git_cli(repo_path, ["merge-base", "--is-ancestor", "@{upstream}", "HEAD"], timeout_sec=20)
+        return []
+    except GitCommandError as e:
+        if str(e.status) != "1":
+            raise
+
+    try:
+        _run_git_cli(repo_path, ["merge-base", "--is-ancestor", "HEAD", "@{upstream}"], timeout_sec=20)
+        fast_forward = True
+    except GitCommandError as e:
+        if str(e.status) != "1":
+            raise
+        fast_forward = False
+
+    try:
+        try:
+            _integrate_upstream(repo_path, fast_forward, strategy)
+        except GitCommandError as e:
+            blocking = _blocking_untracked_paths(str(e))
+            if not strategy or not blocking or _rebase_in_progress(repo_path):
+                raise
+            aside_dir, moved = _set_aside_untracked(repo_path, blocking)
+            try:
+                _integrate_upstream(repo_path, fast_forward, strategy)
+            except GitCommandError:
+                if _rebase_in_progress(repo_path):
+                    _run_git_cli(repo_path, ["rebase", "--abort"], timeout_sec=120)
+                _put_back_aside(repo_path, aside_dir, moved)
+                raise
+            _finish_aside(repo_path, aside_dir, moved, strategy)
+    except GitCommandError as e:
+        err_msg = str(e)
+        conflicts = []
+        if not fast_forward:
+            try:
+                out, _ = _run_git_cli(repo_path, ["diff", "--name-only", "--diff-filter=U", "-z"], timeout_sec=60)
+                conflicts = _split_z(out)
+            except GitCommandError:
+                pass
+            if _rebase_in_progress(repo_path):
+                _run_git_cli(repo_path, ["rebase", "--abort"], timeout_sec=120)
+        conflicts += [p for p in _blocking_untracked_paths(err_msg) if p not in conflicts]
+        if conflicts:
+            raise SyncConflictError(conflicts, err_msg)
+        raise
+
+    out, _ = _run_git_cli(repo_path, ["diff", "--name-only", "-z", old_head, "HEAD"], timeout_sec=60)
+    return _split_z(out)
+
+def _retry_queued_push(sync_queue, repo_path, on_progress=None, on_pulled=None):
+    try:
+        pulled = _pull_remote(repo_path, proxy=_get_windows_inet_proxy())
+        if pulled and on_pulled is not None:
+            on_pulled(pulled)
+        oversized = [b for b in _scan_unpushed_blobs(repo_path) if b["oversized"]]
+        if oversized:
+            sync_queue.mark_done(repo_path)
+            return False, f"待推送提交中有 {len(oversized)} 个超过 100MB 的文件，请手动同步处理。"
+        _git_push_with_timeout(repo_path, proxy=_get_windows_inet_proxy(), on_progress=on_progress)
+    except SyncConflictError as e:
+        sync_queue.mark_done(repo_path)
+        return False, f"远程有冲突的修改，请手动同步处理: {', '.join(e.paths[:10])}"
+    except GitCommandError as e:
+        err_msg = str(e)
+        if _is_network_error(err_msg):
+            sync_queue.enqueue(repo_path, err_msg)
+        else:
+            sync_queue.mark_done(repo_path)
+        return False, err_msg
+    sync_queue.mark_done(repo_path)
+    return True, ""
+
+class SyncRetryWorker(QThread):
+    finished_signal = pyqtSignal(str, bool, str)
+    pulled_signal = pyqtSignal(str, list)
+
+    def __init__(self, sync_queue, repo_path):
+        super().__init__()
+        self.sync_queue = sync_queue
+        self.repo_path = repo_path
+
+    def run(self):
+        try:
+            success, message = _retry_queued_push(
+                self.sync_queue, self.repo_path,
+                on_pulled=lambda paths: self.pulled_signal.emit(self.repo_path, paths),
+            )
+        except Exception as e:
+            success, message = False, str(e)
+        self.finished_signal.emit(self.repo_path, success, message)
+
+class PendingPushCountWorker(QThread):
+    result_signal = pyqtSignal(str, int)
+
+    def __init__(self, repo_path):
+        super().__init__()
+        self.repo_path = repo_path
+
+    def run(self):
+        self.result_signal.emit(self.repo_path, _pending_push_count(self.repo_path))
+
+def _repo_display_name(repo_path):
+    return os.path.basename(os.path.normpath(repo_path)) or repo_path
+
+def _workspace_repos(config):
+    repos = []
+    for entry in config.get("repos", []):
+        if isinstance(entry, dict) and entry.get("repo_path"):
+            repos.append({
+                "name": entry.get("name") or _repo_display_name(entry["repo_path"]),
+                "repo_path": entry["repo_path"],
+                "base_url": entry.get("base_url", ""),
+            })
+    if not repos:
+        repo_path = config.get("repo_path", DEFAULT_CONFIG["repo_path"])
+        repos.append({
+            "name": _repo_display_name(repo_path),
+            "repo_path": repo_path,
+            "base_url": config.get("base_url", DEFAULT_CONFIG["base_url"]),
+        })
+    return repos
+
+_SYNC_ALL_MAX_WORKERS = 3
 
 class ConfigManager:
     @staticmethod
@@ -518,20 +1041,44 @@ class ConfigManager:
             print(f"Config save failed: {e}")
 
 class ConfigDialog(QDialog):
-    def __init__(self, current_repo, current_url, parent=None):
+    def __init__(self, current_repo, current_url, parent=None, config=None):
         super().__init__(parent)
         self.setWindowTitle("⚙️ 设置")
-        self.resize(500, 150)
+        self.resize(500, 280)
         self.apply_styles()
+        config = config or DEFAULT_CONFIG
         
         layout = QVBoxLayout(self)
         form = QFormLayout()
         
         self.repo_edit = QLineEdit(current_repo)
         self.url_edit = QLineEdit(current_url)
+
+        self.auto_sync_check = QCheckBox("文件变更后自动同步")
+        self.auto_sync_check.setChecked(bool(config.get("auto_sync", DEFAULT_CONFIG["auto_sync"])))
+        self.quiet_spin = QSpinBox()
+        self.quiet_spin.setRange(5, 3600)
+        self.quiet_spin.setSuffix(" 秒")
+        self.quiet_spin.setValue(int(config.get("auto_sync_quiet_sec", DEFAULT_CONFIG["auto_sync_quiet_sec"])))
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(30, 24 * 3600)
+        self.interval_spin.setSuffix(" 秒")
+        self.interval_spin.setValue(int(config.get("auto_sync_min_interval_sec", DEFAULT_CONFIG["auto_sync_min_interval_sec"])))
         
         form.addRow("Git 本地仓库路径:", self.repo_edit)
         form.addRow("GitHub Pages URL:", self.url_edit)
+        form.addRow("自动同步:", self.auto_sync_check)
+        form.addRow("静默等待时间:", self.quiet_spin)
+        form.addRow("最短同步间隔:", self.interval_spin)
+
+        self.adaptive_check = QCheckBox("多方案并行压缩，保留最小的结果")
+        self.adaptive_check.setChecked(bool(config.get("compression_adaptive", DEFAULT_CONFIG["compression_adaptive"])))
+        self.dpi_spin = QSpinBox()
+        self.dpi_spin.setRange(72, 300)
+        self.dpi_spin.setSuffix(" DPI")
+        self.dpi_spin.setValue(int(config.get("compression_dpi_floor", DEFAULT_CONFIG["compression_dpi_floor"])))
+        form.addRow("自适应压缩:", self.adaptive_check)
+        form.addRow("图片分辨率下限:", self.dpi_spin)
         
         layout.addLayout(form)
         
@@ -543,58 +1090,1104 @@ class ConfigDialog(QDialog):
     def get_data(self):
         return self.repo_edit.text().strip(), self.url_edit.text().strip()
 
+    def get_auto_sync_settings(self):
+        return {
+            "auto_sync": self.auto_sync_check.isChecked(),
+            "auto_sync_quiet_sec": self.quiet_spin.value(),
+            "auto_sync_min_interval_sec": self.interval_spin.value(),
+        }
+
+    def get_compression_settings(self):
+        return {
+            "compression_adaptive": self.adaptive_check.isChecked(),
+            "compression_dpi_floor": self.dpi_spin.value(),
+        }
+
     def apply_styles(self):
         self.setStyleSheet("""
             QDialog { background-color: #2b2b2b; color: #fff; font-family: "Microsoft YaHei"; }
             QLabel { color: #ccc; font-size: 14px; }
             QLineEdit { background-color: #333; border: 1px solid #555; padding: 5px; color: #fff; border-radius: 4px; }
+            QSpinBox { background-color: #333; border: 1px solid #555; padding: 4px; color: #fff; border-radius: 4px; }
+            QCheckBox { color: #ccc; font-size: 14px; }
+            QPushButton { background-color: #007acc; color: white; border: none; padding: 6px 15px; border-radius: 4px; }
+            QPushButton:hover { background-color: #0062a3; }
+        """)
+
+class SparseFolderDialog(QDialog):
+    def __init__(self, folders, selected, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("🗂 选择本地检出的文件夹")
+        self.resize(420, 480)
+        self.setStyleSheet("""
+            QDialog { background-color: #2b2b2b; color: #fff; font-family: "Microsoft YaHei"; }
+            QLabel { color: #ccc; font-size: 13px; }
+            QCheckBox { color: #ddd; font-size: 13px; padding: 3px; }
+            QScrollArea { border: 1px solid #555; background-color: #333; }
+            QPushButton { background-color: #007acc; color: white; border: none; padding: 6px 15px; border-radius: 4px; }
+            QPushButton:hover { background-color: #0062a3; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("勾选的文件夹会完整下载到本地；未勾选的只显示为占位，展开时才列出内容。"))
+
+        container = QWidget()
+        container.setStyleSheet("background-color: #333;")
+        box = QVBoxLayout(container)
+        self.checks = []
+        selected = set(folders if selected is None else selected)
+        for folder in folders:
+            check = QCheckBox(folder)
+            check.setChecked(folder in selected)
+            box.addWidget(check)
+            self.checks.append(check)
+        box.addStretch()
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(container)
+        layout.addWidget(scroll)
+
+        btns = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        btns.accepted.connect(self.accept)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def selected_folders(self):
+        return [check.text() for check in self.checks if check.isChecked()]
+
+class SyncAllDialog(QDialog):
+    def __init__(self, repos, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("☁️ 同步全部仓库")
+        self.resize(560, 120 + 56 * len(repos))
+        self.setStyleSheet("""
+            QDialog { background-color: #2b2b2b; color: #fff; font-family: "Microsoft YaHei"; }
+            QLabel { color: #ccc; font-size: 13px; }
+            QLabel#RepoName { color: #fff; font-weight: bold; }
+            QProgressBar { background-color: #333; border: 1px solid #555; border-radius: 3px; height: 6px; }
+            QProgressBar::chunk { background-color: #007acc; }
             QPushButton { background-color: #007acc; color: white; border: none; padding: 6px 15px; border-radius: 4px; }
             QPushButton:hover { background-color: #0062a3; }
         """)
+        layout = QVBoxLayout(self)
+        self.rows = {}
+        for repo in repos:
+            name = QLabel(repo["name"])
+            name.setObjectName("RepoName")
+            bar = QProgressBar()
+            bar.setRange(0, 0)
+            bar.setTextVisible(False)
+            bar.setFixedHeight(6)
+            status = QLabel("等待中...")
+            status.setWordWrap(True)
+            layout.addWidget(name)
+            layout.addWidget(bar)
+            layout.addWidget(status)
+            self.rows[repo["repo_path"]] = (bar, status)
+        layout.addStretch()
+        self.summary = QLabel("")
+        layout.addWidget(self.summary)
+        btns = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def set_status(self, repo_path, text):
+        if repo_path in self.rows:
+            self.rows[repo_path][1].setText(text)
+
+    def set_progress(self, repo_path, percent):
+        if repo_path in self.rows:
+            bar = self.rows[repo_path][0]
+            if bar.maximum() != 100:
+                bar.setRange(0, 100)
+            bar.setValue(percent)
+
+    def set_result(self, repo_path, success, message):
+        if repo_path not in self.rows:
+            return
+        bar, status = self.rows[repo_path]
+        bar.setRange(0, 100)
+        bar.setValue(100 if success else 0)
+        status.setText(("✔ " if success else "❌ ") + message)
+        status.setStyleSheet(f"color: {'#4CAF50' if success else '#FF5252'};")
+
+class GitChangeSet:
+    def __init__(self):
+        self.staged = {}
+        self.unstaged = {}
+        self.untracked = []
+        self.renamed = []
+        self.conflicted = []
+
+    def paths(self):
+        return set(self.staged) | set(self.unstaged) | set(self.untracked) | set(self.conflicted)
+
+    def __len__(self):
+        return len(self.paths())
+
+    def status_map(self):
+        result = {}
+        for path, code in self.staged.items():
+            result[path] = code
+        for path, code in self.unstaged.items():
+            result[path] = code
+        for path in self.untracked:
+            result[path] = "?"
+        for path in self.conflicted:
+            result[path] = "U"
+        return result
+
+def _parse_porcelain_v2(output):
+    changes = GitChangeSet()
+    records = output.split("\0")
+    i = 0
+    while i < len(records):
+        rec = records[i]
+        i += 1
+        if not rec:
+            continue
+        kind = rec[0]
+        if kind == "?":
+            changes.untracked.append(rec[2:])
+            continue
+        if kind == "1":
+            parts = rec.split(" ", 8)
+        elif kind == "2":
+            parts = rec.split(" ", 9)
+            orig = records[i] if i < len(records) else ""
+            i += 1
+        elif kind == "u":
+            parts = rec.split(" ", 10)
+            changes.conflicted.append(parts[-1])
+            continue
+        else:
+            continue
+        xy, path = parts[1], parts[-1]
+        if xy[0] != ".":
+            changes.staged[path] = xy[0]
+        if xy[1] != ".":
+            changes.unstaged[path] = xy[1]
+        if kind == "2":
+            changes.renamed.append((orig, path))
+    return changes
+
+def _git_config_defaults(repo_path, settings):
+    # 只补上仓库本地没有设置过的项，用户自己改过的值保持不动
+    try:
+        out, _ = _run_git_cli(repo_path, ["config", "--local", "--list", "-z"], timeout_sec=10)
+        existing = {entry.split("\n", 1)[0].lower() for entry in out.split("\0") if entry}
+    except GitCommandError:
+        existing = set()
+    for key, value in settings:
+        if key.lower() in existing:
+            continue
+        try:
+            _run_git_cli(repo_path, ["config", "--local", key, value], timeout_sec=10)
+        except GitCommandError as e:
+            print(f"git config {key} failed: {e}")
+
+class GitStatusEngine:
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self._configured = False
+
+    def configure(self):
+        if self._configured:
+            return
+        self._configured = True
+        settings = [("core.untrackedCache", "true")]
+        if platform.system() in ("Windows", "Darwin"):
+            settings.append(("core.fsmonitor", "true"))
+        _git_config_defaults(self.repo_path, settings)
+
+    def status(self, pathspecs=None, write_index=True):
+        self.configure()
+        args = []
+        if not write_index:
+            args.append("--no-optional-locks")
+        args += ["-c", "core.quotePath=false", "status", "--porcelain=v2", "-z", "--untracked-files=all"]
+        if pathspecs:
+            args += ["--", *pathspecs]
+        out, _ = _run_git_cli(self.repo_path, args, timeout_sec=120)
+        return _parse_porcelain_v2(out)
+
+_status_engines = {}
+_status_engines_lock = threading.Lock()
+
+def _status_engine(repo_path):
+    # 每个仓库只配置一次 untrackedCache/fsmonitor，避免每次状态检测都多跑两次 git config
+    key = os.path.normcase(os.path.abspath(repo_path))
+    with _status_engines_lock:
+        engine = _status_engines.get(key)
+        if engine is None:
+            engine = _status_engines[key] = GitStatusEngine(repo_path)
+        return engine
 
 class GitStatusWorker(QThread):
     result_signal = pyqtSignal(int, bool) 
+    changes_signal = pyqtSignal(dict)
 
-    def __init__(self, repo_path):
+    def __init__(self, repo_path, write_index=True):
         super().__init__()
         self.repo_path = repo_path
+        self.write_index = write_index
 
     def run(self):
         try:
-            repo = Repo(self.repo_path)
-            changed = set()
-            try:
-                for diff in repo.index.diff(None):
-                    path = diff.a_path or diff.b_path
-                    if path:
-                        changed.add(path)
-            except Exception:
-                pass
-            try:
-                for diff in repo.index.diff("HEAD"):
-                    path = diff.a_path or diff.b_path
-                    if path:
-                        changed.add(path)
-            except Exception:
-                pass
-            for path in repo.untracked_files:
-                if path:
-                    changed.add(path)
-            self.result_signal.emit(len(changed), True)
+            changes = _status_engine(self.repo_path).status(write_index=self.write_index).status_map()
+            self.changes_signal.emit(changes)
+            self.result_signal.emit(len(changes), True)
         except Exception:
             self.result_signal.emit(0, False)
 
-class GitWorker(QThread):
-    status_signal = pyqtSignal(str) 
+def _glob_escape(path):
+    return re.sub(r"([*?\[\]\\])", r"\\\1", path)
+
+class GitPathStatusWorker(QThread):
+    result_signal = pyqtSignal(list, dict, bool)
+
+    def __init__(self, repo_path, scopes):
+        super().__init__()
+        self.repo_path = repo_path
+        self.scopes = scopes
+
+    def run(self):
+        pathspecs = []
+        for kind, rel in self.scopes:
+            if kind == "dir":
+                pathspecs.append(f":(glob){_glob_escape(rel)}/*" if rel else ":(glob)*")
+            else:
+                pathspecs.append(f":(literal){rel}" if rel else ".")
+        try:
+            changes = _status_engine(self.repo_path).status(pathspecs, write_index=False).status_map()
+            self.result_signal.emit(self.scopes, changes, True)
+        except Exception:
+            self.result_signal.emit(self.scopes, {}, False)
+
+class GitStatusTracker(QObject):
+    count_signal = pyqtSignal(int, bool)
+    changes_signal = pyqtSignal(dict)
+    status_started = pyqtSignal()
+    tree_changed = pyqtSignal()
+
+    MAX_SCOPES = 64
+
+    def __init__(self, repo_path, parent=None, sweep_interval_ms=5 * 60 * 1000):
+        super().__init__(parent)
+        self.repo_path = repo_path
+        self.changes = {}
+        self._watched_dirs = set()
+        self._pending = {}
+        self._paused = False
+        self._sweep_requested = False
+        self._sweep_background = True
+        self.has_sweep = False
+        self._ignore_git_events_until = 0.0
+        self._path_worker = None
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+        self.watcher.fileChanged.connect(self._on_git_file_changed)
+
+        self.sweep_worker = GitStatusWorker(repo_path)
+        self.sweep_worker.changes_signal.connect(self._on_sweep_changes)
+        self.sweep_worker.result_signal.connect(self._on_sweep_result)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(400)
+        self._debounce.timeout.connect(self._flush)
+
+        self._sweep_timer = QTimer(self)
+        self._sweep_timer.setInterval(sweep_interval_ms)
+        self._sweep_timer.timeout.connect(lambda: self.request_sweep(background=True))
+
+    def start(self):
+        self._watch_tree("")
+        self._watch_git_files()
+        self._sweep_timer.start()
+        self.request_sweep()
+
+    def stop(self):
+        self._debounce.stop()
+        self._sweep_timer.stop()
+        paths = self.watcher.directories() + self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+        self._watched_dirs.clear()
+        self._pending.clear()
+
+    def set_repo_path(self, repo_path):
+        self.stop()
+        self.repo_path = repo_path
+        self.sweep_worker.repo_path = repo_path
+        self.changes = {}
+        self.has_sweep = False
+        self.start()
+
+    def pause(self):
+        self._paused = True
+        self._debounce.stop()
+
+    def resume(self):
+        self._paused = False
+        if self._pending or self._sweep_requested:
+            self._debounce.start()
+
+    def _abs(self, rel):
+        return os.path.join(self.repo_path, *rel.split("/")) if rel else self.repo_path
+
+    def _rel(self, path):
+        rel = os.path.relpath(path, self.repo_path).replace("\\", "/")
+        return "" if rel == "." else rel
+
+    def _watch_tree(self, rel_root):
+        new_dirs = []
+        stack = [rel_root]
+        while stack:
+            rel = stack.pop()
+            if rel in self._watched_dirs:
+                continue
+            new_dirs.append(rel)
+            try:
+                with os.scandir(self._abs(rel)) as it:
+                    for entry in it:
+                        try:
+                            if not entry.is_dir(follow_symlinks=False):
+                                continue
+                        except OSError:
+                            continue
+                        if entry.name == ".git" or entry.name in _INDEX_SKIP_DIR_NAMES or _is_hidden_entry(entry):
+                            continue
+                        stack.append(f"{rel}/{entry.name}" if rel else entry.name)
+            except OSError:
+                continue
+        if new_dirs:
+            self._watched_dirs.update(new_dirs)
+            self.watcher.addPaths([self._abs(r) for r in new_dirs])
+        return new_dirs
+
+    def _watch_git_files(self):
+        git_dir = os.path.join(self.repo_path, ".git")
+        files = [p for p in (os.path.join(git_dir, "index"), os.path.join(git_dir, "HEAD")) if os.path.exists(p)]
+        missing = [p for p in files if p not in self.watcher.files()]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def _on_git_file_changed(self, _path):
+        self._watch_git_files()
+        # 全量扫描会回写索引（untracked cache），忽略由此触发的通知
+        if self.sweep_worker.isRunning() or time.monotonic() < self._ignore_git_events_until:
+            return
+        self.request_sweep()
+
+    def _on_directory_changed(self, path):
+        self.tree_changed.emit()
+        rel = self._rel(path)
+        if not os.path.isdir(path):
+            self._forget_tree(rel)
+            parent = rel.rpartition("/")[0]
+            self._pending[rel] = "tree"
+            self._pending.setdefault(parent, "dir")
+        else:
+            self._pending.setdefault(rel, "dir")
+            try:
+                with os.scandir(path) as it:
+                    present = {e.name for e in it if e.is_dir(follow_symlinks=False)}
+            except OSError:
+                present = set()
+            prefix = f"{rel}/" if rel else ""
+            for child in [d for d in self._watched_dirs if d.startswith(prefix) and d != rel
+                          and "/" not in d[len(prefix):]]:
+                if child[len(prefix):] not in present:
+                    self._forget_tree(child)
+                    self._pending[child] = "tree"
+            for name in present:
+                child = prefix + name
+                if child not in self._watched_dirs and self._watch_tree(child):
+                    self._pending[child] = "tree"
+        if not self._paused:
+            self._debounce.start()
+
+    def _forget_tree(self, rel):
+        gone = [d for d in self._watched_dirs if d == rel or d.startswith(rel + "/")]
+        for d in gone:
+            self._watched_dirs.discard(d)
+        existing = [self._abs(d) for d in gone if self._abs(d) in self.watcher.directories()]
+        if existing:
+            self.watcher.removePaths(existing)
+
+    def notify_paths(self, paths):
+        for path in paths:
+            rel = self._rel(path)
+            if rel.startswith(".."):
+                continue
+            self._pending[rel] = "tree"
+        if not self._paused:
+            self._debounce.start()
+
+    def request_sweep(self, background=False):
+        # 定时兜底扫描属于后台任务：不打断仓库维护，也不回写索引
+        self._sweep_background = background and (self._sweep_background or not self._sweep_requested)
+        self._sweep_requested = True
+        if not self._paused:
+            self._debounce.start()
+
+    def _flush(self):
+        if self._paused:
+            return
+        if self._sweep_requested or len(self._pending) > self.MAX_SCOPES:
+            if self.sweep_worker.isRunning():
+                self._debounce.start()
+                return
+            background = self._sweep_background and not self._pending
+            self._sweep_requested = False
+            self._sweep_background = True
+            self._pending.clear()
+            self.sweep_worker.write_index = not background
+            if not background:
+                self.status_started.emit()
+            self.sweep_worker.start()
+            return
+        if not self._pending:
+            return
+        if self._path_worker is not None and self._path_worker.isRunning():
+            self._debounce.start()
+            return
+        scopes = sorted(self._pending.items(), key=lambda kv: kv[1] + kv[0])
+        self._pending.clear()
+        self._path_worker = GitPathStatusWorker(self.repo_path, [(kind, rel) for rel, kind in scopes])
+        self._path_worker.result_signal.connect(self._on_path_result)
+        self.status_started.emit()
+        self._path_worker.start()
+
+    def _on_path_result(self, scopes, changes, success):
+        if not success:
+            self.request_sweep()
+            return
+        for kind, rel in scopes:
+            if kind == "dir":
+                stale = [p for p in self.changes if p.rpartition("/")[0] == rel]
+            elif rel:
+                stale = [p for p in self.changes if p == rel or p.startswith(rel + "/")]
+            else:
+                stale = list(self.changes)
+            for p in stale:
+                del self.changes[p]
+        self.changes.update(changes)
+        self.changes_signal.emit(dict(self.changes))
+        self.count_signal.emit(len(self.changes), True)
+
+    def _on_sweep_changes(self, changes):
+        self.has_sweep = True
+        self.changes = dict(changes)
+        self.changes_signal.emit(dict(self.changes))
+
+    def _on_sweep_result(self, count, success):
+        self._ignore_git_events_until = time.monotonic() + 1.0
+        self.count_signal.emit(count, success)
+
+# --- 自动同步调度 ---
+class AutoSyncScheduler(QObject):
+    sync_requested = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.enabled = False
+        self.quiet_ms = DEFAULT_CONFIG["auto_sync_quiet_sec"] * 1000
+        self.min_interval_sec = DEFAULT_CONFIG["auto_sync_min_interval_sec"]
+        self._last_sync = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def configure(self, enabled, quiet_sec, min_interval_sec):
+        self.enabled = bool(enabled)
+        self.quiet_ms = max(1, int(quiet_sec)) * 1000
+        self.min_interval_sec = max(0, int(min_interval_sec))
+        if not self.enabled:
+            self._timer.stop()
+
+    def notify_change(self):
+        # 每次变更都重新计时，一阵连续操作只在安静下来后触发一次同步
+        if self.enabled:
+            self._timer.start(self.quiet_ms)
+
+    def defer(self):
+        if self.enabled and not self._timer.isActive():
+            self._timer.start(self.quiet_ms)
+
+    def mark_synced(self):
+        self._last_sync = time.time()
+
+    def _on_timeout(self):
+        if not self.enabled:
+            return
+        remaining = self.min_interval_sec - (time.time() - self._last_sync)
+        if remaining > 0:
+            self._timer.start(int(remaining * 1000) + 50)
+            return
+        self.sync_requested.emit()
+
+def _log_sync_timings(record):
+    try:
+        with open(SYNC_TIMINGS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except Exception as e:
+        print(f"Sync timing log failed: {e}")
+
+# --- 空闲时仓库维护 ---
+# (名称, git 参数, 最短间隔秒数)；按顺序执行，任何一步被打断都会让出给同步/状态检测
+_MAINTENANCE_TASKS = [
+    ("commit-graph", ["commit-graph", "write", "--reachable", "--changed-paths"], 6 * 3600),
+    ("pack-loose", ["repack", "-d", "-q"], 24 * 3600),
+    ("repack", ["repack", "-a", "-d", "-q", "--write-bitmap-index"], 7 * 24 * 3600),
+    ("prune", ["prune", "--expire=2.weeks.ago"], 7 * 24 * 3600),
+    ("multi-pack-index", ["multi-pack-index", "write"], 24 * 3600),
+]
+MAINTENANCE_IDLE_SEC = 5 * 60
+
+def _repo_object_bytes(repo_path):
+    try:
+        out, _ = _run_git_cli(repo_path, ["count-objects", "-v"], timeout_sec=30)
+    except GitCommandError:
+        return None
+    stats = dict(line.split(": ", 1) for line in out.splitlines() if ": " in line)
+    return sum(int(stats.get(key, 0)) for key in ("size", "size-pack", "size-garbage")) * 1024
+
+def _load_maintenance_state():
+    try:
+        with open(MAINTENANCE_STATE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def _due_maintenance_tasks(repo_path, now=None):
+    now = time.time() if now is None else now
+    last_runs = _load_maintenance_state().get(os.path.normcase(os.path.abspath(repo_path)), {})
+    return [task for task in _MAINTENANCE_TASKS if now - last_runs.get(task[0], 0) >= task[2]]
+
+def _record_maintenance(repo_path, record):
+    if record["outcome"] == "ok":
+        state = _load_maintenance_state()
+        state.setdefault(os.path.normcase(os.path.abspath(repo_path)), {})[record["task"]] = time.time()
+        try:
+            with open(MAINTENANCE_STATE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=4, ensure_ascii=False)
+        except Exception as e:
+            print(f"Maintenance state save failed: {e}")
+    try:
+        with open(MAINTENANCE_LOG_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except Exception as e:
+        print(f"Maintenance log failed: {e}")
+
+class MaintenanceWorker(QThread):
+    task_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(list, bool)
+
+    def __init__(self, repo_path, tasks):
+        super().__init__()
+        self.repo_path = repo_path
+        self.tasks = tasks
+
+    def _pack_temp_files(self):
+        pack_dir = os.path.join(self.repo_path, ".git", "objects", "pack")
+        try:
+            return {name for name in os.listdir(pack_dir) if name.startswith(".tmp-") or name.startswith("tmp_")}
+        except OSError:
+            return set()
+
+    def _stop_process_tree(self, proc):
+        # repack 会再启动 pack-objects 子进程，只结束父进程会留下孤儿进程和半成品 pack
+        if platform.system() == "Windows":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                           capture_output=True, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        else:
+            try:
+                os.killpg(proc.pid, signal.SIGTERM)
+            except OSError:
+                proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    def _run_task(self, git_args):
+        startupinfo = None
+        creationflags = 0
+        popen_kwargs = {}
+        if platform.system() == "Windows":
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        else:
+            popen_kwargs["start_new_session"] = True
+        temp_before = self._pack_temp_files()
+        proc = subprocess.Popen(
+            ["git", "-C", self.repo_path] + list(git_args),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            startupinfo=startupinfo,
+            creationflags=creationflags,
+            **popen_kwargs,
+        )
+        while True:
+            try:
+                proc.wait(timeout=0.2)
+                break
+            except subprocess.TimeoutExpired:
+                if self.isInterruptionRequested():
+                    self._stop_process_tree(proc)
+                    pack_dir = os.path.join(self.repo_path, ".git", "objects", "pack")
+                    for name in self._pack_temp_files() - temp_before:
+                        try:
+                            os.remove(os.path.join(pack_dir, name))
+                        except OSError:
+                            pass
+                    return "yielded", ""
+        stderr = proc.stderr.read().decode("utf-8", errors="replace") if proc.stderr else ""
+        return ("ok" if proc.returncode == 0 else "failed"), stderr.strip()
+
+    def run(self):
+        records = []
+        yielded = False
+        for name, git_args, _interval in self.tasks:
+            if self.isInterruptionRequested():
+                yielded = True
+                break
+            self.task_signal.emit(name)
+            before = _repo_object_bytes(self.repo_path)
+            start = time.perf_counter()
+            try:
+                outcome, error = self._run_task(git_args)
+            except Exception as e:
+                outcome, error = "failed", str(e)
+            duration = time.perf_counter() - start
+            after = _repo_object_bytes(self.repo_path)
+            record = {
+                "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                "repo": self.repo_path,
+                "task": name,
+                "outcome": outcome,
+                "duration": round(duration, 3),
+                "bytes_before": before,
+                "bytes_after": after,
+                "reclaimed": (before - after) if before is not None and after is not None else None,
+            }
+            if error:
+                record["error"] = error[-500:]
+            _record_maintenance(self.repo_path, record)
+            records.append(record)
+            if outcome == "yielded":
+                yielded = True
+                break
+        self.finished_signal.emit(records, yielded)
+
+# --- 仓库二进制配置 ---
+# PDF 本身已压缩，delta 搜索和 zlib 重压缩几乎没有收益，只会拖慢 push / gc
+_REPO_ATTRIBUTE_RULES = ["*.pdf binary -delta", "*.PDF binary -delta"]
+_REPO_PROFILE_CONFIG = [
+    ("core.bigFileThreshold", "8m"),
+    ("pack.compression", "1"),
+    ("pack.windowMemory", "256m"),
+]
+
+def _ensure_repo_profile(repo_path):
+    _git_config_defaults(repo_path, _REPO_PROFILE_CONFIG)
+
+    attributes_path = os.path.join(repo_path, ".gitattributes")
+    existing = []
+    if os.path.exists(attributes_path):
+        with open(attributes_path, 'r', encoding='utf-8') as f:
+            existing = [line.strip() for line in f]
+    missing = [rule for rule in _REPO_ATTRIBUTE_RULES if rule not in existing]
+    if missing:
+        with open(attributes_path, 'a', encoding='utf-8') as f:
+            f.write("\n" + "\n".join(missing) + "\n")
+    return bool(missing)
+
+# --- 部分克隆与按需下载 ---
+# 部分克隆 (--filter=blob:none) + 稀疏检出：索引里有全部文件，工作区只放 0 字节占位文件，
+# 打开时再用 cat-file 触发按需拉取对应的 blob
+def _is_sparse_repo(repo_path):
+    return os.path.exists(os.path.join(repo_path, ".git", "info", "sparse-checkout"))
+
+def _skip_worktree_paths(repo_path):
+    out, _ = _run_git_cli(repo_path, ["-c", "core.quotePath=false", "ls-files", "-t", "-z"], timeout_sec=120)
+    return {entry[2:] for entry in out.split("\0") if entry.startswith("S ")}
+
+def _placeholder_entries(skipped, rel_dirs):
+    # 只列出已展开目录的直接子项：文件写成 0 字节占位，子目录写成空的占位目录
+    files = set()
+    dirs = set()
+    prefixes = [d + "/" if d else "" for d in rel_dirs]
+    for path in skipped:
+        for prefix in prefixes:
+            if not path.startswith(prefix):
+                continue
+            head, sep, _ = path[len(prefix):].partition("/")
+            if sep:
+                dirs.add(prefix + head)
+            else:
+                files.add(path)
+    return files, dirs
+
+def _top_level_folders(repo_path):
+    out, _ = _run_git_cli(repo_path, ["-c", "core.quotePath=false", "ls-tree", "-d", "--name-only", "-z", "HEAD"],
+                          timeout_sec=60)
+    return sorted(p for p in out.split("\0") if p and p not in _INDEX_SKIP_DIR_NAMES)
+
+def _sparse_cone_folders(repo_path):
+    if not _is_sparse_repo(repo_path):
+        return None
+    out, _ = _run_git_cli(repo_path, ["-c", "core.quotePath=false", "sparse-checkout", "list"], timeout_sec=60)
+    return [line.strip() for line in out.splitlines() if line.strip()]
+
+def _write_placeholders(repo_path, rel_paths, rel_dirs=()):
+    created = 0
+    for rel in rel_dirs:
+        try:
+            os.makedirs(os.path.join(repo_path, *rel.split("/")), exist_ok=True)
+        except OSError as e:
+            print(f"Placeholder dir create failed: {rel}: {e}")
+    for rel in rel_paths:
+        abs_path = os.path.join(repo_path, *rel.split("/"))
+        if os.path.lexists(abs_path):
+            continue
+        try:
+            os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+            open(abs_path, 'wb').close()
+            created += 1
+        except OSError as e:
+            print(f"Placeholder create failed: {rel}: {e}")
+    return created
+
+def _hydrate_path(repo_path, rel):
+    # 按索引里的 blob 取内容：占位文件移动/复制后只改了索引，HEAD 里还没有新路径
+    out, _ = _run_git_cli(repo_path, ["--literal-pathspecs", "ls-files", "-s", "-z", "--", rel], timeout_sec=60)
+    shas = [entry.split()[1] for entry in _split_z(out) if entry.partition("\t")[2] == rel]
+    if not shas:
+        raise GitCommandError(["git", "ls-files", "-s", "--", rel], status=1, stderr=f"'{rel}' 不在索引中")
+    abs_path = os.path.join(repo_path, *rel.split("/"))
+    fd, temp_path = tempfile.mkstemp(prefix=".hydrate_", dir=os.path.dirname(abs_path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            proc = _git_popen(repo_path, ["cat-file", "blob", shas[0]], _proxy_env(_get_windows_inet_proxy()),
+                              stdout=f, stderr=subprocess.PIPE)
+            try:
+                _, err = proc.communicate(timeout=1800)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise GitCommandError(proc.args, status="timeout", stderr="git timeout after 1800s")
+        if proc.returncode != 0:
+            raise GitCommandError(proc.args, status=proc.returncode, stderr=err.decode("utf-8", errors="replace"))
+        if os.path.exists(abs_path):
+            shutil.copymode(abs_path, temp_path)
+        os.replace(temp_path, abs_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    _run_git_cli(repo_path, ["update-index", "--no-skip-worktree", "--", rel], timeout_sec=60)
+
+def _placeholders_under(repo_path, abs_path):
+    # 返回 {相对路径: (mode, sha)}：文件夹取前缀下的全部 skip-worktree 条目，
+    # 包括尚未展开、工作区里还没有占位文件的子项，否则删除/移动后它们会在刷新时重新出现
+    if not _is_sparse_repo(repo_path):
+        return {}
+    rel = os.path.relpath(os.path.abspath(abs_path), os.path.abspath(repo_path)).replace("\\", "/")
+    if rel.startswith(".."):
+        return {}
+    args = ["--literal-pathspecs", "-c", "core.quotePath=false", "ls-files", "-t", "-s", "-z"]
+    if rel != ".":
+        args += ["--", rel]
+    out, _ = _run_git_cli(repo_path, args, timeout_sec=120)
+    is_dir = os.path.isdir(abs_path)
+    entries = {}
+    for entry in _split_z(out):
+        info, _, path = entry.partition("\t")
+        tag, mode, sha, _stage = info.split()
+        if tag != "S":
+            continue
+        local = os.path.join(repo_path, *path.split("/"))
+        if os.path.isfile(local) or (is_dir and not os.path.lexists(local)):
+            entries[path] = (mode, sha)
+    return entries
+
+def _update_index_entries(repo_path, removed=None, added=None):
+    # 直接改索引条目，占位文件移动/删除/复制时不需要下载内容；新增的条目保持 skip-worktree
+    removed = removed or {}
+    added = added or {}
+    lines = [f"0 {sha}\t{path}" for path, (_mode, sha) in removed.items() if path not in added]
+    lines += [f"{mode} {sha}\t{path}" for path, (mode, sha) in added.items()]
+    if lines:
+        _run_git_cli(repo_path, ["update-index", "-z", "--index-info"], input_text="\0".join(lines) + "\0",
+                     timeout_sec=120)
+    if added:
+        _run_git_cli(repo_path, ["update-index", "-z", "--skip-worktree", "--stdin"],
+                     input_text="\0".join(added) + "\0", timeout_sec=120)
+
+def _relocated_entries(repo_path, entries, src, dst):
+    # 把 src 下的条目换到 dst 下；目标在仓库外或回收站里时返回空，相当于删除
+    src_rel = os.path.relpath(os.path.abspath(src), os.path.abspath(repo_path)).replace("\\", "/")
+    dst_rel = os.path.relpath(os.path.abspath(dst), os.path.abspath(repo_path)).replace("\\", "/")
+    if dst_rel.startswith("..") or dst_rel.split("/")[0] == ".trash_bin":
+        return {}
+    return {dst_rel + path[len(src_rel):]: entry for path, entry in entries.items()}
+
+class HydrateWorker(QThread):
+    progress_signal = pyqtSignal(int, int, str)
+    finished_signal = pyqtSignal(list, str)
+
+    def __init__(self, repo_path, rel_paths):
+        super().__init__()
+        self.repo_path = repo_path
+        self.rel_paths = rel_paths
+
+    def run(self):
+        done = []
+        for i, rel in enumerate(self.rel_paths):
+            self.progress_signal.emit(i, len(self.rel_paths), rel)
+            try:
+                _hydrate_path(self.repo_path, rel)
+            except Exception as e:
+                self.finished_signal.emit(done, f"{rel}: {e}")
+                return
+            done.append(rel)
+        self.finished_signal.emit(done, "")
+
+class PlaceholderRefreshWorker(QThread):
+    result_signal = pyqtSignal(str, list, list)
+
+    def __init__(self, repo_path, rel_dirs):
+        super().__init__()
+        self.repo_path = repo_path
+        self.rel_dirs = rel_dirs
+
+    def run(self):
+        files, dirs = set(), set()
+        try:
+            skipped = _skip_worktree_paths(self.repo_path)
+            files, dirs = _placeholder_entries(skipped, self.rel_dirs)
+            _write_placeholders(self.repo_path, files, dirs)
+        except Exception as e:
+            print(f"Placeholder refresh failed: {e}")
+        self.result_signal.emit(self.repo_path, sorted(files), sorted(dirs))
+
+class PartialCloneWorker(QThread):
+    status_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(bool, str)
 
-    def __init__(self, repo_path):
+    def __init__(self, url, target_dir):
+        super().__init__()
+        self.url = url
+        self.target_dir = target_dir
+
+    def run(self):
+        try:
+            parent = os.path.dirname(os.path.abspath(self.target_dir))
+            env = _proxy_env(_get_windows_inet_proxy())
+            self.status_signal.emit("正在下载目录结构 (git clone --filter=blob:none)...")
+            _run_git_cli(parent, ["clone", "--filter=blob:none", "--no-checkout", "--quiet", self.url, self.target_dir],
+                         env_overrides=env, timeout_sec=3600)
+            repo_path = self.target_dir
+            _run_git_cli(repo_path, ["config", "--local", "sparse.expectFilesOutsideOfPatterns", "true"])
+            _run_git_cli(repo_path, ["sparse-checkout", "set", "--cone"])
+            branch, _ = _run_git_cli(repo_path, ["symbolic-ref", "--short", "HEAD"])
+            self.status_signal.emit("正在检出根目录文件...")
+            _run_git_cli(repo_path, ["checkout", "-q", branch.strip()], env_overrides=env, timeout_sec=3600)
+            self.status_signal.emit("正在创建占位文件...")
+            skipped = _skip_worktree_paths(repo_path)
+            files, dirs = _placeholder_entries(skipped, {""})
+            _write_placeholders(repo_path, files, dirs)
+            self.finished_signal.emit(True, f"已连接归档，{len(skipped)} 个文件仅在云端，打开时自动下载。")
+        except GitCommandError as e:
+            self.finished_signal.emit(False, f"连接归档失败: {e}")
+        except Exception as e:
+            self.finished_signal.emit(False, f"未知错误: {e}")
+
+class SparseCheckoutWorker(QThread):
+    finished_signal = pyqtSignal(bool, str)
+
+    def __init__(self, repo_path, folders):
         super().__init__()
         self.repo_path = repo_path
+        self.folders = folders
+
+    def run(self):
+        try:
+            _run_git_cli(self.repo_path, ["config", "--local", "sparse.expectFilesOutsideOfPatterns", "true"])
+            # 新检出的文件夹里先清掉 0 字节占位文件，否则 git 会把它们当成本地修改保留下来
+            skipped = _skip_worktree_paths(self.repo_path) if _is_sparse_repo(self.repo_path) else set()
+            prefixes = tuple(f + "/" for f in self.folders)
+            for rel in skipped:
+                if rel.startswith(prefixes):
+                    abs_path = os.path.join(self.repo_path, *rel.split("/"))
+                    if os.path.isfile(abs_path) and os.path.getsize(abs_path) == 0:
+                        os.remove(abs_path)
+            _run_git_cli(self.repo_path, ["sparse-checkout", "set", "--cone", "--", *self.folders],
+                         env_overrides=_proxy_env(_get_windows_inet_proxy()), timeout_sec=3600)
+            self.finished_signal.emit(True, f"本地已检出 {len(self.folders)} 个文件夹")
+        except GitCommandError as e:
+            self.finished_signal.emit(False, f"切换检出文件夹失败: {e}")
+        except Exception as e:
+            self.finished_signal.emit(False, f"未知错误: {e}")
+
+# --- 推送前大文件检查 ---
+GITHUB_BLOB_LIMIT = 100 * 1024 * 1024
+LARGE_BLOB_WARN = 50 * 1024 * 1024
+
+def _gitignore_rule(rel):
+    # 只匹配这一个文件的 .gitignore 规则：转义通配符、开头的 #/! 和行尾空格
+    escaped = re.sub(r"([\\*?\[])", r"\\\1", rel)
+    if escaped[:1] in ("#", "!"):
+        escaped = "\\" + escaped
+    stripped = escaped.rstrip(" ")
+    return "/" + stripped + "\\ " * (len(escaped) - len(stripped))
+
+def _upstream_commit(repo_path):
+    try:
+        out, _ = _run_git_cli(repo_path, ["rev-parse", "--verify", "-q", "@{upstream}^{commit}"], timeout_sec=20)
+        return out.strip() or None
+    except GitCommandError:
+        return None
+
+def _unpushed_objects(repo_path):
+    upstream = _upstream_commit(repo_path)
+    rev_args = ["HEAD", f"^{upstream}"] if upstream else ["HEAD", "--not", "--remotes=origin"]
+    objects, _ = _run_git_cli(repo_path, ["rev-list", "--objects", *rev_args], timeout_sec=120)
+    return objects
+
+def _scan_unpushed_blobs(repo_path, min_size=LARGE_BLOB_WARN):
+    objects = _unpushed_objects(repo_path)
+    if not objects.strip():
+        return []
+    out, _ = _run_git_cli(
+        repo_path,
+        ["cat-file", "--batch-check=%(objecttype) %(objectname) %(objectsize) %(rest)"],
+        timeout_sec=120,
+        input_text=objects,
+    )
+    blobs = {}
+    for line in out.splitlines():
+        parts = line.split(" ", 3)
+        if len(parts) < 4 or parts[0] != "blob":
+            continue
+        size = int(parts[2])
+        if size < min_size:
+            continue
+        path = parts[3]
+        if path not in blobs or blobs[path]["size"] < size:
+            blobs[path] = {"path": path, "oid": parts[1], "size": size, "oversized": size > GITHUB_BLOB_LIMIT}
+    return sorted(blobs.values(), key=lambda b: b["size"], reverse=True)
+
+def _describe_large_blobs(blobs):
+    lines = []
+    for blob in blobs:
+        mark = "❌ 超限" if blob["oversized"] else "⚠️ 接近上限"
+        lines.append(f"{mark}  {blob['size'] / (1024 * 1024):.1f}MB  {blob['path']}")
+    return "\n".join(lines)
+
+# --- 按路径增量暂存 ---
+_STAGE_MAX_PATHSPECS = 500
+
+def _git_has_staged_changes(repo_path):
+    try:
+        _run_git_cli(repo_path, ["diff", "--cached", "--quiet", "--no-ext-diff"])
+        return False
+    except GitCommandError as e:
+        if str(e.status) == "1":
+            return True
+        raise
+
+def _stage_paths(repo_path, changes, on_progress=None, chunk_size=256):
+    # 交给 git add：执行 autocrlf/.gitattributes/LFS 等 clean 过滤器，写入 stat 信息，符号链接按链接入库；
+    # 只传已知变更的路径，分批调用以便报告进度
+    paths = sorted(set(changes.untracked) | set(changes.unstaged))
+    removed = [p for p in paths if not os.path.lexists(os.path.join(repo_path, *p.split("/")))]
+    done = 0
+    for i in range(0, len(paths), chunk_size):
+        chunk = paths[i:i + chunk_size]
+        _run_git_cli(repo_path, ["--literal-pathspecs", "add", "--all", "--sparse",
+                                 "--pathspec-from-file=-", "--pathspec-file-nul"],
+                     input_text="\0".join(chunk) + "\0", timeout_sec=600)
+        done += len(chunk)
+        if on_progress:
+            on_progress(done, len(paths), chunk[-1])
+    return len(paths) - len(removed), len(removed)
+
+# 一次完整同步：提交 → 拉取合并 → 大文件检查 → 推送。普通类，供 GitWorker 和 SyncAllWorker 的线程池共用
+class RepoSync:
+    def __init__(self, repo_path, paths=None, sync_queue=None, auto=False, conflict_strategy=None,
+                 on_status=None, on_progress=None, on_pulled=None):
+        self.repo_path = repo_path
+        self.paths = paths
+        self.sync_queue = sync_queue
+        self.auto = auto
+        self.conflict_strategy = conflict_strategy
+        self.queued = False
+        self.conflicts = []
+        self._committed = False
+        self.timings = {}
+        self.large_blobs = []
+        self.outcome = "failed"
+        self.file_count = 0
+        self._phase_name = None
+        self._phase_start = 0.0
+        self._on_status = on_status or (lambda text: None)
+        self._on_progress = on_progress or (lambda percent: None)
+        self._on_pulled = on_pulled or (lambda paths: None)
+
+    def _phase(self, name):
+        now = time.perf_counter()
+        if self._phase_name:
+            self.timings[self._phase_name] = round(now - self._phase_start, 3)
+        self._phase_name = name
+        self._phase_start = now
+
+    def _log_timings(self, outcome, file_count):
+        self._phase(None)
+        record = {
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "repo": self.repo_path,
+            "auto": self.auto,
+            "outcome": outcome,
+            "files": file_count,
+            "phases": self.timings,
+            "total": round(sum(self.timings.values()), 3),
+        }
+        _log_sync_timings(record)
+
+    def _collect_changes(self, extra_paths):
+        engine = _status_engine(self.repo_path)
+        if self.paths is None or len(self.paths) + len(extra_paths) > _STAGE_MAX_PATHSPECS:
+            return engine.status()
+        pathspecs = [f":(literal){p}" for p in sorted(set(self.paths) | set(extra_paths))]
+        if not pathspecs:
+            return GitChangeSet()
+        return engine.status(pathspecs)
+
+    def _on_push_progress(self, progress):
+        self._on_progress(progress.percent)
+        self._on_status(progress.describe())
+
+    def _on_hash_progress(self, done, total, path):
+        self._on_status(f"正在添加文件 ({done}/{total}): {os.path.basename(path)}")
 
     def run(self):
+        # 返回 (success, message)；outcome/queued/conflicts/large_blobs 说明失败的原因
+        try:
+            return self._run()
+        finally:
+            self._log_timings(self.outcome, self.file_count)
+
+    def _run(self):
         try:
-            self.status_signal.emit("正在连接 Git 仓库...")
+            self._phase("prepare")
+            self._on_status("正在连接 Git 仓库...")
             repo = Repo(self.repo_path)
             
             gitignore_path = os.path.join(self.repo_path, ".gitignore")
@@ -608,22 +2201,50 @@ class GitWorker(QThread):
             if need_write:
                 with open(gitignore_path, 'a', encoding='utf-8') as f:
                     f.write(f"\n{trash_ignore_rule}\n")
-
-            self.status_signal.emit("正在添加文件变更 (git add)...")
-            repo.git.add('--all')
-            
-            if repo.is_dirty() or repo.untracked_files:
-                self.status_signal.emit("正在提交更改 (git commit)...")
+            profile_changed = _ensure_repo_profile(self.repo_path)
+
+            self._phase("status")
+            self._on_status("正在检查文件变更 (git status)...")
+            extra_paths = [".gitignore"] if need_write else []
+            if profile_changed:
+                extra_paths.append(".gitattributes")
+            changes = self._collect_changes(extra_paths)
+            self.file_count = len(changes)
+            self._phase("stage")
+            self._on_status(f"正在添加 {len(changes)} 个文件变更...")
+            _stage_paths(self.repo_path, changes, on_progress=self._on_hash_progress)
+
+            self._phase("commit")
+            if _git_has_staged_changes(self.repo_path):
+                self._on_status("正在提交更改 (git commit)...")
                 timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                repo.index.commit(f"Update: {timestamp}")
+                _run_git_cli(self.repo_path, ["commit", "-q", "--no-verify", "-m", f"Update: {timestamp}"])
             else:
-                self.status_signal.emit("本地无变更，检查远程推送...")
-
-            self.status_signal.emit("正在同步至 GitHub (git push)...")
+                self._on_status("本地无变更，检查远程推送...")
+
+            self._phase("pull")
+            self._committed = True
+            self._on_status("正在获取远程变更 (git fetch)...")
+            pulled = _pull_remote(self.repo_path, proxy=_get_windows_inet_proxy(), strategy=self.conflict_strategy)
+            if pulled:
+                self._on_status(f"已合并远程的 {len(pulled)} 个文件变更")
+                self._on_pulled(pulled)
+
+            self._phase("check")
+            self._on_status("正在检查待推送的大文件...")
+            self.large_blobs = _scan_unpushed_blobs(self.repo_path)
+            oversized = [b for b in self.large_blobs if b["oversized"]]
+            if oversized:
+                self.outcome = "blocked"
+                return False, (f"发现 {len(oversized)} 个超过 GitHub 100MB 限制的文件，已在推送前停止：\n"
+                               f"{_describe_large_blobs(oversized)}")
+
+            self._phase("push")
+            self._on_status("正在同步至 GitHub (git push)...")
             proxy = _get_windows_inet_proxy()
             origin = repo.remote(name='origin')
             try:
-                _git_push_with_timeout(self.repo_path, proxy=proxy)
+                _git_push_with_timeout(self.repo_path, proxy=proxy, on_progress=self._on_push_progress)
             except GitCommandError as e:
                 err_msg = str(e)
                 needs_proxy_retry = (
@@ -637,34 +2258,952 @@ class GitWorker(QThread):
                 if needs_proxy_retry:
                     proxy = proxy or _get_windows_inet_proxy()
                     if proxy:
-                        self.status_signal.emit("æ£€æµ‹åˆ°ç³»ç»Ÿä»£ç†ï¼Œæ­£åœ¨å°è¯•ä»£ç†åŒæ­¥...")
-                        _git_push_with_timeout(self.repo_path, proxy=proxy)
+                        self._on_status("æ£€æµ‹åˆ°ç³»ç»Ÿä»£ç†ï¼Œæ­£åœ¨å°è¯•ä»£ç†åŒæ­¥...")
+                        _git_push_with_timeout(self.repo_path, proxy=proxy, on_progress=self._on_push_progress)
                     else:
                         raise
                 else:
                     raise
             
-            self.finished_signal.emit(True, "同步成功！所有变更已上传。")
+            if self.sync_queue is not None:
+                self.sync_queue.mark_done(self.repo_path)
+            self.outcome = "ok"
+            message = "同步成功！所有变更已上传。"
+            if self.large_blobs:
+                message += f"\n注意：{len(self.large_blobs)} 个文件接近 100MB 上限。"
+            return True, message
             
+        except SyncConflictError as e:
+            self.conflicts = e.paths
+            self.outcome = "conflict"
+            return False, f"远程与本地修改了相同的 {len(e.paths)} 个文件，同步已暂停。"
         except GitCommandError as e:
             err_msg = str(e)
-            if "Connection was reset" in err_msg or "Failed to connect" in err_msg or "128" in str(e.status):
+            if self._committed and self.sync_queue is not None and _is_network_error(err_msg):
+                # 提交已在本地完成，推送交由离线队列后台重试
+                entry = self.sync_queue.enqueue(self.repo_path, err_msg)
+                self.queued = True
+                self.outcome = "queued"
+                wait_sec = int(entry["next_retry_at"] - time.time())
+                return False, f"网络不可用，提交已保存在本地，将在 {wait_sec} 秒后自动重试上传。"
+            elif "Connection was reset" in err_msg or "Failed to connect" in err_msg or "128" in str(e.status):
                 tip = (
                     "\n\n【排查建议】\n"
                     "1. 请确保您的 VPN/代理处于全局模式。\n"
                     "2. 尝试在 Git Bash 中运行: git config --global http.proxy http://127.0.0.1:7890\n"
                     "3. 或尝试: git config --global --unset http.proxy 取消代理。"
                 )
-                self.finished_signal.emit(False, f"网络同步失败: {err_msg}{tip}")
+                return False, f"网络同步失败: {err_msg}{tip}"
+            return False, f"Git 操作失败: {err_msg}"
+        except Exception as e:
+            return False, f"未知错误: {str(e)}"
+
+class GitWorker(QThread):
+    status_signal = pyqtSignal(str) 
+    progress_signal = pyqtSignal(int)
+    pulled_signal = pyqtSignal(list)
+    finished_signal = pyqtSignal(bool, str)
+
+    def __init__(self, repo_path, paths=None, sync_queue=None, auto=False, conflict_strategy=None):
+        super().__init__()
+        self.repo_path = repo_path
+        self.auto = auto
+        self.sync = RepoSync(repo_path, paths=paths, sync_queue=sync_queue, auto=auto,
+                             conflict_strategy=conflict_strategy, on_status=self.status_signal.emit,
+                             on_progress=self.progress_signal.emit, on_pulled=self.pulled_signal.emit)
+
+    def run(self):
+        success, message = self.sync.run()
+        self.finished_signal.emit(success, message)
+
+class SyncAllWorker(QThread):
+    repo_status_signal = pyqtSignal(str, str)
+    repo_progress_signal = pyqtSignal(str, int)
+    repo_pulled_signal = pyqtSignal(str, list)
+    repo_finished_signal = pyqtSignal(str, bool, str)
+    finished_signal = pyqtSignal(list, int)
+
+    def __init__(self, repo_paths, sync_queue=None, max_workers=_SYNC_ALL_MAX_WORKERS):
+        super().__init__()
+        self.repo_paths = repo_paths
+        self.sync_queue = sync_queue
+        self.max_workers = max(1, min(max_workers, len(repo_paths)))
+
+    def _sync_one(self, repo_path):
+        # 回调里发本对象的信号，由 Qt 排队回到界面线程
+        if not os.path.isdir(os.path.join(repo_path, ".git")):
+            self.repo_finished_signal.emit(repo_path, False, "不是有效的 Git 仓库")
+            return False
+        sync = RepoSync(repo_path, sync_queue=self.sync_queue,
+                        on_status=lambda text: self.repo_status_signal.emit(repo_path, text),
+                        on_progress=lambda pct: self.repo_progress_signal.emit(repo_path, pct),
+                        on_pulled=lambda paths: self.repo_pulled_signal.emit(repo_path, paths))
+        success, message = sync.run()
+        if sync.outcome == "conflict":
+            message += "\n请切换到该仓库单独同步以处理冲突。"
+        elif sync.outcome == "blocked":
+            message += "\n请切换到该仓库单独同步以处理大文件。"
+        self.repo_finished_signal.emit(repo_path, success, message)
+        return success
+
+    def run(self):
+        succeeded = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._sync_one, path): path for path in self.repo_paths}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    if future.result():
+                        succeeded.append(futures[future])
+                except Exception as e:
+                    print(f"Sync-all task failed: {e}")
+        self.finished_signal.emit(succeeded, len(self.repo_paths))
+
+# --- 文件名索引 (file_archive.db) ---
+def _get_archive_db_path():
+    # 索引只对本机有效且频繁改写，放在用户数据目录；仓库里的 file_archive.db 只作为初始副本
+    path = os.path.join(_get_user_data_dir(), "file_archive.db")
+    if not os.path.exists(path):
+        bundled = _resource_path("file_archive.db")
+        try:
+            if os.path.exists(bundled):
+                shutil.copy2(bundled, path)
+        except Exception:
+            pass
+    if not getattr(sys, "frozen", False):
+        _purge_worktree_index(_resource_path("file_archive.db"))
+    return path
+
+_INDEX_TABLES = ("content_fts", "content_state", "name_fts", "name_keys", "dir_state", "file_index")
+
+def _purge_worktree_index(db_path):
+    # 旧版本把索引和 PDF 全文写进了仓库里的 file_archive.db，清掉后它只剩 archives 表
+    if not os.path.exists(db_path):
+        return
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            present = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            stale = [name for name in _INDEX_TABLES if name in present]
+            if not stale:
+                return
+            with conn:
+                for name in stale:
+                    conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Failed to clean index tables from {db_path}: {e}")
+
+_INDEX_SKIP_DIR_NAMES = {"PDF_url_Gemini"}
+
+def _is_hidden_entry(entry):
+    if entry.name.startswith("."):
+        return True
+    if platform.system() == "Windows":
+        try:
+            return bool(entry.stat(follow_symlinks=False).st_file_attributes & 0x2)
+        except Exception:
+            return False
+    return False
+
+# --- 拼音 / 模糊匹配 ---
+# GB2312 一级汉字按拼音排序，可据编码区间推出声母（未安装 pypinyin 时使用）
+_GB2312_INITIALS = (
+    (0xB0A1, "a"), (0xB0C5, "b"), (0xB2C1, "c"), (0xB4EE, "d"), (0xB6EA, "e"),
+    (0xB7A2, "f"), (0xB8C1, "g"), (0xB9FE, "h"), (0xBBF7, "j"), (0xBFA6, "k"),
+    (0xC0AC, "l"), (0xC2E8, "m"), (0xC4C3, "n"), (0xC5B6, "o"), (0xC5BE, "p"),
+    (0xC6DA, "q"), (0xC8BB, "r"), (0xC8F6, "s"), (0xCBFA, "t"), (0xCDDA, "w"),
+    (0xCEF4, "x"), (0xD1B9, "y"), (0xD4D1, "z"),
+)
+_NAME_KEY_SEP = "\x1f"
+_FUZZY_MIN_TOKEN_SIM = 0.45
+
+def _is_cjk(ch):
+    return "\u4e00" <= ch <= "\u9fff"
+
+def _hanzi_initial(ch):
+    try:
+        code = ch.encode("gb2312")
+    except UnicodeEncodeError:
+        return None
+    if len(code) != 2:
+        return None
+    value = (code[0] << 8) | code[1]
+    if value < 0xB0A1 or value > 0xD7F9:
+        return None
+    initial = None
+    for start, letter in _GB2312_INITIALS:
+        if value < start:
+            break
+        initial = letter
+    return initial
+
+def _pinyin_keys(name):
+    text = name.lower()
+    if not any(_is_cjk(ch) for ch in text):
+        return "", ""
+    full = []
+    initials = []
+    if lazy_pinyin is not None:
+        for ch in text:
+            if _is_cjk(ch):
+                syllable = lazy_pinyin(ch)[0] or ch
+                full.append(syllable)
+                initials.append(syllable[0])
+            else:
+                full.append(ch)
+                initials.append(ch)
+    else:
+        for ch in text:
+            initials.append((_hanzi_initial(ch) or ch) if _is_cjk(ch) else ch)
+    return "".join(full), "".join(initials)
+
+def _name_search_keys(name):
+    full, initials = _pinyin_keys(name)
+    return _NAME_KEY_SEP.join(k for k in (name.lower(), full, initials) if k)
+
+def _padded_trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _rank_name_match(tokens, name_lower, keys):
+    fields = keys.split(_NAME_KEY_SEP)
+    field_grams = None
+    total = 0.0
+    for token in tokens:
+        if name_lower.startswith(token):
+            score = 1.0
+        elif token in name_lower:
+            score = 0.9
+        elif token in keys:
+            score = 0.8
+        else:
+            if len(token) < 3:
+                return 0.0
+            if field_grams is None:
+                field_grams = set()
+                for field in fields:
+                    for word in re.findall(r"[^\W_]+", field):
+                        field_grams |= _padded_trigrams(word)
+            token_grams = _padded_trigrams(token)
+            sim = len(token_grams & field_grams) / len(token_grams)
+            if sim < _FUZZY_MIN_TOKEN_SIM:
+                return 0.0
+            score = 0.7 * sim
+        total += score
+    return total / len(tokens)
+
+class FileIndex:
+    def __init__(self, repo_path, db_path=None):
+        self.repo_path = os.path.abspath(repo_path)
+        self.db_path = db_path or _get_archive_db_path()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.fuzzy_enabled = False
+        self.generation = 0
+        self._last_reconcile = 0.0
+        self._row_cache = OrderedDict()
+        self._cloud_stamp = None
+        self._cloud_paths = {}
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS file_index (
+                    repo TEXT NOT NULL,
+                    rel_path TEXT NOT NULL,
+                    parent TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    name_lower TEXT NOT NULL,
+                    is_dir INTEGER NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    PRIMARY KEY (repo, rel_path)
+                );
+                CREATE INDEX IF NOT EXISTS idx_file_index_parent ON file_index(repo, parent);
+                CREATE TABLE IF NOT EXISTS dir_state (
+                    repo TEXT NOT NULL,
+                    rel_path TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    PRIMARY KEY (repo, rel_path)
+                );
+                CREATE TABLE IF NOT EXISTS name_keys (
+                    id INTEGER PRIMARY KEY,
+                    repo TEXT NOT NULL,
+                    rel_path TEXT NOT NULL,
+                    keys TEXT NOT NULL,
+                    UNIQUE (repo, rel_path)
+                );
+            """)
+            try:
+                self._conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS name_fts USING fts5(
+                        keys, content='name_keys', content_rowid='id', tokenize='trigram');
+                    CREATE TRIGGER IF NOT EXISTS name_keys_ai AFTER INSERT ON name_keys BEGIN
+                        INSERT INTO name_fts(rowid, keys) VALUES (new.id, new.keys);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS name_keys_ad AFTER DELETE ON name_keys BEGIN
+                        INSERT INTO name_fts(name_fts, rowid, keys) VALUES ('delete', old.id, old.keys);
+                    END;
+                """)
+                self.fuzzy_enabled = True
+            except sqlite3.OperationalError:
+                self.fuzzy_enabled = False
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+    def _abs(self, rel_path):
+        if not rel_path:
+            return self.repo_path
+        return os.path.join(self.repo_path, *rel_path.split("/"))
+
+    def _scan_dir(self, rel_dir):
+        entries = {}
+        try:
+            it = os.scandir(self._abs(rel_dir))
+        except OSError:
+            return None
+        with it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if is_dir and entry.name in _INDEX_SKIP_DIR_NAMES:
+                        continue
+                    if _is_hidden_entry(entry):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                entries[rel] = (entry.name, 1 if is_dir else 0, 0 if is_dir else st.st_size, st.st_mtime_ns)
+        return entries
+
+    def mark_stale(self):
+        # 文件系统有变动：让下一次搜索先 reconcile，并使按 generation 缓存的结果失效
+        with self._lock:
+            self._last_reconcile = 0.0
+            self._row_cache.clear()
+            self.generation += 1
+
+    def reconcile_if_stale(self, max_age=2.0, should_stop=None):
+        if time.monotonic() - self._last_reconcile < max_age:
+            return 0
+        return self.reconcile(should_stop=should_stop)
+
+    def reconcile(self, should_stop=None):
+        changed = 0
+        interrupted = False
+        repo = self.repo_path
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            changed += self._backfill_name_keys(cur)
+            stored_dirs = dict(cur.execute(
+                "SELECT rel_path, mtime_ns FROM dir_state WHERE repo=?", (repo,)))
+            seen_dirs = set()
+            stack = [""]
+            while stack:
+                if should_stop and should_stop():
+                    interrupted = True
+                    break
+                rel_dir = stack.pop()
+                try:
+                    dir_mtime = os.stat(self._abs(rel_dir)).st_mtime_ns
+                except OSError:
+                    continue
+                seen_dirs.add(rel_dir)
+                if stored_dirs.get(rel_dir) == dir_mtime:
+                    stack.extend(r for (r,) in cur.execute(
+                        "SELECT rel_path FROM file_index WHERE repo=? AND parent=? AND is_dir=1",
+                        (repo, rel_dir)))
+                    continue
+
+                entries = self._scan_dir(rel_dir)
+                if entries is None:
+                    seen_dirs.discard(rel_dir)
+                    continue
+                old = {r: (s, m) for r, s, m in cur.execute(
+                    "SELECT rel_path, size, mtime_ns FROM file_index WHERE repo=? AND parent=?",
+                    (repo, rel_dir))}
+                removed = [(repo, r) for r in old if r not in entries]
+                if removed:
+                    cur.executemany("DELETE FROM file_index WHERE repo=? AND rel_path=?", removed)
+                    cur.executemany("DELETE FROM name_keys WHERE repo=? AND rel_path=?", removed)
+                upserts = []
+                new_keys = []
+                for rel, (name, is_dir, size, mtime) in entries.items():
+                    if old.get(rel) != (size, mtime):
+                        upserts.append((repo, rel, rel_dir, name, name.lower(), is_dir, size, mtime))
+                    if rel not in old:
+                        new_keys.append((repo, rel, _name_search_keys(name)))
+                if new_keys:
+                    cur.executemany("DELETE FROM name_keys WHERE repo=? AND rel_path=?",
+                                    [(r, rel) for r, rel, _ in new_keys])
+                    cur.executemany("INSERT INTO name_keys (repo, rel_path, keys) VALUES (?, ?, ?)", new_keys)
+                if upserts:
+                    cur.executemany(
+                        "INSERT OR REPLACE INTO file_index "
+                        "(repo, rel_path, parent, name, name_lower, is_dir, size, mtime_ns) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", upserts)
+                cur.execute("INSERT OR REPLACE INTO dir_state (repo, rel_path, mtime_ns) VALUES (?, ?, ?)",
+                            (repo, rel_dir, dir_mtime))
+                changed += len(removed) + len(upserts)
+                stack.extend(rel for rel, v in entries.items() if v[1])
+
+            for rel_dir in (set() if interrupted else set(stored_dirs) - seen_dirs):
+                cur.execute("DELETE FROM dir_state WHERE repo=? AND rel_path=?", (repo, rel_dir))
+                cur.execute("DELETE FROM name_keys WHERE repo=? AND rel_path IN "
+                            "(SELECT rel_path FROM file_index WHERE repo=? AND parent=?)", (repo, repo, rel_dir))
+                cur.execute("DELETE FROM file_index WHERE repo=? AND parent=?", (repo, rel_dir))
+                changed += 1
+            if not interrupted:
+                changed += self._reconcile_cloud(cur, force=changed > 0)
+            if changed:
+                self.generation += 1
+                self._row_cache.clear()
+            if not interrupted:
+                self._last_reconcile = time.monotonic()
+        return changed
+
+    def _cloud_entries(self):
+        # 稀疏/部分克隆里只在云端的文件：索引中 skip-worktree 的条目及其上级目录，{相对路径: is_dir}
+        # ls-files 只在 .git/index 变化后重跑
+        if not _is_sparse_repo(self.repo_path):
+            self._cloud_stamp = None
+            self._cloud_paths = {}
+            return self._cloud_paths, False
+        try:
+            stamp = os.stat(os.path.join(self.repo_path, ".git", "index")).st_mtime_ns
+        except OSError:
+            stamp = None
+        if stamp is not None and stamp == self._cloud_stamp:
+            return self._cloud_paths, False
+        try:
+            skipped = _skip_worktree_paths(self.repo_path)
+        except GitCommandError as e:
+            print(f"Cloud entry listing failed: {e}")
+            return self._cloud_paths, False
+        paths = {}
+        for path in skipped:
+            parts = path.split("/")
+            if parts[0] in _INDEX_SKIP_DIR_NAMES or any(p.startswith(".") for p in parts):
+                continue
+            for i in range(1, len(parts)):
+                paths["/".join(parts[:i])] = 1
+            paths[path] = 0
+        self._cloud_stamp = stamp
+        self._cloud_paths = paths
+        return paths, True
+
+    def _reconcile_cloud(self, cur, force=False):
+        # 云端条目不在磁盘上，目录遍历找不到；以 mtime_ns 为空的行补进索引，文件名搜索照样能搜到
+        repo = self.repo_path
+        cloud, updated = self._cloud_entries()
+        if not (updated or force):
+            return 0
+        on_disk = {r for (r,) in cur.execute(
+            "SELECT rel_path FROM file_index WHERE repo=? AND mtime_ns IS NOT NULL", (repo,))}
+        stored = dict(cur.execute(
+            "SELECT rel_path, is_dir FROM file_index WHERE repo=? AND mtime_ns IS NULL", (repo,)))
+        wanted = {rel: is_dir for rel, is_dir in cloud.items() if rel not in on_disk}
+        removed = [(repo, rel) for rel, is_dir in stored.items() if wanted.get(rel) != is_dir]
+        added = [(rel, is_dir) for rel, is_dir in wanted.items() if stored.get(rel) != is_dir]
+        if removed:
+            cur.executemany("DELETE FROM file_index WHERE repo=? AND rel_path=?", removed)
+            cur.executemany("DELETE FROM name_keys WHERE repo=? AND rel_path=?", removed)
+        if added:
+            rows = []
+            for rel, is_dir in added:
+                parent, _, name = rel.rpartition("/")
+                rows.append((repo, rel, parent, name, name.lower(), is_dir))
+            cur.executemany("DELETE FROM name_keys WHERE repo=? AND rel_path=?", [(repo, r[1]) for r in rows])
+            cur.executemany(
+                "INSERT OR REPLACE INTO file_index (repo, rel_path, parent, name, name_lower, is_dir, size, mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?, ?, NULL, NULL)", rows)
+            cur.executemany("INSERT INTO name_keys (repo, rel_path, keys) VALUES (?, ?, ?)",
+                            [(repo, r[1], _name_search_keys(r[3])) for r in rows])
+        return len(removed) + len(added)
+
+    def _backfill_name_keys(self, cur):
+        missing = cur.execute(
+            "SELECT f.rel_path, f.name FROM file_index f WHERE f.repo=? AND NOT EXISTS "
+            "(SELECT 1 FROM name_keys k WHERE k.repo=f.repo AND k.rel_path=f.rel_path)",
+            (self.repo_path,)).fetchall()
+        if missing:
+            cur.executemany("INSERT INTO name_keys (repo, rel_path, keys) VALUES (?, ?, ?)",
+                            [(self.repo_path, rel, _name_search_keys(name)) for rel, name in missing])
+        return len(missing)
+
+    def _exact_match_cursor(self, tokens, limit=None):
+        # 排序与 _rank_name_match 对精确命中的打分一致：前缀 > 文件名包含 > 拼音/首字母键包含，其次目录优先、按名称
+        where = " AND ".join("instr(k.keys, ?) > 0" for _ in tokens)
+        score = " + ".join("CASE WHEN substr(f.name_lower, 1, ?) = ? THEN 10 "
+                           "WHEN instr(f.name_lower, ?) > 0 THEN 9 ELSE 8 END" for _ in tokens)
+        params = [self.repo_path, *tokens]
+        for token in tokens:
+            params += [len(token), token, token]
+        sql = ("SELECT f.rel_path, f.name, f.is_dir, k.keys FROM name_keys k JOIN file_index f "
+               f"ON f.repo=k.repo AND f.rel_path=k.rel_path WHERE k.repo=? AND {where} "
+               f"ORDER BY {score} DESC, f.is_dir DESC, f.name_lower")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self._conn.execute(sql, params)
+
+    def _cached_exact_matches(self, tokens):
+        key = " ".join(tokens)
+        rows = self._row_cache.get(key)
+        if rows is not None:
+            self._row_cache.move_to_end(key)
+            return rows
+        prefix = max((k for k in self._row_cache if key.startswith(k)), key=len, default=None)
+        if prefix is None:
+            return None
+        rows = [r for r in self._row_cache[prefix] if all(t in r[3] for t in tokens)]
+        self._remember_rows(key, rows)
+        return rows
+
+    def _remember_rows(self, key, rows, cache_size=32):
+        self._row_cache[key] = rows
+        while len(self._row_cache) > cache_size:
+            self._row_cache.popitem(last=False)
+
+    def _iter_exact_matches(self, tokens, batch_size, limit=None):
+        with self._lock:
+            rows = self._cached_exact_matches(tokens)
+        if rows is not None:
+            rows = sorted(rows, key=lambda r: (-_rank_name_match(tokens, r[1].lower(), r[3]), not r[2], r[1].lower()))
+            if limit:
+                rows = rows[:int(limit)]
+            for i in range(0, len(rows), batch_size):
+                yield rows[i:i + batch_size]
+            return
+        # 未命中缓存时直接按 SQL 排好的顺序分批读取，第一批结果不必等全部命中排完序
+        with self._lock:
+            cur = self._exact_match_cursor(tokens, limit)
+        collected = []
+        while True:
+            with self._lock:
+                batch = cur.fetchmany(batch_size)
+            if not batch:
+                break
+            collected.extend(batch)
+            yield batch
+        if not limit:
+            with self._lock:
+                self._remember_rows(" ".join(tokens), collected)
+
+    def _fuzzy_candidates(self, tokens, limit=500):
+        grams = set()
+        for token in tokens:
+            grams |= {token[i:i + 3] for i in range(len(token) - 2)}
+        if not grams:
+            return []
+        query = " OR ".join('"' + g.replace('"', '""') + '"' for g in sorted(grams))
+        return self._conn.execute(
+            "SELECT f.rel_path, f.name, f.is_dir, k.keys FROM name_fts "
+            "JOIN name_keys k ON k.id=name_fts.rowid "
+            "JOIN file_index f ON f.repo=k.repo AND f.rel_path=k.rel_path "
+            "WHERE name_fts MATCH ? AND k.repo=? ORDER BY rank LIMIT ?",
+            (query, self.repo_path, int(limit))).fetchall()
+
+    def iter_search(self, text, batch_size=200, limit=None, fuzzy=True):
+        tokens = (text or "").strip().lower().split()
+        if not tokens:
+            return
+        seen = set()
+        for batch in self._iter_exact_matches(tokens, batch_size, limit):
+            seen.update(r[0] for r in batch)
+            yield [(self._abs(rel), name, "", bool(is_dir)) for rel, name, is_dir, _ in batch]
+        if not (fuzzy and self.fuzzy_enabled and len(seen) < 50) or (limit and len(seen) >= limit):
+            return
+        with self._lock:
+            fuzzy_rows = self._fuzzy_candidates(tokens)
+        ranked = []
+        for rel, name, is_dir, keys in fuzzy_rows:
+            if rel in seen:
+                continue
+            score = _rank_name_match(tokens, name.lower(), keys)
+            if score > 0:
+                seen.add(rel)
+                ranked.append((-score, not is_dir, name.lower(), rel, name, is_dir))
+        ranked.sort()
+        if limit:
+            ranked = ranked[:int(limit) - (len(seen) - len(ranked))]
+        for i in range(0, len(ranked), batch_size):
+            yield [(self._abs(r[3]), r[4], "", bool(r[5])) for r in ranked[i:i + batch_size]]
+
+    def search(self, text, limit=None):
+        results = []
+        for batch in self.iter_search(text, limit=limit):
+            results.extend(batch)
+        return results
+
+class FileIndexWorker(QThread):
+    finished_signal = pyqtSignal(int)
+
+    def __init__(self, file_index):
+        super().__init__()
+        self.file_index = file_index
+
+    def run(self):
+        try:
+            changed = self.file_index.reconcile(should_stop=self.isInterruptionRequested)
+        except Exception as e:
+            print(f"File index reconcile failed: {e}")
+            changed = -1
+        self.finished_signal.emit(changed)
+
+# --- 全文索引 (FTS5) ---
+_CONTENT_INDEX_SUFFIXES = (".pdf", ".txt")
+_CONTENT_MAX_CHARS = 2 * 1024 * 1024
+_CONTENT_SHORT_TERM_LIMIT = 100
+
+def _extract_pdf_text(file_path, max_chars=_CONTENT_MAX_CHARS):
+    if QPdfDocument is None:
+        return ""
+    doc = QPdfDocument(None)
+    try:
+        if doc.load(file_path) != QPdfDocument.Error.None_:
+            return ""
+        parts = []
+        total = 0
+        for page in range(doc.pageCount()):
+            text = doc.getAllText(page).text()
+            parts.append(text)
+            total += len(text)
+            if total >= max_chars:
+                break
+        return "\n".join(parts)[:max_chars]
+    except Exception:
+        return ""
+    finally:
+        doc.close()
+
+def _extract_file_text(file_path):
+    if file_path.lower().endswith(".pdf"):
+        return _extract_pdf_text(file_path)
+    return _read_text_file_best_effort(file_path, max_bytes=16 * 1024 * 1024)[:_CONTENT_MAX_CHARS]
+
+def _fts_phrase_query(text):
+    terms = [t for t in (text or "").split() if t]
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+class ContentIndex:
+    def __init__(self, file_index):
+        self.file_index = file_index
+        self.repo_path = file_index.repo_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(file_index.db_path, check_same_thread=False)
+        self.trigram = True
+        self.generation = 0
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS content_state (
+                    repo TEXT NOT NULL,
+                    rel_path TEXT NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    fts_rowid INTEGER,
+                    PRIMARY KEY (repo, rel_path)
+                )
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(content_state)")}
+            if "fts_rowid" not in columns:
+                self._conn.execute("ALTER TABLE content_state ADD COLUMN fts_rowid INTEGER")
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5("
+                    "repo UNINDEXED, rel_path UNINDEXED, name, body, tokenize='trigram')")
+            except sqlite3.OperationalError:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5("
+                    "repo UNINDEXED, rel_path UNINDEXED, name, body)")
+            row = self._conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name='content_fts'").fetchone()
+            self.trigram = bool(row and "trigram" in row[0])
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+    def _candidates(self):
+        with self.file_index._lock:
+            rows = self.file_index._conn.execute(
+                "SELECT rel_path, name FROM file_index WHERE repo=? AND is_dir=0 AND mtime_ns IS NOT NULL",
+                (self.repo_path,)).fetchall()
+        return [(rel, name) for rel, name in rows if name.lower().endswith(_CONTENT_INDEX_SUFFIXES)]
+
+    def pending(self):
+        with self._lock:
+            state = {rel: (size, mtime) for rel, size, mtime in self._conn.execute(
+                "SELECT rel_path, size, mtime_ns FROM content_state WHERE repo=?", (self.repo_path,))}
+        todo = []
+        alive = set()
+        for rel, name in self._candidates():
+            try:
+                st = os.stat(self.file_index._abs(rel))
+            except OSError:
+                continue
+            if st.st_size == 0:
+                continue
+            alive.add(rel)
+            if state.get(rel) != (st.st_size, st.st_mtime_ns):
+                todo.append((rel, name, st.st_size, st.st_mtime_ns))
+        removed = [rel for rel in state if rel not in alive]
+        return todo, removed
+
+    def _delete_fts_row(self, rel):
+        # repo/rel_path 是 UNINDEXED 列，按它们删除会全表扫描；按 content_state 里记下的 rowid 删除
+        row = self._conn.execute("SELECT fts_rowid FROM content_state WHERE repo=? AND rel_path=?",
+                                 (self.repo_path, rel)).fetchone()
+        if row is None:
+            return
+        if row[0] is not None:
+            self._conn.execute("DELETE FROM content_fts WHERE rowid=?", (row[0],))
+        else:
+            self._conn.execute("DELETE FROM content_fts WHERE repo=? AND rel_path=?", (self.repo_path, rel))
+
+    def remove(self, rel_paths):
+        if not rel_paths:
+            return
+        with self._lock, self._conn:
+            self.generation += 1
+            for rel in rel_paths:
+                self._delete_fts_row(rel)
+                self._conn.execute("DELETE FROM content_state WHERE repo=? AND rel_path=?", (self.repo_path, rel))
+
+    def store(self, rel, name, size, mtime_ns, body):
+        with self._lock, self._conn:
+            self.generation += 1
+            self._delete_fts_row(rel)
+            cur = self._conn.execute("INSERT INTO content_fts (repo, rel_path, name, body) VALUES (?, ?, ?, ?)",
+                                     (self.repo_path, rel, name, body))
+            self._conn.execute("INSERT OR REPLACE INTO content_state (repo, rel_path, size, mtime_ns, fts_rowid) "
+                               "VALUES (?, ?, ?, ?, ?)", (self.repo_path, rel, size, mtime_ns, cur.lastrowid))
+
+    def search(self, text, limit=200):
+        text = (text or "").strip()
+        if not text:
+            return []
+        short = self.trigram and any(len(t) < 3 for t in text.split())
+        with self._lock:
+            if short:
+                # 不足 3 个字的词用不了 trigram 索引：较长的词仍走 MATCH 缩小范围，短词再逐条 instr 过滤
+                terms = text.split()
+                short_terms = [t for t in terms if len(t) < 3]
+                long_terms = [t for t in terms if len(t) >= 3]
+                where = " AND ".join("instr(lower(body), ?) > 0" for _ in short_terms)
+                match_sql, match_params = "", []
+                if long_terms:
+                    match_sql = "content_fts MATCH ? AND "
+                    match_params = [_fts_phrase_query(" ".join(long_terms))]
+                rows = self._conn.execute(
+                    f"SELECT rel_path, name, body FROM content_fts WHERE {match_sql}repo=? AND {where} LIMIT ?",
+                    [*match_params, self.repo_path, *[t.lower() for t in short_terms],
+                     int(min(limit, _CONTENT_SHORT_TERM_LIMIT))]).fetchall()
+                results = [(rel, name, self._make_snippet(body, terms[0])) for rel, name, body in rows]
+            else:
+                rows = self._conn.execute(
+                    "SELECT rel_path, name, snippet(content_fts, 3, '【', '】', '…', 48) "
+                    "FROM content_fts WHERE content_fts MATCH ? AND repo=? ORDER BY rank LIMIT ?",
+                    (_fts_phrase_query(text), self.repo_path, int(limit))).fetchall()
+                results = rows
+        return [(self.file_index._abs(rel), name, " ".join((snippet or "").split()), False)
+                for rel, name, snippet in results]
+
+    def iter_search(self, text, batch_size=50, limit=200):
+        results = self.search(text, limit=limit)
+        for i in range(0, len(results), batch_size):
+            yield results[i:i + batch_size]
+
+    @staticmethod
+    def _make_snippet(body, term, width=40):
+        pos = body.lower().find(term.lower())
+        if pos < 0:
+            return ""
+        start = max(0, pos - width)
+        end = min(len(body), pos + len(term) + width)
+        return ("…" if start else "") + body[start:pos] + "【" + body[pos:pos + len(term)] + "】" + body[pos + len(term):end] + ("…" if end < len(body) else "")
+
+class ContentIndexWorker(QThread):
+    progress_signal = pyqtSignal(int, int)
+    finished_signal = pyqtSignal(int)
+
+    def __init__(self, content_index):
+        super().__init__()
+        self.content_index = content_index
+
+    def run(self):
+        done = 0
+        try:
+            self.content_index.file_index.reconcile(should_stop=self.isInterruptionRequested)
+            todo, removed = self.content_index.pending()
+            self.content_index.remove(removed)
+            total = len(todo)
+            for rel, name, size, mtime_ns in todo:
+                if self.isInterruptionRequested():
+                    break
+                self.progress_signal.emit(done, total)
+                body = _extract_file_text(self.content_index.file_index._abs(rel))
+                self.content_index.store(rel, name, size, mtime_ns, body)
+                done += 1
+        except Exception as e:
+            print(f"Content index failed: {e}")
+        self.finished_signal.emit(done)
+
+class SearchWorker(QThread):
+    batch_signal = pyqtSignal(int, list)
+    finished_signal = pyqtSignal(int, int, float, bool)
+
+    def __init__(self, generation, text, file_index, content_index=None, content_mode=False, batch_size=200):
+        super().__init__()
+        self.generation = generation
+        self.text = text
+        self.file_index = file_index
+        self.content_index = content_index
+        self.content_mode = content_mode
+        self.batch_size = batch_size
+
+    def run(self):
+        start = time.perf_counter()
+        count = 0
+        try:
+            if self.content_mode:
+                batches = self.content_index.iter_search(self.text) if self.content_index else []
             else:
-                self.finished_signal.emit(False, f"Git 操作失败: {err_msg}")
+                self.file_index.reconcile_if_stale(should_stop=self.isInterruptionRequested)
+                batches = self.file_index.iter_search(self.text, batch_size=self.batch_size)
+            for batch in batches:
+                if self.isInterruptionRequested():
+                    break
+                count += len(batch)
+                self.batch_signal.emit(self.generation, batch)
         except Exception as e:
-            self.finished_signal.emit(False, f"未知错误: {str(e)}")
+            print(f"Search failed: {e}")
+        self.finished_signal.emit(self.generation, count, time.perf_counter() - start,
+                                  self.isInterruptionRequested())
+
+class SearchResultsModel(QAbstractListModel):
+    FETCH_BATCH = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._results = []
+        self._loaded = 0
+        self._icon_provider = QFileIconProvider()
+        self._icon_cache = {}
+
+    def clear(self):
+        self.beginResetModel()
+        self._results = []
+        self._loaded = 0
+        self.endResetModel()
+
+    def append_results(self, batch):
+        self._results.extend(batch)
+        if self._loaded < self.FETCH_BATCH:
+            self.fetchMore(QModelIndex())
+
+    def total_count(self):
+        return len(self._results)
+
+    def results(self):
+        return list(self._results)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._loaded < len(self._results)
+
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_BATCH, len(self._results) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        full_path, name, snippet, is_dir = self._results[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{name}\n{snippet}" if snippet else name
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._icon_for(full_path, name, is_dir)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return snippet or full_path
+        if role == Qt.ItemDataRole.UserRole:
+            return full_path
+        return None
+
+    def _icon_for(self, full_path, name, is_dir):
+        key = "<dir>" if is_dir else os.path.splitext(name)[1].lower()
+        icon = self._icon_cache.get(key)
+        if icon is None:
+            if is_dir:
+                icon = self._icon_provider.icon(QFileIconProvider.IconType.Folder)
+            else:
+                icon = self._icon_provider.icon(QFileInfo(full_path))
+            self._icon_cache[key] = icon
+        return icon
 
 class FolderPriorityProxyModel(QSortFilterProxyModel):
+    placeholderFetchRequested = pyqtSignal(str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._hidden_dir_names = {"PDF_url_Gemini"}
+        self._placeholder_dirs = set()
+
+    def set_placeholder_dirs(self, repo_path, rel_dirs):
+        root = QDir.fromNativeSeparators(os.path.abspath(repo_path)).rstrip("/")
+        self._placeholder_dirs = {f"{root}/{rel}" for rel in rel_dirs}
+
+    def _placeholder_path(self, parent):
+        if not self._placeholder_dirs or not parent.isValid():
+            return None
+        path = self.sourceModel().filePath(self.mapToSource(parent))
+        return path if path in self._placeholder_dirs else None
+
+    def hasChildren(self, parent=QModelIndex()):
+        if self._placeholder_path(parent):
+            return True
+        return super().hasChildren(parent)
+
+    def canFetchMore(self, parent):
+        if self._placeholder_path(parent):
+            return True
+        return super().canFetchMore(parent)
+
+    def fetch_placeholder(self, parent):
+        # 未检出的文件夹在展开时才写出下一层占位
+        path = self._placeholder_path(parent)
+        if not path:
+            return False
+        self._placeholder_dirs.discard(path)
+        self.placeholderFetchRequested.emit(path)
+        return True
+
+    def fetchMore(self, parent):
+        self.fetch_placeholder(parent)
+        super().fetchMore(parent)
 
     def filterAcceptsRow(self, source_row, source_parent):
         model = self.sourceModel()
@@ -688,13 +3227,120 @@ class FolderPriorityProxyModel(QSortFilterProxyModel):
 
         return super().lessThan(source_left, source_right)
 
+# --- 文件 Git 状态标记 ---
+GIT_STATUS_ROLE = Qt.ItemDataRole.UserRole + 1
+_STATUS_PRIORITY = {"U": 6, "D": 5, "M": 4, "T": 4, "R": 3, "C": 3, "A": 2, "?": 1}
+_STATUS_COLORS = {
+    "U": "#FF5252", "D": "#FF5252", "M": "#FFD700", "T": "#FFD700",
+    "R": "#4FC3F7", "C": "#4FC3F7", "A": "#4CAF50", "?": "#4CAF50",
+}
+_STATUS_LABELS = {
+    "U": "冲突", "D": "已删除", "M": "已修改", "T": "类型变更",
+    "R": "已重命名", "C": "已复制", "A": "已暂存新增", "?": "新文件（未上传）",
+}
+
+class SearchResultDelegate(QStyledItemDelegate):
+    # 结果行有一行（仅文件名）或两行（文件名+摘要）；统一按两行高度，才能保留 setUniformItemSizes 的性能
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        two_lines = option.fontMetrics.lineSpacing() * 2 + 8
+        return QSize(size.width(), max(size.height(), two_lines))
+
+class StatusBadgeDelegate(QStyledItemDelegate):
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        if index.column() != 0:
+            return
+        code = index.data(GIT_STATUS_ROLE)
+        if not code:
+            return
+        badge = "●" if code == "?" else code
+        painter.save()
+        painter.setPen(QColor(_STATUS_COLORS.get(code, "#FFD700")))
+        rect = option.rect.adjusted(0, 0, -6, 0)
+        painter.drawText(rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, badge)
+        painter.restore()
+
 class CustomFileSystemModel(QFileSystemModel):
+    statusMapChanged = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._status_files = {}
+        self._status_dirs = {}
+        self._status_colors = {code: QColor(color) for code, color in _STATUS_COLORS.items()}
+        self._placeholders = set()
+        self._placeholder_color = QColor("#808080")
+
+    def set_placeholders(self, repo_path, rel_paths):
+        root = QDir.fromNativeSeparators(os.path.abspath(repo_path)).rstrip("/")
+        self._placeholders = {f"{root}/{rel}" for rel in rel_paths}
+        self.statusMapChanged.emit()
+
+    def is_placeholder(self, index):
+        return bool(self._placeholders) and self.filePath(index) in self._placeholders
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.is_placeholder(index):
+            # 占位文件只能先下载再改名/拖动，否则会把 0 字节文件当成新文件提交
+            flags &= ~(Qt.ItemFlag.ItemIsEditable | Qt.ItemFlag.ItemIsDragEnabled)
+        return flags
+
+    def set_status_map(self, repo_path, changes):
+        root = QDir.fromNativeSeparators(os.path.abspath(repo_path)).rstrip("/")
+        files = {}
+        dirs = {}
+        for rel, code in changes.items():
+            rel = rel.rstrip("/")
+            files[f"{root}/{rel}"] = code
+            rank = _STATUS_PRIORITY.get(code, 0)
+            parent = rel.rpartition("/")[0]
+            while parent:
+                key = f"{root}/{parent}"
+                current = dirs.get(key)
+                if current is not None and _STATUS_PRIORITY.get(current, 0) >= rank:
+                    break
+                dirs[key] = code
+                parent = parent.rpartition("/")[0]
+        self._status_files = files
+        self._status_dirs = dirs
+        self.statusMapChanged.emit()
+
+    def _status_for(self, index):
+        if not self._status_files:
+            return None
+        path = self.filePath(index)
+        code = self._status_files.get(path)
+        if code is None and self.isDir(index):
+            code = self._status_dirs.get(path)
+        return code
+
     def data(self, index, role):
+        if role == GIT_STATUS_ROLE:
+            return self._status_for(index)
+        if role == Qt.ItemDataRole.ForegroundRole:
+            code = self._status_for(index)
+            if code:
+                return self._status_colors.get(code)
+            if self.is_placeholder(index):
+                return self._placeholder_color
+        elif role == Qt.ItemDataRole.ToolTipRole and index.column() == 0:
+            if self.is_placeholder(index):
+                if self.isDir(index):
+                    return f"{self.fileName(index)}\n未检出到本地，展开可浏览"
+                return f"{self.fileName(index)}\n仅在云端，双击下载"
+            code = self._status_for(index)
+            if code:
+                label = _STATUS_LABELS.get(code, "已变更")
+                return f"{self.fileName(index)}\n{'包含变更: ' if self.isDir(index) else ''}{label}"
         if role == Qt.ItemDataRole.DisplayRole:
             if index.column() == 1: # Size
                 size = self.size(index)
                 if self.isDir(index):
                     return ""
+                if self.is_placeholder(index):
+                    return "云端"
                 if size < 1024:
                     return f"{size} B"
                 elif size < 1024 * 1024:
@@ -708,12 +3354,704 @@ class CustomFileSystemModel(QFileSystemModel):
         
         return super().data(index, role)
 
+# --- Ghostscript 后台压缩队列 ---
+_GS_PAGES_RE = re.compile(r"Processing pages (\d+) through (\d+)")
+_GS_PAGE_RE = re.compile(r"^Page (\d+)")
+
+def _downsample_args(dpi):
+    return ("-dDownsampleColorImages=true", "-dColorImageDownsampleType=/Bicubic", f"-dColorImageResolution={dpi}",
+            "-dDownsampleGrayImages=true", "-dGrayImageDownsampleType=/Bicubic", f"-dGrayImageResolution={dpi}")
+
+# (名称, PDFSETTINGS, 图片目标 DPI, 额外参数)；自适应模式并行跑满足 DPI 下限的全部方案，取最小的输出
+_COMPRESSION_PROFILES = [
+    ("printer", "/printer", 300, ()),
+    ("printer-200", "/printer", 200, _downsample_args(200)),
+    ("ebook", "/ebook", 150, ()),
+    ("ebook-120", "/ebook", 120, _downsample_args(120)),
+    ("screen-96", "/screen", 96, _downsample_args(96)),
+    ("screen", "/screen", 72, ()),
+]
+
+def _compression_profile(name):
+    return next(p for p in _COMPRESSION_PROFILES if p[0] == name)
+
+def _profiles_for_dpi_floor(dpi_floor):
+    return [p for p in _COMPRESSION_PROFILES if p[2] >= dpi_floor] or [_COMPRESSION_PROFILES[0]]
+
+# --- PDF 预检：只扫描对象表和图片流字典，不渲染、不解码图片 ---
+PREFLIGHT_MIN_GAIN = 0.9
+_PDF_OBJ_RE = re.compile(rb"(\d+)\s+(\d+)\s+obj\b\s*")
+_PDF_MEDIABOX_RE = re.compile(rb"/MediaBox\s*\[\s*([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)")
+_PDF_PAGE_RE = re.compile(rb"/Type\s*/Page\b")
+_PDF_FONTFILE_RE = re.compile(rb"/Length1\b|/Subtype\s*/(?:Type1C|CIDFontType0C|OpenType)\b")
+_PDF_LOSSY_FILTERS = {b"DCTDecode", b"JPXDecode", b"JBIG2Decode", b"CCITTFaxDecode"}
+_PDF_REF_RE = re.compile(rb"/([^\s/\[\]<>(){}%]+)\s*(\d+)\s+\d+\s+R\b")
+_PDF_CONTENT_SKIP_RE = re.compile(rb"/Type\s*/(?:ObjStm|XRef|Metadata|EmbeddedFile)\b|/Subtype\s*/(?!Form\b)")
+_PDF_CONTENT_OP_RE = re.compile(
+    rb"((?:[-+]?(?:\d+\.?\d*|\.\d+)\s+){6})cm\b|(?<!\S)([qQ])(?!\S)|/([^\s/\[\]<>(){}%]+)\s*Do\b")
+_PDF_CONTENT_MAX = 16 * 1024 * 1024
+_PDF_MATRIX_RE = re.compile(rb"/Matrix\s*\[\s*((?:[-+]?(?:\d+\.?\d*|\.\d+)\s*){6})\]")
+_PDF_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+def _pdf_dict_end(data, start):
+    depth = 0
+    pos = start
+    while True:
+        open_pos = data.find(b"<<", pos)
+        close_pos = data.find(b">>", pos)
+        if close_pos < 0:
+            return -1
+        if 0 <= open_pos < close_pos:
+            depth += 1
+            pos = open_pos + 2
+        else:
+            depth -= 1
+            pos = close_pos + 2
+            if depth == 0:
+                return pos
+
+def _pdf_int(obj_dict, key):
+    match = re.search(rb"/" + key + rb"\s+(\d+)\b(?!\s+\d+\s+R)", obj_dict)
+    return int(match.group(1)) if match else None
+
+def _pdf_objects(data):
+    # 逐个对象跳读：有流的对象按 /Length 直接跳过数据区，避免在二进制内容里误匹配
+    pos = 0
+    size = len(data)
+    while True:
+        match = _PDF_OBJ_RE.search(data, pos)
+        if not match:
+            return
+        body = match.end()
+        if data[body:body + 2] != b"<<":
+            pos = body
+            continue
+        end = _pdf_dict_end(data, body)
+        if end < 0:
+            return
+        obj_dict = data[body:end]
+        after = end
+        while after < size and data[after:after + 1] in b" \t\r\n":
+            after += 1
+        if data[after:after + 6] != b"stream":
+            yield int(match.group(1)), obj_dict, -1, -1
+            pos = end
+            continue
+        start = after + 6
+        if data[start:start + 2] == b"\r\n":
+            start += 2
+        elif data[start:start + 1] in b"\r\n":
+            start += 1
+        length = _pdf_int(obj_dict, b"Length")
+        if length is not None and data.find(b"endstream", start + length, start + length + 32) >= 0:
+            stop = start + length
+        else:
+            stop = data.find(b"endstream", start)
+            if stop < 0:
+                return
+        yield int(match.group(1)), obj_dict, start, stop
+        pos = stop
+
+def _pdf_stream_text(data, obj_dict, start, stop):
+    # 只处理未压缩或单层 FlateDecode 的流
+    if re.search(rb"/Filter\s*(?:/FlateDecode|\[\s*/FlateDecode\s*\])", obj_dict):
+        try:
+            return zlib.decompressobj().decompress(data[start:stop], _PDF_CONTENT_MAX)
+        except zlib.error:
+            return b""
+    if b"/Filter" in obj_dict:
+        return b""
+    return data[start:stop]
+
+def _pdf_concat(m, ctm):
+    a, b, c, d, e, f = m
+    ca, cb, cc, cd, ce, cf = ctm
+    return (a * ca + b * cc, a * cb + b * cd, c * ca + d * cc, c * cb + d * cd,
+            e * ca + f * cc + ce, e * cb + f * cd + cf)
+
+def _pdf_content_draws(content):
+    # 跟踪 q/Q/cm，返回每次 Do 的 (XObject 名字, 当时的变换矩阵)
+    ctm = _PDF_IDENTITY
+    stack = []
+    draws = []
+    for match in _PDF_CONTENT_OP_RE.finditer(content):
+        numbers, op, name = match.groups()
+        if numbers:
+            ctm = _pdf_concat(tuple(float(v) for v in numbers.split()), ctm)
+        elif op == b"q":
+            stack.append(ctm)
+        elif op == b"Q":
+            if stack:
+                ctm = stack.pop()
+        else:
+            draws.append((name, ctm))
+    return draws
+
+def _pdf_image_sizes(draws, forms, refs, images):
+    # 从页面内容流出发，穿过表单 XObject（叠加表单 /Matrix 和外层矩阵），得到每张图片画出的最大宽高（pt）
+    targets = {}
+    for num, names in refs.items():
+        for name in names:
+            targets.setdefault(name, set()).add(num)
+    flat = {}
+
+    def flatten(num, depth):
+        if num in flat:
+            return flat[num]
+        flat[num] = []
+        placed = []
+        for name, ctm in draws.get(num, ()):
+            for target in targets.get(name, ()):
+                if target in images:
+                    placed.append((target, ctm))
+                elif target in forms and depth < 8:
+                    outer = _pdf_concat(forms[target], ctm)
+                    placed.extend((image, _pdf_concat(inner, outer)) for image, inner in flatten(target, depth + 1))
+        flat[num] = placed
+        return placed
+
+    reached = {t for uses in draws.values() for name, _ in uses for t in targets.get(name, ()) if t in forms}
+    sizes = {}
+    for num in draws:
+        if num in forms and num in reached:
+            continue
+        for image, m in flatten(num, 0):
+            width = (m[0] ** 2 + m[1] ** 2) ** 0.5
+            height = (m[2] ** 2 + m[3] ** 2) ** 0.5
+            old_w, old_h = sizes.get(image, (0.0, 0.0))
+            sizes[image] = (max(old_w, width), max(old_h, height))
+    return sizes
+
+def _preflight_pdf(path):
+    file_bytes = os.path.getsize(path)
+    report = {"file_bytes": file_bytes, "pages": 0, "images": [], "image_bytes": 0, "font_bytes": 0,
+              "effective_dpi": 0, "dpi_lower_bound": False}
+    if file_bytes == 0:
+        return report
+    page_box = None
+    images = {}
+    refs = {}
+    draws = {}
+    forms = {}
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for num, obj_dict, start, stop in _pdf_objects(data):
+            texts = [obj_dict]
+            if start >= 0 and re.search(rb"/Type\s*/ObjStm", obj_dict):
+                # 页面字典可能被压进对象流，只解压这一类小流
+                try:
+                    texts.append(zlib.decompress(data[start:stop]))
+                except zlib.error:
+                    pass
+            for text in texts:
+                report["pages"] += len(_PDF_PAGE_RE.findall(text))
+                if page_box is None:
+                    box = _PDF_MEDIABOX_RE.search(text)
+                    if box:
+                        x0, y0, x1, y1 = (float(v) for v in box.groups())
+                        page_box = (abs(x1 - x0), abs(y1 - y0))
+                # 资源字典里的 名字 -> 对象号，用来把 Do 的名字对回图片
+                for name, ref in _PDF_REF_RE.findall(text):
+                    refs.setdefault(int(ref), set()).add(name)
+            if start < 0:
+                continue
+            if re.search(rb"/Subtype\s*/Image\b", obj_dict):
+                filt = re.search(rb"/Filter\s*\[?\s*/(\w+)", obj_dict)
+                images[num] = {
+                    "width": _pdf_int(obj_dict, b"Width") or 0,
+                    "height": _pdf_int(obj_dict, b"Height") or 0,
+                    "bpc": _pdf_int(obj_dict, b"BitsPerComponent") or 8,
+                    "filter": filt.group(1) if filt else b"",
+                    "bytes": stop - start,
+                }
+                report["image_bytes"] += stop - start
+            elif _PDF_FONTFILE_RE.search(obj_dict):
+                report["font_bytes"] += stop - start
+            elif not _PDF_CONTENT_SKIP_RE.search(obj_dict) and stop - start <= _PDF_CONTENT_MAX:
+                # 页面内容流和表单流：从 cm 矩阵读出图片实际画出的尺寸
+                if re.search(rb"/Subtype\s*/Form\b", obj_dict):
+                    matrix = _PDF_MATRIX_RE.search(obj_dict)
+                    forms[num] = tuple(float(v) for v in matrix.group(1).split()) if matrix else _PDF_IDENTITY
+                content = _pdf_stream_text(data, obj_dict, start, stop)
+                if b"Do" in content:
+                    draws[num] = _pdf_content_draws(content)
+    drawn = _pdf_image_sizes(draws, forms, refs, images)
+    page_w, page_h = page_box or (595.0, 842.0)
+    page_long_in = max(page_w, page_h, 1.0) / 72
+    dpis = []
+    for num, image in images.items():
+        drawn_w, drawn_h = drawn.get(num, (0.0, 0.0))
+        image["dpi_known"] = drawn_w >= 1 and drawn_h >= 1
+        if image["dpi_known"]:
+            image["dpi"] = min(image["width"] / drawn_w, image["height"] / drawn_h) * 72
+        else:
+            # 找不到绘制位置时按铺满页面估算，这只是有效 DPI 的下限
+            image["dpi"] = max(image["width"], image["height"]) / page_long_in
+        report["images"].append(image)
+        if min(image["width"], image["height"]) >= 64:
+            dpis.append(image["dpi"])
+            if not image["dpi_known"]:
+                report["dpi_lower_bound"] = True
+    report["effective_dpi"] = int(statistics.median(dpis)) if dpis else 0
+    return report
+
+def _preflight_predict(report, profile, optimistic=False):
+    target_dpi = profile[2]
+    images = 0.0
+    for image in report["images"]:
+        size = image["bytes"]
+        if image["bpc"] >= 8:
+            if optimistic and not image["dpi_known"]:
+                # DPI 只有下限时实际可能高得多，乐观估计按几乎可以全部压掉算
+                continue
+            # gs 预设的下采样阈值是 1.5 倍目标分辨率
+            if image["dpi"] > target_dpi * 1.5:
+                size *= (target_dpi / image["dpi"]) ** 2
+            if image["filter"] not in _PDF_LOSSY_FILTERS:
+                size *= 0.3
+        images += size
+    return int(report["file_bytes"] - report["image_bytes"] + images)
+
+def _preflight_advice(report, profiles):
+    # 返回 (值得压缩的方案列表, 预计最小体积)；列表为空表示直接跳过压缩
+    # 只有乐观估计也达不到收益门槛时才跳过，DPI 下限不能成为跳过的理由
+    predictions = {p[0]: _preflight_predict(report, p) for p in profiles}
+    limit = report["file_bytes"] * PREFLIGHT_MIN_GAIN
+    worthwhile = [p for p in profiles if _preflight_predict(report, p, optimistic=True) <= limit]
+    best = min(predictions.values()) if predictions else report["file_bytes"]
+    return worthwhile, best
+
+def _describe_preflight(report, best, worthwhile):
+    mb = 1024 * 1024
+    approx = "≥" if report["dpi_lower_bound"] else "≈"
+    text = (f"图片 {len(report['images'])} 张 {approx}{report['effective_dpi']} DPI，"
+            f"字体 {report['font_bytes'] / mb:.1f}MB")
+    if not worthwhile:
+        return text + f"，预计只能压到 {best / mb:.1f}MB，跳过压缩"
+    best_name = min(worthwhile, key=lambda p: _preflight_predict(report, p))[0]
+    arrow = "≤" if report["dpi_lower_bound"] else "→"
+    return text + f"，预计 {arrow} {best / mb:.1f}MB（推荐 {best_name}）"
+
+def _ghostscript_args(input_path, output_path, settings="/screen", quiet=True, extra_args=()):
+    args = [GS_CMD, "-sDEVICE=pdfwrite", "-dCompatibilityLevel=1.4", f"-dPDFSETTINGS={settings}",
+            *extra_args, "-dNOPAUSE", "-dBATCH"]
+    if quiet:
+        args.append("-dQUIET")
+    return args + [f"-sOutputFile={output_path}", input_path]
+
+def _ghostscript_settings_key(settings, extra_args=()):
+    # 输入/输出路径以外的全部参数都参与缓存键，参数变化后旧缓存自然失效
+    args = _ghostscript_args("", "", settings, extra_args=extra_args)
+    return " ".join(a for a in args[1:] if a and not a.startswith("-sOutputFile="))
+
+def _run_ghostscript(input_path, output_path, settings="/screen", extra_args=(), on_progress=None, on_process=None):
+    startupinfo = None
+    creationflags = 0
+    if platform.system() == 'Windows':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    proc = subprocess.Popen(
+        _ghostscript_args(input_path, output_path, settings, quiet=False, extra_args=extra_args),
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+        text=True, errors="replace", startupinfo=startupinfo, creationflags=creationflags,
+    )
+    if on_process:
+        on_process(proc)
+    first_page, total = 1, 0
+    tail = []
+    for line in proc.stdout:
+        line = line.strip()
+        match = _GS_PAGES_RE.search(line)
+        if match:
+            first_page = int(match.group(1))
+            total = int(match.group(2)) - first_page + 1
+            continue
+        match = _GS_PAGE_RE.match(line)
+        if match and total > 0:
+            if on_progress:
+                done = int(match.group(1)) - first_page + 1
+                on_progress(min(99, int(done * 100 / total)))
+        elif line:
+            tail = (tail + [line])[-5:]
+    proc.wait()
+    return proc.returncode, "\n".join(tail) or f"gs exit code {proc.returncode}"
+
+def _log_compression_stats(record):
+    try:
+        with open(COMPRESSION_STATS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except Exception as e:
+        print(f"Compression stats log failed: {e}")
+
+class CompressionCache:
+    # 以 sha256(源文件内容) + gs 参数为键，按最近使用时间 (mtime) 做 LRU 淘汰
+    def __init__(self, cache_dir=COMPRESSION_CACHE_DIR, max_bytes=COMPRESSION_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hashes = {}
+
+    def source_hash(self, path):
+        st = os.stat(path)
+        stamp = (os.path.normcase(os.path.abspath(path)), st.st_size, st.st_mtime_ns)
+        cached = self._hashes.get(stamp)
+        if cached:
+            return cached
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self._hashes[stamp] = digest
+        return digest
+
+    def key(self, input_path, settings, extra_args=()):
+        combined = f"{self.source_hash(input_path)}|{_ghostscript_settings_key(settings, extra_args)}"
+        return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ".pdf")
+
+    def fetch(self, key, output_path):
+        entry = self._entry_path(key)
+        with self._lock:
+            if not os.path.isfile(entry):
+                return False
+            try:
+                os.utime(entry, None)
+                shutil.copyfile(entry, output_path)
+                return True
+            except OSError as e:
+                print(f"Compression cache read failed: {e}")
+                return False
+
+    def store(self, key, output_path):
+        entry = self._entry_path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            os.close(fd)
+            shutil.copyfile(output_path, tmp_path)
+            with self._lock:
+                os.replace(tmp_path, entry)
+                self._evict()
+        except OSError as e:
+            print(f"Compression cache write failed: {e}")
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pdf"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        while total > self.max_bytes and entries:
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+class CompressionQueue(QObject):
+    # 每个方案是一个独立的 gs 进程，线程池只负责调度和读取进度，池大小即并行进程数
+    job_progress = pyqtSignal(int, int)
+    job_finished = pyqtSignal(int, bool, str, str)
+
+    CANCELLED = "已取消"
+    CACHE_HIT = "命中缓存"
+
+    def __init__(self, parent=None, max_workers=None, cache=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._next_id = 1
+
+    def submit(self, input_path, profiles=None):
+        profiles = list(profiles or [_compression_profile("screen")])
+        with self._lock:
+            job_id = self._next_id
+            self._next_id += 1
+            self._jobs[job_id] = {
+                "cancelled": False, "procs": [], "pending": len(profiles), "count": len(profiles),
+                "progress": {}, "results": {}, "errors": [],
+            }
+        for profile in profiles:
+            self._pool.submit(self._run_profile, job_id, input_path, profile)
+        return job_id
+
+    def cancel(self, job_id=None):
+        with self._lock:
+            targets = [job_id] if job_id is not None else list(self._jobs)
+            for jid in targets:
+                job = self._jobs.get(jid)
+                if job is None:
+                    continue
+                job["cancelled"] = True
+                for proc in job["procs"]:
+                    if proc.poll() is None:
+                        proc.terminate()
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False)
+
+    def _on_profile_progress(self, job_id, job, name, percent):
+        with self._lock:
+            job["progress"][name] = percent
+            overall = sum(job["progress"].values()) // job["count"]
+        self.job_progress.emit(job_id, overall)
+
+    def _on_process_started(self, job, proc):
+        with self._lock:
+            job["procs"].append(proc)
+            if job["cancelled"]:
+                proc.terminate()
+
+    def _compress_profile(self, job_id, job, input_path, profile):
+        name, settings, _, extra_args = profile
+        fd, output_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        cache_key = None
+        if self.cache is not None:
+            try:
+                cache_key = self.cache.key(input_path, settings, extra_args)
+                if self.cache.fetch(cache_key, output_path):
+                    self._on_profile_progress(job_id, job, name, 100)
+                    return output_path, True, ""
+            except OSError as e:
+                print(f"Compression cache lookup failed: {e}")
+        message = ""
+        try:
+            returncode, message = _run_ghostscript(
+                input_path, output_path, settings, extra_args,
+                on_progress=lambda p: self._on_profile_progress(job_id, job, name, p),
+                on_process=lambda proc: self._on_process_started(job, proc),
+            )
+            if returncode == 0 and not job["cancelled"]:
+                if cache_key is not None:
+                    self.cache.store(cache_key, output_path)
+                self._on_profile_progress(job_id, job, name, 100)
+                return output_path, False, ""
+        except Exception as e:
+            message = str(e)
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return "", False, message
+
+    def _run_profile(self, job_id, input_path, profile):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return
+        output_path, cached, message = "", False, ""
+        if not job["cancelled"]:
+            output_path, cached, message = self._compress_profile(job_id, job, input_path, profile)
+        with self._lock:
+            job["results"][profile[0]] = (output_path, cached)
+            if message:
+                job["errors"].append(message)
+            job["pending"] -= 1
+            done = job["pending"] == 0
+            if done:
+                self._jobs.pop(job_id, None)
+        if done:
+            self._finish(job_id, job, input_path)
+
+    def _finish(self, job_id, job, input_path):
+        outputs = {name: r for name, r in job["results"].items() if r[0]}
+        if job["cancelled"]:
+            for path, _ in outputs.values():
+                os.remove(path)
+            self.job_finished.emit(job_id, False, "", self.CANCELLED)
+            return
+        if not outputs:
+            self.job_finished.emit(job_id, False, "", job["errors"][-1] if job["errors"] else "")
+            return
+        sizes = {name: os.path.getsize(path) for name, (path, _) in outputs.items()}
+        best = min(sizes, key=sizes.get)
+        for name, (path, _) in outputs.items():
+            if name != best:
+                os.remove(path)
+        try:
+            original_size = os.path.getsize(input_path)
+        except OSError:
+            original_size = 0
+        if original_size:
+            _log_compression_stats({
+                "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                "file": os.path.basename(input_path),
+                "original_bytes": original_size,
+                "ratios": {name: round(sizes[name] / original_size, 4) if name in sizes else None
+                           for name in job["results"]},
+                "chosen": best,
+            })
+        path, cached = outputs[best]
+        message = best if len(job["results"]) > 1 else ""
+        if cached:
+            message = f"{message}，{self.CACHE_HIT}" if message else self.CACHE_HIT
+        self.job_finished.emit(job_id, True, path, message)
+
+# --- 仓库批量优化 ---
+OPTIMIZE_MIN_RATIO = 0.9
+OPTIMIZE_DEFAULT_THRESHOLD_MB = 20
+
+class OptimizeScanWorker(QThread):
+    progress_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(list, int)
+
+    def __init__(self, repo_path, threshold_bytes, profiles):
+        super().__init__()
+        self.repo_path = repo_path
+        self.threshold_bytes = threshold_bytes
+        self.profiles = profiles
+
+    def run(self):
+        candidates = []
+        skipped = 0
+        for root, dirs, files in os.walk(self.repo_path):
+            dirs[:] = [d for d in dirs if d not in (".git", ".trash_bin")]
+            for name in files:
+                if not name.lower().endswith(".pdf"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if size < self.threshold_bytes:
+                    continue
+                self.progress_signal.emit(os.path.relpath(path, self.repo_path))
+                try:
+                    report = _preflight_pdf(path)
+                except Exception as e:
+                    print(f"Preflight failed for {path}: {e}")
+                    candidates.append((path, size, self.profiles))
+                    continue
+                worthwhile, _ = _preflight_advice(report, self.profiles)
+                if worthwhile:
+                    candidates.append((path, size, worthwhile))
+                else:
+                    skipped += 1
+        self.finished_signal.emit(candidates, skipped)
+
+class PreflightWorker(QThread):
+    finished_signal = pyqtSignal(dict, dict)
+
+    def __init__(self, paths, profiles):
+        super().__init__()
+        self.paths = paths
+        self.profiles = profiles
+
+    def run(self):
+        # 返回 ({路径: 要跑的方案}, {路径: 说明})；预计收益不足的文件不进入计划
+        plan = {}
+        lines = {}
+        for path in self.paths:
+            try:
+                report = _preflight_pdf(path)
+            except Exception as e:
+                print(f"Preflight failed for {path}: {e}")
+                plan[path] = self.profiles
+                lines[path] = "预检失败，按原设置压缩"
+                continue
+            worthwhile, best = _preflight_advice(report, self.profiles)
+            lines[path] = _describe_preflight(report, best, worthwhile)
+            if worthwhile:
+                plan[path] = worthwhile
+        self.finished_signal.emit(plan, lines)
+
+class CompressionProgressDialog(QDialog):
+    def __init__(self, compression_queue, parent=None):
+        super().__init__(parent)
+        self.compression_queue = compression_queue
+        self.setWindowTitle("🗜 后台压缩")
+        self.resize(520, 200)
+        self.setStyleSheet("""
+            QDialog { background-color: #2b2b2b; color: #fff; font-family: "Microsoft YaHei"; }
+            QLabel { color: #ccc; font-size: 13px; }
+            QProgressBar { background-color: #333; border: 1px solid #555; border-radius: 3px; }
+            QProgressBar::chunk { background-color: #007acc; }
+            QPushButton { background-color: #007acc; color: white; border: none; padding: 6px 15px; border-radius: 4px; }
+            QPushButton:hover { background-color: #0062a3; }
+        """)
+        layout = QVBoxLayout(self)
+        self.info_label = QLabel(f"并行压缩进程数: {compression_queue.max_workers}")
+        layout.addWidget(self.info_label)
+        self.rows_layout = QVBoxLayout()
+        container = QWidget()
+        container.setLayout(self.rows_layout)
+        self.rows_layout.addStretch()
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(container)
+        layout.addWidget(scroll)
+        btn_row = QHBoxLayout()
+        btn_row.addStretch()
+        self.btn_cancel = QPushButton("取消全部")
+        self.btn_cancel.clicked.connect(self.cancel_all)
+        btn_row.addWidget(self.btn_cancel)
+        btn_close = QPushButton("隐藏")
+        btn_close.clicked.connect(self.hide)
+        btn_row.addWidget(btn_close)
+        layout.addLayout(btn_row)
+        self.rows = {}
+        compression_queue.job_progress.connect(self.set_progress)
+
+    def add_job(self, job_id, name):
+        label = QLabel(name)
+        bar = QProgressBar()
+        bar.setRange(0, 0)
+        bar.setFixedHeight(14)
+        status = QLabel("排队中...")
+        for widget in (label, bar, status):
+            self.rows_layout.insertWidget(self.rows_layout.count() - 1, widget)
+        self.rows[job_id] = (bar, status)
+
+    def set_progress(self, job_id, percent):
+        if job_id in self.rows:
+            bar, status = self.rows[job_id]
+            if bar.maximum() != 100:
+                bar.setRange(0, 100)
+            bar.setValue(percent)
+            status.setText(f"压缩中 {percent}%")
+
+    def set_result(self, job_id, success, text):
+        if job_id in self.rows:
+            bar, status = self.rows[job_id]
+            bar.setRange(0, 100)
+            bar.setValue(100 if success else 0)
+            status.setText(("✔ " if success else "❌ ") + text)
+
+    def cancel_all(self):
+        self.compression_queue.cancel()
+
 class CustomTreeView(QTreeView):
     releasePreviewSignal = pyqtSignal()
+    pathsTouched = pyqtSignal(list)
+    placeholdersChanged = pyqtSignal()
 
     def __init__(self, repo_path, parent=None):
         super().__init__(parent)
         self.repo_path = repo_path
+        self.compression_queue = None
+        self.compression_cache = CompressionCache()
+        self.compression_adaptive = DEFAULT_CONFIG["compression_adaptive"]
+        self.compression_dpi_floor = DEFAULT_CONFIG["compression_dpi_floor"]
+        self.compression_dialog = None
+        self._compression_jobs = {}
+        self.preflight_worker = None
+        self._pending_drops = []
         self.setAcceptDrops(True)
         self.setDragEnabled(True)
         self.setDragDropMode(QTreeView.DragDropMode.DragDrop)
@@ -735,7 +4073,13 @@ class CustomTreeView(QTreeView):
     def update_repo_path(self, new_path):
         self.repo_path = new_path
 
+    @staticmethod
+    def _record_paths(record):
+        keys = ('src', 'dest', 'path', 'original_path', 'old_path', 'new_path')
+        return [record[k] for k in keys if record.get(k)]
+
     def add_undo_record(self, record):
+        self.pathsTouched.emit(self._record_paths(record))
         if self._is_undoing: return
         self.undo_stack.append(record)
         if len(self.undo_stack) > 100:
@@ -777,6 +4121,9 @@ class CustomTreeView(QTreeView):
                 if os.path.exists(trash_path):
                     os.makedirs(os.path.dirname(original_path), exist_ok=True)
                     self.safe_move(trash_path, original_path)
+                    if op.get('placeholders'):
+                        _update_index_entries(self.repo_path, added=op['placeholders'])
+                        self.placeholdersChanged.emit()
                     print(f"Undo delete: Restored {original_path}")
                 else:
                     QMessageBox.warning(self, "失败", "回收站中找不到该文件，无法恢复。")
@@ -792,13 +4139,18 @@ class CustomTreeView(QTreeView):
             QMessageBox.warning(self, "撤销失败", f"无法撤销操作: {e}")
         finally:
             self._is_undoing = False
+            self.pathsTouched.emit(self._record_paths(op))
 
     def safe_delete_permanently(self, path):
         try:
+            placeholders = _placeholders_under(self.repo_path, path)
             if os.path.isdir(path):
                 shutil.rmtree(path)
             else:
                 os.remove(path)
+            if placeholders:
+                _update_index_entries(self.repo_path, removed=placeholders)
+                self.placeholdersChanged.emit()
         except:
             pass
 
@@ -834,9 +4186,10 @@ class CustomTreeView(QTreeView):
     def safe_move(self, src, dst):
         if os.path.abspath(src) == os.path.abspath(dst):
             return True
+        # 占位文件只在索引里改名/删除，不下载内容
+        placeholders = _placeholders_under(self.repo_path, src)
         try:
             shutil.move(src, dst)
-            return True
         except OSError as e:
             time.sleep(0.5) 
             try:
@@ -846,9 +4199,24 @@ class CustomTreeView(QTreeView):
                 else:
                     shutil.copy2(src, dst)
                     os.remove(src)
-                return True
             except Exception as e2:
                 raise Exception(f"操作失败: {e2}")
+        if placeholders:
+            _update_index_entries(self.repo_path, placeholders,
+                                  _relocated_entries(self.repo_path, placeholders, src, dst))
+            self.placeholdersChanged.emit()
+        return True
+
+    def copy_path(self, src, dst):
+        placeholders = _placeholders_under(self.repo_path, src)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst)
+        else:
+            shutil.copy2(src, dst)
+        added = _relocated_entries(self.repo_path, placeholders, src, dst)
+        if added:
+            _update_index_entries(self.repo_path, added=added)
+            self.placeholdersChanged.emit()
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -881,10 +4249,62 @@ class CustomTreeView(QTreeView):
         self.releasePreviewSignal.emit()
         QApplication.processEvents()
 
-        is_copy_action = (event.modifiers() & Qt.KeyboardModifier.ControlModifier) or (event.dropAction() == Qt.DropAction.CopyAction)
+        is_copy_action = bool((event.modifiers() & Qt.KeyboardModifier.ControlModifier) or (event.dropAction() == Qt.DropAction.CopyAction))
+        sources = [url.toLocalFile() for url in urls]
+        event.accept()
 
-        for url in urls:
-            src_path = url.toLocalFile()
+        large_pdfs = []
+        for src_path in sources:
+            if not os.path.isfile(src_path) or not src_path.lower().endswith('.pdf'):
+                continue
+            if os.path.dirname(os.path.abspath(src_path)) == os.path.abspath(target_dir):
+                continue
+            try:
+                size_mb = os.path.getsize(src_path) / (1024 * 1024)
+            except OSError:
+                continue
+            if size_mb > 50:
+                large_pdfs.append((src_path, size_mb))
+        if not large_pdfs:
+            self._finish_drop(sources, target_dir, is_copy_action, {})
+            return
+        # 预检要读完整个文件，放到后台线程；上一批还在预检时排队等候
+        self._pending_drops.append((sources, target_dir, is_copy_action, large_pdfs))
+        self._start_next_preflight()
+
+    def _start_next_preflight(self):
+        if not self._pending_drops or (self.preflight_worker is not None and self.preflight_worker.isRunning()):
+            return
+        _, _, _, large_pdfs = self._pending_drops[0]
+        self.viewport().setCursor(Qt.CursorShape.BusyCursor)
+        self.preflight_worker = PreflightWorker([p for p, _ in large_pdfs], self.compression_profiles())
+        self.preflight_worker.finished_signal.connect(self._on_preflight_finished)
+        self.preflight_worker.start()
+
+    def _on_preflight_finished(self, plan, lines):
+        self.preflight_worker.wait()
+        self.viewport().unsetCursor()
+        sources, target_dir, is_copy_action, large_pdfs = self._pending_drops.pop(0)
+        compress_plan = {}
+        if plan:
+            action_str = "复制" if is_copy_action else "移动"
+            names = "\n".join(f"• {os.path.basename(p)} ({mb:.1f}MB)\n   {lines[p]}" for p, mb in large_pdfs[:10])
+            if len(large_pdfs) > 10:
+                names += f"\n… 共 {len(large_pdfs)} 个"
+            reply = QMessageBox.question(
+                self, "大文件提示",
+                f"正在{action_str} {len(large_pdfs)} 个大文件：\n{names}\n是否在后台压缩 {len(plan)} 个？({self.compression_mode_text()})",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                compress_plan = plan
+        self.releasePreviewSignal.emit()
+        QApplication.processEvents()
+        self._finish_drop(sources, target_dir, is_copy_action, compress_plan)
+        self._start_next_preflight()
+
+    def _finish_drop(self, sources, target_dir, is_copy_action, compress_plan):
+        for src_path in sources:
             if not os.path.exists(src_path):
                 continue
 
@@ -892,100 +4312,115 @@ class CustomTreeView(QTreeView):
             if os.path.dirname(os.path.abspath(src_path)) == os.path.abspath(target_dir):
                 continue
 
-            final_src_path = src_path
-            is_temp_file = False
-            
-            try:
-                original_size = os.path.getsize(src_path)
-                file_size_mb = original_size / (1024 * 1024)
-                
-                if file_size_mb > 50 and file_name.lower().endswith('.pdf'):
-                    action_str = "复制" if is_copy_action else "移动"
-                    reply = QMessageBox.question(
-                        self, "大文件提示", 
-                        f"正在{action_str}文件 '{file_name}' ({file_size_mb:.1f}MB)。\n是否压缩？(/screen 模式)",
-                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                    )
-                    
-                    if reply == QMessageBox.StandardButton.Yes:
-                        compressed_path = self.compress_pdf_ghostscript(src_path)
-                        if compressed_path:
-                            comp_size = os.path.getsize(compressed_path)
-                            if comp_size >= original_size:
-                                QMessageBox.warning(self, "压缩无效", "压缩后体积未减小，放弃压缩。")
-                                os.remove(compressed_path)
-                            else:
-                                final_src_path = compressed_path
-                                is_temp_file = True 
-                                QMessageBox.showinfo("成功", "压缩完成")
-            except Exception:
-                pass
-
             dest_path = os.path.join(target_dir, file_name)
+            overwrite = False
             
             if os.path.exists(dest_path):
                 choice = self.show_conflict_dialog(os.path.basename(dest_path))
                 if choice == "skip":
-                    if is_temp_file: os.remove(final_src_path)
                     continue
                 elif choice == "rename":
                     dest_path = self.get_unique_name(target_dir, file_name)
                 elif choice == "overwrite":
-                    self.action_soft_delete_path(dest_path)
+                    overwrite = True
                 elif choice == "cancel":
-                    if is_temp_file: os.remove(final_src_path)
                     break
-            
-            try:
-                if is_copy_action:
-                    if is_temp_file:
-                        shutil.copy2(final_src_path, dest_path)
-                    else:
-                        if os.path.isdir(src_path):
-                            shutil.copytree(src_path, dest_path)
-                        else:
-                            shutil.copy2(src_path, dest_path)
-                    self.add_undo_record({'type': 'copy', 'dest': dest_path})
-                else:
-                    if is_temp_file:
-                        self.safe_move(final_src_path, dest_path)
-                        try: os.remove(src_path)
-                        except: pass
-                    else:
-                        self.safe_move(src_path, dest_path)
-                        self.add_undo_record({'type': 'move', 'src': src_path, 'dest': dest_path})
 
-            except Exception as e:
-                QMessageBox.critical(self, "错误", f"操作失败: {e}")
-                if is_temp_file and os.path.exists(final_src_path):
-                    try: os.remove(final_src_path)
-                    except: pass
+            if src_path in compress_plan:
+                # 压缩在后台进行，完成后再覆盖/放入目标文件夹
+                self.enqueue_compression(src_path, dest_path, is_copy_action, overwrite, compress_plan[src_path])
+                continue
 
-        event.accept()
+            if overwrite and not self.action_soft_delete_path(dest_path):
+                continue
+            self._place_dropped_file(src_path, src_path, dest_path, is_copy_action)
 
-    def compress_pdf_ghostscript(self, input_path):
+    def _place_dropped_file(self, src_path, final_src_path, dest_path, is_copy_action):
+        is_temp_file = final_src_path != src_path
         try:
-            fd, temp_output = tempfile.mkstemp(suffix=".pdf")
-            os.close(fd)
-            cmd = [
-                GS_CMD, "-sDEVICE=pdfwrite", "-dCompatibilityLevel=1.4",
-                "-dPDFSETTINGS=/screen", "-dNOPAUSE", "-dQUIET", "-dBATCH",
-                f"-sOutputFile={temp_output}", input_path
-            ]
-            startupinfo = None
-            creationflags = 0
-            if platform.system() == 'Windows':
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
-
-            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-            subprocess.run(cmd, startupinfo=startupinfo, creationflags=creationflags, check=True)
-            QApplication.restoreOverrideCursor()
-            return temp_output
+            if is_copy_action:
+                if is_temp_file:
+                    shutil.copy2(final_src_path, dest_path)
+                    os.remove(final_src_path)
+                else:
+                    self.copy_path(src_path, dest_path)
+                self.add_undo_record({'type': 'copy', 'dest': dest_path})
+            else:
+                if is_temp_file:
+                    self.safe_move(final_src_path, dest_path)
+                    try: os.remove(src_path)
+                    except: pass
+                    self.pathsTouched.emit([dest_path, src_path])
+                else:
+                    self.safe_move(src_path, dest_path)
+                    self.add_undo_record({'type': 'move', 'src': src_path, 'dest': dest_path})
+            return True
         except Exception as e:
-            QApplication.restoreOverrideCursor()
-            return None
+            QMessageBox.critical(self, "错误", f"操作失败: {e}")
+            if is_temp_file and os.path.exists(final_src_path):
+                try: os.remove(final_src_path)
+                except: pass
+            return False
+
+    def compression_profiles(self):
+        if self.compression_adaptive:
+            return _profiles_for_dpi_floor(self.compression_dpi_floor)
+        return [_compression_profile("screen")]
+
+    def compression_mode_text(self):
+        if self.compression_adaptive:
+            return f"自适应模式，图片不低于 {self.compression_dpi_floor} DPI"
+        return "/screen 模式"
+
+    def ensure_compression_queue(self):
+        if self.compression_queue is None:
+            self.compression_queue = CompressionQueue(self, cache=self.compression_cache)
+            self.compression_queue.job_finished.connect(self.on_compression_finished)
+            QApplication.instance().aboutToQuit.connect(self.compression_queue.shutdown)
+            self.compression_dialog = CompressionProgressDialog(self.compression_queue, self.window())
+        return self.compression_queue
+
+    def enqueue_compression(self, src_path, dest_path, is_copy_action, overwrite=False, profiles=None):
+        self.ensure_compression_queue()
+        job_id = self.compression_queue.submit(src_path, profiles or self.compression_profiles())
+        self._compression_jobs[job_id] = {
+            "src": src_path, "dest": dest_path, "is_copy": is_copy_action, "overwrite": overwrite,
+        }
+        self.compression_dialog.add_job(job_id, os.path.basename(src_path))
+        self.compression_dialog.show()
+        self.compression_dialog.raise_()
+
+    def on_compression_finished(self, job_id, success, output_path, message):
+        job = self._compression_jobs.pop(job_id, None)
+        if job is None:
+            return
+        src_path = job["src"]
+        if not os.path.exists(src_path):
+            if output_path and os.path.exists(output_path):
+                os.remove(output_path)
+            self.compression_dialog.set_result(job_id, False, "源文件已不存在，已跳过")
+            return
+        final_src_path = src_path
+        original_size = os.path.getsize(src_path)
+        if message == CompressionQueue.CANCELLED:
+            # 取消的只是压缩，拖入的文件仍按原样放入
+            result = "已取消压缩，已使用原文件"
+        elif success and output_path and os.path.getsize(output_path) < original_size:
+            final_src_path = output_path
+            result = f"{original_size / (1024 * 1024):.1f}MB → {os.path.getsize(output_path) / (1024 * 1024):.1f}MB"
+            if message:
+                result += f"（{message}）"
+        else:
+            if output_path and os.path.exists(output_path):
+                os.remove(output_path)
+            result = "压缩后体积未减小，已使用原文件" if success else f"压缩失败，已使用原文件: {message}"
+
+        dest_path = job["dest"]
+        if os.path.exists(dest_path):
+            if not job["overwrite"] or not self.action_soft_delete_path(dest_path):
+                dest_path = self.get_unique_name(os.path.dirname(dest_path), os.path.basename(dest_path))
+        placed = self._place_dropped_file(src_path, final_src_path, dest_path, job["is_copy"])
+        self.compression_dialog.set_result(job_id, placed, result if placed else "放入目标文件夹失败")
 
     def open_context_menu(self, position):
         menu = QMenu()
@@ -1116,10 +4551,7 @@ class CustomTreeView(QTreeView):
                     self.safe_move(src_path, dest_path)
                     self.add_undo_record({'type': 'move', 'src': src_path, 'dest': dest_path})
                 else:
-                    if os.path.isdir(src_path):
-                        shutil.copytree(src_path, dest_path)
-                    else:
-                        shutil.copy2(src_path, dest_path)
+                    self.copy_path(src_path, dest_path)
                     self.add_undo_record({'type': 'copy', 'dest': dest_path})
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"粘贴失败: {e}")
@@ -1150,14 +4582,18 @@ class CustomTreeView(QTreeView):
         trash_path = os.path.join(trash_dir, timestamp + file_name)
 
         try:
+            placeholders = _placeholders_under(self.repo_path, path)
             self.safe_move(path, trash_path)
             self.add_undo_record({
                 'type': 'soft_delete', 
                 'original_path': path, 
-                'trash_path': trash_path
+                'trash_path': trash_path,
+                'placeholders': placeholders,
             })
+            return True
         except Exception as e:
             QMessageBox.warning(self, "删除失败", f"无法删除 {path}: {e}")
+            return False
 
     def action_rename(self):
         self.releasePreviewSignal.emit()
@@ -1201,6 +4637,14 @@ class GitHubManagerApp(QMainWindow):
         self.config = ConfigManager.load()
         self.repo_path = self.config.get("repo_path", r"D:\Github\pdf-document")
         self.base_url = self.config.get("base_url", "https://zhangzhh95.github.io/pdf-document/")
+        # 工作区：多个仓库各自保存根路径、URL，以及切换时的待同步路径和展开状态
+        self.repos = _workspace_repos(self.config)
+        if not any(r["repo_path"] == self.repo_path for r in self.repos):
+            self.repos.insert(0, {"name": _repo_display_name(self.repo_path), "repo_path": self.repo_path,
+                                  "base_url": self.base_url})
+        self._repo_states = {}
+        self.sync_all_worker = None
+        self.sync_all_dialog = None
         
         
         if not os.path.exists(self.repo_path):
@@ -1211,20 +4655,132 @@ class GitHubManagerApp(QMainWindow):
         except Exception:
             self.repo = None
 
+        self.file_index = None
+        self.file_index_worker = None
+        self._search_workers = []
+        self._search_generation = 0
+        self._search_count = 0
+        self._search_started = 0.0
+        self._search_cache = OrderedDict()
+        self._search_cache_key = None
+        self.content_index = None
+        self.content_index_worker = None
+        self._open_file_index()
+
         self.setup_ui()
+        self._reload_repo_combo()
         self.apply_dark_theme()
         
         # 监听重命名信号
         self.source_model.fileRenamed.connect(self.on_file_renamed)
+        self.pending_paths = set()
+        self._apply_repo_profile()
         
-        self.status_worker = GitStatusWorker(self.repo_path)
-        self.status_worker.result_signal.connect(self.on_git_status_result)
-        
-        self.status_timer = QTimer(self)
-        self.status_timer.timeout.connect(self.check_git_status_loop)
-        self.status_timer.start(3000)
-        # 立即检查一次
-        self.check_git_status_loop()
+        # 文件系统通知驱动的状态检测，定期全量扫描兜底
+        self.status_tracker = GitStatusTracker(self.repo_path, self)
+        self.status_tracker.count_signal.connect(self.on_git_status_result)
+        self.status_tracker.changes_signal.connect(self.on_git_changes)
+        self.status_tracker.start()
+
+        # 离线同步队列：网络失败的推送在后台按指数退避重试，重启后继续
+        self.sync_queue = SyncQueue()
+        self.git_worker = None
+        self.sync_retry_worker = None
+        self.pending_count_worker = None
+        self._pending_count_stale = False
+        self.sync_queue_timer = QTimer(self)
+        self.sync_queue_timer.timeout.connect(self.process_sync_queue)
+        self.sync_queue_timer.start(15000)
+        QTimer.singleShot(3000, self.process_sync_queue)
+        self.update_queue_indicator()
+
+        self.auto_sync = AutoSyncScheduler(self)
+        self.auto_sync.sync_requested.connect(self.on_auto_sync_requested)
+        self.apply_auto_sync_config()
+        self.apply_compression_config()
+
+        # 空闲且工作区干净时在后台做仓库维护；同步或文件变动触发的状态检测会让它让出，定时兜底扫描不会
+        self.maintenance_worker = None
+        self._after_maintenance = []
+        self._last_activity = time.monotonic()
+        self._worktree_clean = False
+        self.status_tracker.status_started.connect(self.yield_maintenance)
+        self.status_tracker.tree_changed.connect(self.invalidate_search_cache)
+        self.maintenance_timer = QTimer(self)
+        self.maintenance_timer.timeout.connect(self.maybe_run_maintenance)
+        self.maintenance_timer.start(60 * 1000)
+        QApplication.instance().aboutToQuit.connect(self.shutdown_maintenance)
+
+        # 部分克隆仓库：仅在云端的文件以占位文件显示，打开时再下载
+        self.hydrate_worker = None
+        self.placeholder_worker = None
+        self._placeholders_stale = False
+        self.clone_worker = None
+        self.sparse_worker = None
+        self.optimize_worker = None
+        self._optimize_jobs = {}
+        self._optimize_stats = None
+        self._large_blob_jobs = {}
+        self._large_blob_result = None
+        self._compression_hooked = False
+        self.placeholder_expanded = set()
+        self._reveal_after_placeholders = None
+        self.proxy_model.placeholderFetchRequested.connect(self.on_placeholder_fetch)
+        self.tree.expanded.connect(self.proxy_model.fetch_placeholder)
+        self.refresh_placeholders()
+
+    def _apply_repo_profile(self):
+        if not os.path.isdir(os.path.join(self.repo_path, ".git")):
+            return
+        try:
+            if _ensure_repo_profile(self.repo_path):
+                self.pending_paths.add(".gitattributes")
+        except Exception as e:
+            print(f"Repo profile setup failed: {e}")
+
+    def _open_file_index(self):
+        for worker in (self.file_index_worker, self.content_index_worker, *self._search_workers):
+            if worker is not None and worker.isRunning():
+                worker.requestInterruption()
+                worker.wait()
+        if self.content_index is not None:
+            self.content_index.close()
+        if self.file_index is not None:
+            self.file_index.close()
+        self.content_index = None
+        self.file_index = None
+        try:
+            self.file_index = FileIndex(self.repo_path)
+        except Exception as e:
+            print(f"File index open failed: {e}")
+            try:
+                self.file_index = FileIndex(self.repo_path, db_path=":memory:")
+            except Exception:
+                return
+        try:
+            self.content_index = ContentIndex(self.file_index)
+        except Exception as e:
+            print(f"Content index open failed: {e}")
+        self.file_index_worker = FileIndexWorker(self.file_index)
+        self.file_index_worker.finished_signal.connect(lambda _changed: self.start_content_indexing())
+        self.file_index_worker.start()
+
+    def start_content_indexing(self):
+        if self.content_index is None:
+            return
+        if self.content_index_worker is not None and self.content_index_worker.isRunning():
+            return
+        self.content_index_worker = ContentIndexWorker(self.content_index)
+        self.content_index_worker.progress_signal.connect(self.on_content_index_progress)
+        self.content_index_worker.finished_signal.connect(self.on_content_index_finished)
+        self.content_index_worker.start()
+
+    def on_content_index_progress(self, done, total):
+        self.status_label.setText(f"正在建立全文索引 {done}/{total}...")
+
+    def on_content_index_finished(self, count):
+        if count > 0:
+            self.status_label.setText(f"全文索引已更新 {count} 个文件")
 
     def center_window(self):
         screen = QApplication.primaryScreen().geometry()
@@ -1260,13 +4816,49 @@ class GitHubManagerApp(QMainWindow):
         title_label.setMinimumHeight(28)
         left_layout.addWidget(title_label)
 
+        repo_layout = QHBoxLayout()
+        repo_layout.setSpacing(5)
+        self.repo_combo = QComboBox()
+        self.repo_combo.setToolTip("切换仓库")
+        self.repo_combo.currentIndexChanged.connect(self.on_repo_combo_changed)
+        repo_layout.addWidget(self.repo_combo, 1)
+        self.btn_add_repo = QPushButton("＋")
+        self.btn_add_repo.setFixedWidth(30)
+        self.btn_add_repo.setToolTip("添加仓库到工作区")
+        self.btn_add_repo.clicked.connect(self.add_repo)
+        repo_layout.addWidget(self.btn_add_repo)
+        self.btn_remove_repo = QPushButton("－")
+        self.btn_remove_repo.setFixedWidth(30)
+        self.btn_remove_repo.setToolTip("从工作区移除当前仓库")
+        self.btn_remove_repo.clicked.connect(self.remove_repo)
+        repo_layout.addWidget(self.btn_remove_repo)
+        self.btn_sync_all = QPushButton("⇅")
+        self.btn_sync_all.setFixedWidth(30)
+        self.btn_sync_all.setToolTip("同步全部仓库")
+        self.btn_sync_all.clicked.connect(self.start_sync_all)
+        repo_layout.addWidget(self.btn_sync_all)
+        left_layout.addLayout(repo_layout)
+
         search_layout = QHBoxLayout()
         search_layout.setSpacing(5)
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("搜索文件...")
         self.search_input.returnPressed.connect(self.perform_search)
+        self.search_input.textChanged.connect(self.on_search_text_changed)
         search_layout.addWidget(self.search_input)
 
+        self.search_debounce_timer = QTimer(self)
+        self.search_debounce_timer.setSingleShot(True)
+        self.search_debounce_timer.timeout.connect(self.perform_search)
+
+        self.search_mode_btn = QPushButton("全文")
+        self.search_mode_btn.setObjectName("SearchModeToggle")
+        self.search_mode_btn.setCheckable(True)
+        self.search_mode_btn.setFixedWidth(48)
+        self.search_mode_btn.setToolTip("搜索 PDF / TXT 文件内容")
+        self.search_mode_btn.toggled.connect(self.on_search_mode_toggled)
+        search_layout.addWidget(self.search_mode_btn)
+
         search_btn = QPushButton("🔍")
         search_btn.setFixedWidth(40)
         search_btn.clicked.connect(self.perform_search)
@@ -1280,10 +4872,15 @@ class GitHubManagerApp(QMainWindow):
         search_frame_layout.setContentsMargins(10, 10, 10, 10)
         search_frame_layout.setSpacing(0)
 
-        self.search_list = QListWidget()
+        self.search_model = SearchResultsModel(self)
+        self.search_list = QListView()
         self.search_list.setObjectName("SearchResults")
         self.search_list.setFrameShape(QFrame.Shape.NoFrame)
-        self.search_list.itemClicked.connect(self.on_search_result_clicked)
+        self.search_list.setModel(self.search_model)
+        self.search_list.setItemDelegate(SearchResultDelegate(self.search_list))
+        self.search_list.setUniformItemSizes(True)
+        self.search_list.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.search_list.clicked.connect(self.on_search_result_clicked)
         self.search_list.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.search_list.setVisible(True)
 
@@ -1294,7 +4891,7 @@ class GitHubManagerApp(QMainWindow):
         self.btn_sync = QPushButton("☁️ 同步")
         self.btn_sync.setObjectName("PrimaryButton")
         self.btn_sync.setFixedHeight(32)
-        self.btn_sync.clicked.connect(self.start_sync)
+        self.btn_sync.clicked.connect(lambda: self.start_sync())
         btn_layout.addWidget(self.btn_sync)
 
         self.btn_copy_url = QPushButton("🔗 复制 URL")
@@ -1316,6 +4913,7 @@ class GitHubManagerApp(QMainWindow):
 
         self.progress_bar = QProgressBar()
         self.progress_bar.setRange(0, 0)
+        self.progress_bar.setTextVisible(False)
         self.progress_bar.setFixedHeight(4)
         self.progress_bar.hide()
         status_layout.addWidget(self.progress_bar)
@@ -1324,6 +4922,12 @@ class GitHubManagerApp(QMainWindow):
         self.git_status_indicator.setObjectName("GitStatus")
         status_layout.addWidget(self.git_status_indicator)
 
+        self.queue_indicator = QLabel("")
+        self.queue_indicator.setObjectName("QueueStatus")
+        self.queue_indicator.setWordWrap(True)
+        self.queue_indicator.hide()
+        status_layout.addWidget(self.queue_indicator)
+
         left_layout.addLayout(btn_layout)
         left_layout.addWidget(status_frame)
 
@@ -1347,6 +4951,21 @@ class GitHubManagerApp(QMainWindow):
         self.btn_refresh_tree.clicked.connect(self.refresh_tree)
 
         
+        self.btn_connect = QPushButton("📥")
+        self.btn_connect.setFixedWidth(40)
+        self.btn_connect.setToolTip("连接归档：只下载目录结构，文件打开时再下载")
+        self.btn_connect.clicked.connect(self.connect_archive)
+
+        self.btn_sparse = QPushButton("🗂")
+        self.btn_sparse.setFixedWidth(40)
+        self.btn_sparse.setToolTip("选择本地检出的文件夹")
+        self.btn_sparse.clicked.connect(self.choose_sparse_folders)
+
+        self.btn_optimize = QPushButton("🗜")
+        self.btn_optimize.setFixedWidth(40)
+        self.btn_optimize.setToolTip("优化仓库：后台批量压缩超大的 PDF")
+        self.btn_optimize.clicked.connect(self.optimize_repository)
+
         self.btn_config = QPushButton("⚙️")
         self.btn_config.setFixedWidth(40)
         self.btn_config.clicked.connect(self.open_config)
@@ -1354,6 +4973,9 @@ class GitHubManagerApp(QMainWindow):
         toolbar_layout.addWidget(self.btn_toggle_expand)
         toolbar_layout.addWidget(self.btn_refresh_tree)
         toolbar_layout.addStretch() 
+        toolbar_layout.addWidget(self.btn_optimize)
+        toolbar_layout.addWidget(self.btn_sparse)
+        toolbar_layout.addWidget(self.btn_connect)
         toolbar_layout.addWidget(self.btn_config)
         
         tree_layout.addWidget(tree_toolbar)
@@ -1367,7 +4989,11 @@ class GitHubManagerApp(QMainWindow):
         self.proxy_model.setSourceModel(self.source_model)
         
         self.tree = CustomTreeView(self.repo_path)
+        self.tree.pathsTouched.connect(self.on_paths_touched)
+        self.tree.placeholdersChanged.connect(self.refresh_placeholders)
         self.tree.setModel(self.proxy_model)
+        self.tree.setItemDelegate(StatusBadgeDelegate(self.tree))
+        self.source_model.statusMapChanged.connect(self.tree.viewport().update)
         
         
         self.tree.doubleClicked.connect(self.on_tree_double_click)
@@ -1397,38 +5023,318 @@ class GitHubManagerApp(QMainWindow):
         main_layout.addWidget(main_splitter)
 
     def open_config(self):
-        dlg = ConfigDialog(self.repo_path, self.base_url, self)
+        dlg = ConfigDialog(self.repo_path, self.base_url, self, config=self.config)
         if dlg.exec():
             new_repo, new_url = dlg.get_data()
+            # 自动同步和压缩设置与仓库路径无关，路径无效时也要保存
+            self.config = {**self.config, **dlg.get_auto_sync_settings(), **dlg.get_compression_settings()}
+            self.apply_auto_sync_config()
+            self.apply_compression_config()
             if os.path.exists(new_repo):
                 self.repo_path = new_repo
                 self.base_url = new_url
-                ConfigManager.save({"repo_path": self.repo_path, "base_url": self.base_url})
-                
-                self.source_model.setRootPath(self.repo_path)
-                root_index = self.source_model.index(self.repo_path)
-                proxy_root_index = self.proxy_model.mapFromSource(root_index)
-                self.tree.setRootIndex(proxy_root_index)
-                self.tree.update_repo_path(self.repo_path)
-                self.status_worker.repo_path = self.repo_path
-                try:
-                    self.repo = Repo(self.repo_path)
-                except:
-                    self.repo = None
-                QMessageBox.showinfo("设置保存", "配置已更新。")
+                index = self.repo_combo.currentIndex()
+                self.repos[index] = {"name": _repo_display_name(self.repo_path), "repo_path": self.repo_path,
+                                     "base_url": self.base_url}
+                self._save_workspace()
+                self._reload_repo_combo()
+                self._switch_repo()
+                QMessageBox.information(self, "设置保存", "配置已更新。")
             else:
-                QMessageBox.warning(self, "路径无效", "所选路径不存在！")
+                ConfigManager.save(self.config)
+                QMessageBox.warning(self, "路径无效", "所选路径不存在！其他设置已保存。")
+
+    def _switch_repo(self):
+        self.source_model.setRootPath(self.repo_path)
+        root_index = self.source_model.index(self.repo_path)
+        proxy_root_index = self.proxy_model.mapFromSource(root_index)
+        self.tree.setRootIndex(proxy_root_index)
+        self.tree.update_repo_path(self.repo_path)
+        self.status_tracker.set_repo_path(self.repo_path)
+        self._open_file_index()
+        self._apply_repo_profile()
+        self.placeholder_expanded = set()
+        self.refresh_placeholders()
+        self.update_queue_indicator()
+        try:
+            self.repo = Repo(self.repo_path)
+        except:
+            self.repo = None
 
     def on_tree_double_click(self, index):
         if not index.isValid(): return
         source_index = self.proxy_model.mapToSource(index)
         file_path = self.source_model.filePath(source_index)
+        if self.source_model.is_placeholder(source_index):
+            self.hydrate_and_open(file_path)
+            return
         if os.path.isfile(file_path):
             try:
                 os.startfile(file_path)
             except Exception as e:
                 QMessageBox.warning(self, "错误", f"无法打开文件: {e}")
 
+    def hydrate_and_open(self, file_path):
+        if self.hydrate_worker is not None and self.hydrate_worker.isRunning():
+            self.status_label.setText("正在下载其他文件，请稍候...")
+            return
+        rel = os.path.relpath(file_path, self.repo_path).replace("\\", "/")
+        self.status_label.setText(f"正在从云端下载 {os.path.basename(file_path)}...")
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.hydrate_worker = HydrateWorker(self.repo_path, [rel])
+        self.hydrate_worker.finished_signal.connect(
+            lambda done, error: self.on_hydrate_finished(done, error, file_path))
+        self.hydrate_worker.start()
+
+    def on_hydrate_finished(self, done, error, open_path=None):
+        self.progress_bar.hide()
+        self.refresh_placeholders()
+        if error:
+            self.status_label.setText("下载失败")
+            QMessageBox.warning(self, "下载失败", f"无法从云端获取文件:\n{error}")
+            return
+        self.status_label.setText(f"已下载 {len(done)} 个文件")
+        if open_path and os.path.isfile(open_path):
+            try:
+                os.startfile(open_path)
+            except Exception as e:
+                QMessageBox.warning(self, "错误", f"无法打开文件: {e}")
+
+    def refresh_placeholders(self):
+        if not _is_sparse_repo(self.repo_path):
+            self.source_model.set_placeholders(self.repo_path, set())
+            self.proxy_model.set_placeholder_dirs(self.repo_path, set())
+            return
+        # ls-files 和写占位文件都放到后台；进行中又有刷新请求时，结束后再跑一轮
+        if self.placeholder_worker is not None and self.placeholder_worker.isRunning():
+            self._placeholders_stale = True
+            return
+        self._placeholders_stale = False
+        self.placeholder_worker = PlaceholderRefreshWorker(self.repo_path, {""} | self.placeholder_expanded)
+        self.placeholder_worker.result_signal.connect(self.on_placeholders_refreshed)
+        self.placeholder_worker.finished.connect(self._on_placeholder_worker_done)
+        self.placeholder_worker.start()
+
+    def _on_placeholder_worker_done(self):
+        if self._placeholders_stale:
+            self.refresh_placeholders()
+
+    def on_placeholders_refreshed(self, repo_path, files, dirs):
+        if repo_path != self.repo_path:
+            return
+        dirs = set(dirs)
+        self.source_model.set_placeholders(self.repo_path, set(files) | dirs)
+        self.proxy_model.set_placeholder_dirs(self.repo_path, dirs - self.placeholder_expanded)
+        if self._reveal_after_placeholders and os.path.lexists(self._reveal_after_placeholders):
+            self._reveal_in_tree(self._reveal_after_placeholders)
+            self._reveal_after_placeholders = None
+
+    def on_placeholder_fetch(self, path):
+        rel = os.path.relpath(path, self.repo_path).replace("\\", "/")
+        if rel.startswith(".."):
+            return
+        self.placeholder_expanded.add(rel)
+        self.refresh_placeholders()
+
+    def choose_sparse_folders(self):
+        if self.sparse_worker is not None and self.sparse_worker.isRunning():
+            return
+        try:
+            folders = _top_level_folders(self.repo_path)
+            selected = _sparse_cone_folders(self.repo_path)
+        except GitCommandError as e:
+            QMessageBox.warning(self, "无法读取仓库", str(e))
+            return
+        dlg = SparseFolderDialog(folders, selected, self)
+        if not dlg.exec():
+            return
+        chosen = dlg.selected_folders()
+        removed = set(folders if selected is None else selected) - set(chosen)
+        if removed:
+            try:
+                out, _ = _run_git_cli(self.repo_path, ["status", "--porcelain", "--", *removed], timeout_sec=120)
+            except GitCommandError:
+                out = ""
+            if out.strip():
+                QMessageBox.warning(self, "有未同步的修改",
+                                    "要取消检出的文件夹中还有未同步的修改，请先同步后再取消勾选。")
+                return
+        self.yield_maintenance()
+        self.status_tracker.pause()
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.status_label.setText("正在切换本地检出的文件夹...")
+        self.sparse_worker = SparseCheckoutWorker(self.repo_path, chosen)
+        self.sparse_worker.finished_signal.connect(self.on_sparse_finished)
+        self.sparse_worker.start()
+
+    def on_sparse_finished(self, success, message):
+        self.progress_bar.hide()
+        self.status_label.setText(message)
+        self.placeholder_expanded = set()
+        self.refresh_placeholders()
+        self.status_tracker.resume()
+        self.check_git_status_loop()
+        if not success:
+            QMessageBox.warning(self, "切换失败", message)
+
+    def optimize_repository(self):
+        if (self.optimize_worker is not None and self.optimize_worker.isRunning()) or self._optimize_jobs:
+            QMessageBox.information(self, "优化仓库", "优化任务正在进行中。")
+            return
+        threshold_mb, ok = QInputDialog.getInt(self, "优化仓库", "压缩大于多少 MB 的 PDF:",
+                                               OPTIMIZE_DEFAULT_THRESHOLD_MB, 1, 2048)
+        if not ok:
+            return
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.status_label.setText("正在查找可优化的 PDF...")
+        self.optimize_worker = OptimizeScanWorker(self.repo_path, threshold_mb * 1024 * 1024,
+                                                  self.tree.compression_profiles())
+        self.optimize_worker.progress_signal.connect(lambda rel: self.status_label.setText(f"正在预检: {rel}"))
+        self.optimize_worker.finished_signal.connect(
+            lambda candidates, skipped: self.on_optimize_scan_finished(candidates, skipped, threshold_mb))
+        self.optimize_worker.start()
+
+    def on_optimize_scan_finished(self, candidates, skipped, threshold_mb):
+        self.progress_bar.hide()
+        self.status_label.setText("")
+        if not candidates:
+            QMessageBox.information(self, "优化仓库", f"没有需要优化的 PDF（超过 {threshold_mb}MB 且预计可明显缩小）。"
+                                    + (f"\n预检跳过 {skipped} 个。" if skipped else ""))
+            return
+        total = sum(size for _, size, _ in candidates)
+        reply = QMessageBox.question(
+            self, "优化仓库",
+            f"找到 {len(candidates)} 个超过 {threshold_mb}MB 的 PDF，共 {total / (1024 * 1024):.1f}MB"
+            + (f"（另有 {skipped} 个预检判断压缩收益不足，已跳过）" if skipped else "")
+            + f"。\n\n是否在后台并行压缩？体积降到原来的 {int(OPTIMIZE_MIN_RATIO * 100)}% 以下才会替换，"
+            "原文件移入 .trash_bin。",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        compression_queue = self._compression_queue()
+        self._optimize_stats = {"replaced": 0, "saved": 0, "new_bytes": 0, "kept": 0, "failed": 0, "cancelled": 0,
+                                "object_bytes": _repo_object_bytes(self.repo_path)}
+        for path, _, profiles in candidates:
+            job_id = compression_queue.submit(path, profiles)
+            self._optimize_jobs[job_id] = path
+            self.tree.compression_dialog.add_job(job_id, os.path.relpath(path, self.repo_path))
+        self.tree.compression_dialog.show()
+        self.tree.compression_dialog.raise_()
+
+    def _compression_queue(self):
+        # 队列可能已由拖放压缩创建，这里只负责挂上主窗口自己的回调
+        compression_queue = self.tree.ensure_compression_queue()
+        if not self._compression_hooked:
+            compression_queue.job_finished.connect(self.on_optimize_job_finished)
+            compression_queue.job_finished.connect(self.on_large_blob_compressed)
+            self._compression_hooked = True
+        return compression_queue
+
+    def _trash_before_replace(self, path):
+        # 先释放预览对文件的占用，原文件成功移入回收站后才能用压缩结果替换
+        self.tree.releasePreviewSignal.emit()
+        QApplication.processEvents()
+        return self.tree.action_soft_delete_path(path)
+
+    def on_optimize_job_finished(self, job_id, success, output_path, message):
+        path = self._optimize_jobs.pop(job_id, None)
+        if path is None:
+            return
+        stats = self._optimize_stats
+        dialog = self.tree.compression_dialog
+        if message == CompressionQueue.CANCELLED:
+            stats["cancelled"] += 1
+            dialog.set_result(job_id, False, "已取消，文件未改动")
+        elif not success or not os.path.isfile(path):
+            stats["failed"] += 1
+            dialog.set_result(job_id, False, f"压缩失败，保留原文件: {message}" if message else "压缩失败，保留原文件")
+        else:
+            original_size = os.path.getsize(path)
+            new_size = os.path.getsize(output_path)
+            if new_size > original_size * OPTIMIZE_MIN_RATIO:
+                stats["kept"] += 1
+                dialog.set_result(job_id, False, f"只缩小到 {new_size * 100 // max(original_size, 1)}%，保留原文件")
+            elif not self._trash_before_replace(path):
+                stats["failed"] += 1
+                dialog.set_result(job_id, False, "原文件无法移入回收站，保留原文件")
+            else:
+                shutil.move(output_path, path)
+                stats["replaced"] += 1
+                stats["saved"] += original_size - new_size
+                stats["new_bytes"] += new_size
+                self.on_paths_touched([path])
+                dialog.set_result(job_id, True, f"{original_size / (1024 * 1024):.1f}MB → {new_size / (1024 * 1024):.1f}MB"
+                                  + (f"（{message}）" if message else ""))
+        if output_path and os.path.exists(output_path):
+            os.remove(output_path)
+        if not self._optimize_jobs:
+            self.report_optimize_result()
+
+    def report_optimize_result(self):
+        stats = self._optimize_stats
+        mb = 1024 * 1024
+        text = f"已替换 {stats['replaced']} 个 PDF，工作区减少 {stats['saved'] / mb:.1f}MB。"
+        details = [f"{label} {stats[key]} 个" for key, label in
+                   (("kept", "压缩收益不足保留原文件"), ("failed", "失败"), ("cancelled", "已取消")) if stats[key]]
+        if details:
+            text += "\n" + "，".join(details) + "。"
+        if stats["replaced"]:
+            # 原始版本仍在 Git 历史里：完整克隆不会变小，只有部分克隆/检出的体积会减少
+            before = stats["object_bytes"]
+            text += (f"\n\n对克隆体积的影响：旧版本仍保存在 Git 历史中，同步后完整克隆约增加 "
+                     f"{stats['new_bytes'] / mb:.1f}MB"
+                     + (f"（当前对象库 {before / mb:.1f}MB）" if before is not None else "")
+                     + f"；部分克隆（📥 连接归档）和检出只取最新版本，约减少 {stats['saved'] / mb:.1f}MB。"
+                     "\n原文件已移入 .trash_bin，确认无误后同步即可。")
+        QMessageBox.information(self, "优化完成", text)
+
+    def _default_clone_url(self):
+        match = re.match(r"https?://([^./]+)\.github\.io/([^/]+)", self.base_url or "")
+        if match:
+            return f"https://github.com/{match.group(1)}/{match.group(2)}.git"
+        return ""
+
+    def connect_archive(self):
+        url, ok = QInputDialog.getText(self, "连接归档", "远程仓库地址（只下载目录结构，文件打开时再下载）:",
+                                       text=self._default_clone_url())
+        url = url.strip()
+        if not ok or not url:
+            return
+        parent = QFileDialog.getExistingDirectory(self, "选择存放位置")
+        if not parent:
+            return
+        name = url.rstrip("/").rsplit("/", 1)[-1]
+        if name.endswith(".git"):
+            name = name[:-4]
+        target = os.path.join(parent, name or "archive")
+        if os.path.exists(target) and os.listdir(target):
+            QMessageBox.warning(self, "路径无效", f"目标文件夹已存在且不为空:\n{target}")
+            return
+        self.btn_connect.setEnabled(False)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.clone_worker = PartialCloneWorker(url, target)
+        self.clone_worker.status_signal.connect(self.update_status)
+        self.clone_worker.finished_signal.connect(lambda success, message: self.on_clone_finished(success, message, target))
+        self.clone_worker.start()
+
+    def on_clone_finished(self, success, message, target):
+        self.btn_connect.setEnabled(True)
+        self.progress_bar.hide()
+        self.status_label.setText(message)
+        if not success:
+            QMessageBox.warning(self, "连接失败", message)
+            return
+        repo = {"name": _repo_display_name(target), "repo_path": target, "base_url": self.base_url}
+        self.repos.append(repo)
+        self.activate_repo(repo)
+        self._reload_repo_combo()
+        self.choose_sparse_folders()
+
     def toggle_tree_expansion(self):
         if self.is_all_expanded:
             self.tree.collapseAll()
@@ -1498,24 +5404,28 @@ class GitHubManagerApp(QMainWindow):
         #HLine { color: #444; }
         #StatusLabel { color: #ccc; font-size: 12px; }
         #GitStatus { font-weight: bold; font-size: 13px; border-top: 1px solid #555; padding-top: 8px; margin-top: 5px; }
+        #QueueStatus { color: #FFB74D; font-size: 12px; }
         #StatusFrame { background-color: #252526; border: 1px solid #3e3e3e; border-radius: 6px; }
         QPushButton { background-color: #333; border: 1px solid #555; border-radius: 4px; padding: 4px; color: #eee; }
         QPushButton:hover { background-color: #444; border-color: #666; }
         QPushButton:pressed { background-color: #222; }
         #PreviewToggle { padding: 4px 10px; text-align: left; }
         #PreviewToggle:checked { background-color: #2f2f2f; border-color: #0078d4; }
+        #SearchModeToggle:checked { background-color: #2f2f2f; border-color: #0078d4; color: #fff; }
         #PrimaryButton { background-color: #007acc; border: none; font-weight: bold; }
         #PrimaryButton:hover { background-color: #0062a3; }
         #GreenButton { background-color: #28a745; border: none; font-weight: bold; }
         #GreenButton:hover { background-color: #218838; }
         #TreeToolbar { background-color: #252526; border-bottom: 1px solid #333; }
         QLineEdit { background-color: #252526; border: 1px solid #3e3e3e; border-radius: 4px; padding: 6px; color: #fff; }
+        QComboBox { background-color: #252526; border: 1px solid #3e3e3e; border-radius: 4px; padding: 4px 6px; color: #fff; }
+        QComboBox QAbstractItemView { background-color: #252526; color: #fff; selection-background-color: #0078d4; }
         QTreeView { background-color: #252526; border: none; color: #ddd; outline: 0; font-size: 12px; }
         #SearchResultsFrame { background-color: #252526; border: 1px solid #3e3e3e; border-radius: 6px; }
-        QListWidget#SearchResults { background-color: transparent; border: none; }
-        QTreeView::item, QListWidget::item { padding: 2px; border: none; }
-        QTreeView::item:hover, QListWidget::item:hover { background-color: #2a2d2e; }
-        QTreeView::item:selected, QListWidget::item:selected { background-color: #37373d; color: #fff; border: none; }
+        QListView#SearchResults { background-color: transparent; border: none; }
+        QTreeView::item, QListView::item { padding: 2px; border: none; }
+        QTreeView::item:hover, QListView::item:hover { background-color: #2a2d2e; }
+        QTreeView::item:selected, QListView::item:selected { background-color: #37373d; color: #fff; border: none; }
         QTreeView::item:focus { outline: none; border: none; }
         QTreeView QLineEdit { padding: 0px; margin: 0px; border: 1px solid #007acc; background-color: #252526; color: #ffffff; font-size: 12px; }
         QHeaderView::section { background-color: #1e1e1e; color: #aaa; padding: 2px; font-weight: bold; border: none; border-right: 1px solid #333; border-bottom: 1px solid #333; }
@@ -1528,10 +5438,13 @@ class GitHubManagerApp(QMainWindow):
         self.setStyleSheet(style)
 
     def check_git_status_loop(self):
-        if not self.status_worker.isRunning():
-            self.status_worker.start()
+        self.status_tracker.request_sweep()
+
+    def on_git_changes(self, changes):
+        self.source_model.set_status_map(self.repo_path, changes)
 
     def on_git_status_result(self, count, success):
+        self._worktree_clean = success and count == 0
         if not success:
             self.git_status_indicator.setText("❌ 仓库无效")
             self.git_status_indicator.setStyleSheet("color: #FF5252;")
@@ -1539,34 +5452,478 @@ class GitHubManagerApp(QMainWindow):
         if count > 0:
             self.git_status_indicator.setText(f"⚠️ {count}个变更待上传")
             self.git_status_indicator.setStyleSheet("color: #FFD700;")
+            self.auto_sync.notify_change()
         else:
             self.git_status_indicator.setText("✔ 0个变更待上传")
             self.git_status_indicator.setStyleSheet("color: #4CAF50;")
 
-    def start_sync(self):
+    def on_paths_touched(self, paths):
+        root = os.path.abspath(self.repo_path)
+        for path in paths:
+            rel = os.path.relpath(os.path.abspath(path), root)
+            if rel == "." or rel.startswith(".."):
+                continue
+            rel = rel.replace("\\", "/")
+            if rel.split("/", 1)[0] == ".trash_bin":
+                continue
+            self.pending_paths.add(rel)
+        self._last_activity = time.monotonic()
+        self.invalidate_search_cache()
+        self.status_tracker.notify_paths(paths)
+        self.auto_sync.notify_change()
+
+    def invalidate_search_cache(self):
+        if self.file_index is not None:
+            self.file_index.mark_stale()
+
+    def _sync_paths(self):
+        if not self.status_tracker.has_sweep:
+            return None
+        return sorted(self.pending_paths | set(self.status_tracker.changes))
+
+    def apply_auto_sync_config(self):
+        self.auto_sync.configure(
+            self.config.get("auto_sync", DEFAULT_CONFIG["auto_sync"]),
+            self.config.get("auto_sync_quiet_sec", DEFAULT_CONFIG["auto_sync_quiet_sec"]),
+            self.config.get("auto_sync_min_interval_sec", DEFAULT_CONFIG["auto_sync_min_interval_sec"]),
+        )
+
+    def apply_compression_config(self):
+        self.tree.compression_adaptive = bool(self.config.get("compression_adaptive", DEFAULT_CONFIG["compression_adaptive"]))
+        self.tree.compression_dpi_floor = int(self.config.get("compression_dpi_floor", DEFAULT_CONFIG["compression_dpi_floor"]))
+
+    def on_auto_sync_requested(self):
+        if self._is_syncing():
+            self.auto_sync.defer()
+            return
+        self.start_sync(auto=True)
+
+    def start_sync(self, auto=False, conflict_strategy=None):
+        if self._is_syncing():
+            if auto:
+                self.auto_sync.defer()
+            else:
+                QMessageBox.information(self, "提示", "同步进行中，请稍后再试。")
+            return
+        if self.yield_maintenance(then=lambda: self.start_sync(auto=auto, conflict_strategy=conflict_strategy)):
+            self.btn_sync.setEnabled(False)
+            self.status_label.setText("正在暂停仓库维护，随后开始同步...")
+            return
+        self._last_activity = time.monotonic()
+        self.auto_sync.mark_synced()
         self.btn_sync.setEnabled(False)
+        self.progress_bar.setRange(0, 0)
         self.progress_bar.show()
         self.status_label.setText("正在准备同步...")
-        self.status_timer.stop()
-        self.git_worker = GitWorker(self.repo_path)
+        self.status_tracker.pause()
+        self._syncing_paths = set(self.pending_paths)
+        self.git_worker = GitWorker(self.repo_path, paths=self._sync_paths(), sync_queue=self.sync_queue, auto=auto,
+                                    conflict_strategy=conflict_strategy)
         self.git_worker.status_signal.connect(self.update_status)
+        self.git_worker.pulled_signal.connect(self.on_remote_paths_pulled)
+        self.git_worker.progress_signal.connect(self.update_progress)
         self.git_worker.finished_signal.connect(self.sync_finished)
         self.git_worker.start()
 
     def update_status(self, text):
         self.status_label.setText(text)
 
+    def update_progress(self, percent):
+        if self.progress_bar.maximum() != 100:
+            self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(percent)
+
     def sync_finished(self, success, message):
+        # finished_signal 在 run() 末尾发出，等线程真正退出，后续重试才不会被 _is_syncing 拦下
+        self.git_worker.wait()
         self.btn_sync.setEnabled(True)
         self.progress_bar.hide()
         self.status_label.setText(message)
-        self.status_timer.start(3000)
+        self.status_tracker.resume()
+        self.update_queue_indicator()
         if success:
-            QMessageBox.information(self, "同步成功", "文件已成功推送到 GitHub！")
+            self.pending_paths -= self._syncing_paths
+            if not self.git_worker.auto:
+                QMessageBox.information(self, "同步成功", "文件已成功推送到 GitHub！")
+            self.check_git_status_loop()
+        elif self.git_worker.sync.queued:
+            self.pending_paths -= self._syncing_paths
             self.check_git_status_loop()
+        elif self.git_worker.sync.outcome == "blocked":
+            self.handle_large_blobs(self.git_worker.sync.large_blobs)
+        elif self.git_worker.sync.outcome == "conflict":
+            self.handle_sync_conflicts(self.git_worker.sync.conflicts)
+        elif self.git_worker.auto:
+            self.status_label.setText(f"自动同步失败: {message[:200]}")
         else:
             QMessageBox.warning(self, "同步失败", message)
 
+    def on_remote_paths_pulled(self, rel_paths):
+        # 只刷新远程改动过的路径，不做全量扫描
+        if _is_sparse_repo(self.repo_path):
+            self.refresh_placeholders()
+        abs_paths = [os.path.join(self.repo_path, *p.split("/")) for p in rel_paths]
+        self.status_tracker.notify_paths(abs_paths)
+
+    def on_retry_paths_pulled(self, repo_path, rel_paths):
+        if os.path.normcase(os.path.abspath(repo_path)) == os.path.normcase(os.path.abspath(self.repo_path)):
+            self.on_remote_paths_pulled(rel_paths)
+
+    def handle_sync_conflicts(self, paths):
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle("同步冲突")
+        msg_box.setIcon(QMessageBox.Icon.Warning)
+        msg_box.setText(
+            f"另一台电脑也修改了以下 {len(paths)} 个文件，无法自动合并。\n"
+            "本地提交已保留，尚未推送。请选择以哪一边的版本为准（另一边的版本仍保留在 Git 历史或 .trash_bin 中）："
+        )
+        msg_box.setDetailedText("\n".join(paths))
+        btn_local = msg_box.addButton("保留本地版本", QMessageBox.ButtonRole.ActionRole)
+        btn_remote = msg_box.addButton("使用远程版本", QMessageBox.ButtonRole.ActionRole)
+        msg_box.addButton("稍后处理", QMessageBox.ButtonRole.RejectRole)
+        msg_box.exec()
+        if msg_box.clickedButton() == btn_local:
+            self.start_sync(conflict_strategy="local")
+        elif msg_box.clickedButton() == btn_remote:
+            self.start_sync(conflict_strategy="remote")
+
+    def handle_large_blobs(self, blobs):
+        oversized = [b for b in blobs if b["oversized"]]
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle("文件过大")
+        msg_box.setIcon(QMessageBox.Icon.Warning)
+        msg_box.setText(
+            f"以下 {len(oversized)} 个文件超过 GitHub 单文件 100MB 限制，推送已取消（尚未上传任何数据）。\n"
+            "请选择处理方式："
+        )
+        msg_box.setDetailedText(_describe_large_blobs(blobs))
+        btn_compress = msg_box.addButton("压缩 PDF 后重新同步", QMessageBox.ButtonRole.ActionRole)
+        btn_exclude = msg_box.addButton("排除这些文件", QMessageBox.ButtonRole.ActionRole)
+        msg_box.addButton("稍后处理", QMessageBox.ButtonRole.RejectRole)
+        msg_box.exec()
+        if msg_box.clickedButton() == btn_compress:
+            self.resolve_large_blobs(oversized, compress=True)
+        elif msg_box.clickedButton() == btn_exclude:
+            self.resolve_large_blobs(oversized, compress=False)
+
+    def resolve_large_blobs(self, blobs, compress):
+        if self._large_blob_jobs:
+            QMessageBox.information(self, "提示", "超大文件正在压缩，完成后会自动重新同步。")
+            return
+        upstream = _upstream_commit(self.repo_path)
+        if not upstream:
+            QMessageBox.warning(self, "无法处理", "当前分支没有远程跟踪分支，无法自动撤回本地提交，请手动处理。")
+            return
+        try:
+            # 把未推送的提交退回暂存区，大文件才不会留在待推送的历史里
+            _run_git_cli(self.repo_path, ["reset", "-q", "--soft", upstream])
+        except GitCommandError as e:
+            QMessageBox.warning(self, "无法处理", f"撤回本地提交失败: {e}")
+            return
+
+        excluded = []
+        for blob in blobs:
+            rel = blob["path"]
+            abs_path = os.path.join(self.repo_path, *rel.split("/"))
+            if compress and rel.lower().endswith(".pdf") and os.path.isfile(abs_path):
+                job_id = self._compression_queue().submit(abs_path, self.tree.compression_profiles())
+                self._large_blob_jobs[job_id] = rel
+                self.tree.compression_dialog.add_job(job_id, rel)
+                continue
+            excluded.append(rel)
+        self._large_blob_result = {"compressed": [], "excluded": excluded}
+        if self._large_blob_jobs:
+            self.status_label.setText(f"正在后台压缩 {len(self._large_blob_jobs)} 个超大 PDF，完成后自动重新同步...")
+            self.tree.compression_dialog.show()
+            self.tree.compression_dialog.raise_()
+        else:
+            self.finish_large_blobs()
+
+    def on_large_blob_compressed(self, job_id, success, output_path, message):
+        rel = self._large_blob_jobs.pop(job_id, None)
+        if rel is None:
+            return
+        abs_path = os.path.join(self.repo_path, *rel.split("/"))
+        dialog = self.tree.compression_dialog
+        result = self._large_blob_result
+        fits = success and os.path.isfile(abs_path) and os.path.getsize(output_path) <= GITHUB_BLOB_LIMIT
+        original_size = os.path.getsize(abs_path) if fits else 0
+        if fits and self._trash_before_replace(abs_path):
+            new_size = os.path.getsize(output_path)
+            shutil.move(output_path, abs_path)
+            result["compressed"].append(rel)
+            self.pending_paths.add(rel)
+            dialog.set_result(job_id, True, f"{original_size / (1024 * 1024):.1f}MB → {new_size / (1024 * 1024):.1f}MB")
+        else:
+            result["excluded"].append(rel)
+            if message == CompressionQueue.CANCELLED:
+                dialog.set_result(job_id, False, "已取消压缩，已排除")
+            elif fits:
+                dialog.set_result(job_id, False, "原文件无法移入回收站，已排除")
+            else:
+                dialog.set_result(job_id, False, "压缩后仍超过 100MB，已排除" if success else f"压缩失败，已排除: {message}")
+        if output_path and os.path.exists(output_path):
+            os.remove(output_path)
+        if not self._large_blob_jobs:
+            self.finish_large_blobs()
+
+    def finish_large_blobs(self):
+        compressed, excluded = self._large_blob_result["compressed"], self._large_blob_result["excluded"]
+        if excluded:
+            gitignore_path = os.path.join(self.repo_path, ".gitignore")
+            existing = ""
+            if os.path.exists(gitignore_path):
+                with open(gitignore_path, 'r', encoding='utf-8') as f:
+                    existing = f.read()
+            present = existing.splitlines()
+            rules = [rule for rule in map(_gitignore_rule, excluded) if rule not in present]
+            if rules:
+                with open(gitignore_path, 'a', encoding='utf-8') as f:
+                    f.write("\n" + "\n".join(rules) + "\n")
+            try:
+                _run_git_cli(self.repo_path, ["--literal-pathspecs", "rm", "-q", "--cached", "--ignore-unmatch", "--", *excluded])
+            except GitCommandError as e:
+                QMessageBox.warning(self, "排除失败", str(e))
+                return
+            self.pending_paths.update([".gitignore", *excluded])
+
+        summary = []
+        if compressed:
+            summary.append(f"已压缩 {len(compressed)} 个文件（原文件已移入 .trash_bin）")
+        if excluded:
+            summary.append(f"已排除 {len(excluded)} 个文件（已加入 .gitignore）")
+        self.status_label.setText("；".join(summary))
+        self.start_sync()
+
+    def maybe_run_maintenance(self):
+        if self.maintenance_worker is not None and self.maintenance_worker.isRunning():
+            return
+        if self._is_syncing() or not self._worktree_clean:
+            return
+        if time.monotonic() - self._last_activity < MAINTENANCE_IDLE_SEC:
+            return
+        if not os.path.isdir(os.path.join(self.repo_path, ".git")):
+            return
+        tasks = _due_maintenance_tasks(self.repo_path)
+        if not tasks:
+            return
+        self.maintenance_worker = MaintenanceWorker(self.repo_path, tasks)
+        self.maintenance_worker.task_signal.connect(lambda name: self.status_label.setText(f"空闲维护中: git {name}"))
+        self.maintenance_worker.finished_signal.connect(self.on_maintenance_finished)
+        self.maintenance_worker.finished.connect(self._on_maintenance_stopped)
+        self.maintenance_worker.start()
+
+    def yield_maintenance(self, then=None):
+        # 只请求中断，不阻塞界面；需要等维护进程退出后再做的事由 then 排队，返回是否需要等待
+        if self.maintenance_worker is None or not self.maintenance_worker.isRunning():
+            return False
+        self.maintenance_worker.requestInterruption()
+        if then is not None:
+            self._after_maintenance.append(then)
+        return True
+
+    def _on_maintenance_stopped(self):
+        callbacks, self._after_maintenance = self._after_maintenance, []
+        for callback in callbacks:
+            callback()
+
+    def shutdown_maintenance(self):
+        if self.maintenance_worker is not None and self.maintenance_worker.isRunning():
+            self.maintenance_worker.requestInterruption()
+            self.maintenance_worker.wait()
+
+    def on_maintenance_finished(self, records, yielded):
+        if not records:
+            return
+        reclaimed = sum(r["reclaimed"] or 0 for r in records if r["outcome"] == "ok")
+        duration = sum(r["duration"] for r in records)
+        if yielded:
+            self.status_label.setText("仓库维护已暂停，稍后空闲时继续。")
+        else:
+            self.status_label.setText(f"仓库维护完成，用时 {duration:.1f} 秒，回收 {reclaimed / (1024 * 1024):.1f}MB。")
+
+    def _is_syncing(self):
+        return (self.git_worker is not None and self.git_worker.isRunning()) or \
+               (self.sync_retry_worker is not None and self.sync_retry_worker.isRunning()) or \
+               (self.sync_all_worker is not None and self.sync_all_worker.isRunning())
+
+    def _save_workspace(self):
+        self.config = {**self.config, "repos": self.repos, "repo_path": self.repo_path, "base_url": self.base_url}
+        ConfigManager.save(self.config)
+
+    def _reload_repo_combo(self):
+        self.repo_combo.blockSignals(True)
+        self.repo_combo.clear()
+        for repo in self.repos:
+            self.repo_combo.addItem(repo["name"], repo["repo_path"])
+            self.repo_combo.setItemData(self.repo_combo.count() - 1, repo["repo_path"], Qt.ItemDataRole.ToolTipRole)
+        current = next((i for i, r in enumerate(self.repos) if r["repo_path"] == self.repo_path), 0)
+        self.repo_combo.setCurrentIndex(current)
+        self.repo_combo.blockSignals(False)
+        self.btn_remove_repo.setEnabled(len(self.repos) > 1)
+
+    def on_repo_combo_changed(self, index):
+        if index < 0 or index >= len(self.repos):
+            return
+        repo = self.repos[index]
+        if repo["repo_path"] == self.repo_path:
+            return
+        if self._is_syncing():
+            QMessageBox.information(self, "提示", "同步进行中，请稍后再切换仓库。")
+            self._reload_repo_combo()
+            return
+        self.activate_repo(repo)
+
+    def activate_repo(self, repo):
+        self._repo_states[self.repo_path] = {
+            "pending_paths": self.pending_paths,
+            "expanded": self._get_expanded_paths(),
+            "current": self._get_current_path(),
+            "placeholder_expanded": self.placeholder_expanded,
+        }
+        self.yield_maintenance()
+        self.cancel_search()
+        self.repo_path = repo["repo_path"]
+        self.base_url = repo["base_url"]
+        self._save_workspace()
+        state = self._repo_states.get(self.repo_path, {})
+        self.pending_paths = state.get("pending_paths", set())
+        self._switch_repo()
+        self.placeholder_expanded = state.get("placeholder_expanded", set())
+        if self.placeholder_expanded:
+            self.refresh_placeholders()
+        QTimer.singleShot(50, lambda: self._restore_tree_state(state.get("expanded", set()), state.get("current")))
+        self.status_label.setText(f"已切换到仓库: {repo['name']}")
+
+    def add_repo(self):
+        path = QFileDialog.getExistingDirectory(self, "选择 Git 仓库文件夹")
+        if not path:
+            return
+        if not os.path.isdir(os.path.join(path, ".git")):
+            QMessageBox.warning(self, "路径无效", "所选文件夹不是 Git 仓库！")
+            return
+        if any(os.path.normcase(os.path.abspath(r["repo_path"])) == os.path.normcase(os.path.abspath(path))
+               for r in self.repos):
+            QMessageBox.information(self, "提示", "该仓库已在工作区中。")
+            return
+        url, ok = QInputDialog.getText(self, "GitHub Pages URL", "该仓库的 GitHub Pages URL:")
+        if not ok:
+            return
+        url = url.strip()
+        if url and not url.endswith("/"):
+            url += "/"
+        repo = {"name": _repo_display_name(path), "repo_path": path, "base_url": url}
+        self.repos.append(repo)
+        self.activate_repo(repo)
+        self._reload_repo_combo()
+
+    def remove_repo(self):
+        if len(self.repos) <= 1 or self._is_syncing():
+            return
+        index = self.repo_combo.currentIndex()
+        repo = self.repos[index]
+        reply = QMessageBox.question(self, "移除仓库", f"从工作区移除 '{repo['name']}'？（不会删除本地文件）",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        del self.repos[index]
+        self._repo_states.pop(repo["repo_path"], None)
+        self.activate_repo(self.repos[min(index, len(self.repos) - 1)])
+        self._reload_repo_combo()
+
+    def start_sync_all(self):
+        if self._is_syncing():
+            QMessageBox.information(self, "提示", "同步进行中，请稍后再试。")
+            return
+        if self.yield_maintenance(then=self.start_sync_all):
+            self.btn_sync_all.setEnabled(False)
+            self.status_label.setText("正在暂停仓库维护，随后开始同步...")
+            return
+        self.status_tracker.pause()
+        self.btn_sync.setEnabled(False)
+        self.btn_sync_all.setEnabled(False)
+        self.sync_all_dialog = SyncAllDialog(self.repos, self)
+        self.sync_all_dialog.show()
+        self.sync_all_worker = SyncAllWorker([r["repo_path"] for r in self.repos], sync_queue=self.sync_queue)
+        self.sync_all_worker.repo_status_signal.connect(self.sync_all_dialog.set_status)
+        self.sync_all_worker.repo_progress_signal.connect(self.sync_all_dialog.set_progress)
+        self.sync_all_worker.repo_finished_signal.connect(self.sync_all_dialog.set_result)
+        self.sync_all_worker.repo_pulled_signal.connect(self.on_retry_paths_pulled)
+        self.sync_all_worker.finished_signal.connect(self.on_sync_all_finished)
+        self.status_label.setText(f"正在同步 {len(self.repos)} 个仓库...")
+        self.sync_all_worker.start()
+
+    def on_sync_all_finished(self, succeeded, total):
+        self.btn_sync.setEnabled(True)
+        self.btn_sync_all.setEnabled(True)
+        self.status_tracker.resume()
+        self.auto_sync.mark_synced()
+        # 只清掉同步成功的仓库的待同步路径，失败的下次还要继续检查
+        if self.repo_path in succeeded:
+            self.pending_paths = set()
+        for repo_path, state in self._repo_states.items():
+            if repo_path in succeeded:
+                state["pending_paths"] = set()
+        message = f"全部同步完成：{len(succeeded)}/{total} 个仓库成功"
+        self.status_label.setText(message)
+        if self.sync_all_dialog is not None:
+            self.sync_all_dialog.summary.setText(message)
+        self.update_queue_indicator()
+        self.check_git_status_loop()
+
+    def process_sync_queue(self):
+        if self._is_syncing():
+            return
+        for entry in self.sync_queue.due():
+            repo_path = entry.get("repo_path")
+            if not repo_path or not os.path.exists(repo_path):
+                continue
+            self.sync_retry_worker = SyncRetryWorker(self.sync_queue, repo_path)
+            self.sync_retry_worker.finished_signal.connect(self.on_sync_retry_finished)
+            self.sync_retry_worker.pulled_signal.connect(self.on_retry_paths_pulled)
+            self.status_label.setText("正在后台重试上传排队的提交...")
+            self.sync_retry_worker.start()
+            return
+
+    def on_sync_retry_finished(self, repo_path, success, message):
+        if success:
+            self.status_label.setText("排队的提交已成功上传。")
+            self.check_git_status_loop()
+        else:
+            entry = self.sync_queue.get(repo_path)
+            if entry is not None:
+                self.status_label.setText(f"后台上传仍未成功（第 {entry.get('attempts', 0)} 次），稍后自动重试。")
+            else:
+                self.status_label.setText(f"后台上传失败，已移出队列: {message[:200]}")
+        self.update_queue_indicator()
+
+    def update_queue_indicator(self):
+        entry = self.sync_queue.get(self.repo_path)
+        if entry is None:
+            self.queue_indicator.hide()
+            return
+        if self.pending_count_worker is not None and self.pending_count_worker.isRunning():
+            # 计数中途仓库或队列变了，等这一轮结束后再算一次
+            self._pending_count_stale = True
+            return
+        self._pending_count_stale = False
+        self.pending_count_worker = PendingPushCountWorker(self.repo_path)
+        self.pending_count_worker.result_signal.connect(self.on_pending_push_count)
+        self.pending_count_worker.finished.connect(self._on_pending_count_done)
+        self.pending_count_worker.start()
+
+    def _on_pending_count_done(self):
+        if self._pending_count_stale:
+            self.update_queue_indicator()
+
+    def on_pending_push_count(self, repo_path, count):
+        entry = self.sync_queue.get(repo_path)
+        if repo_path != self.repo_path or entry is None:
+            return
+        wait_sec = max(0, int(entry.get("next_retry_at", 0) - time.time()))
+        self.queue_indicator.setText(f"⏳ {count} 个提交等待上传（{wait_sec // 60}分{wait_sec % 60}秒后重试）")
+        self.queue_indicator.show()
+
     def copy_selected_url(self):
         proxy_indexes = self.tree.selectionModel().selectedRows(0)
         if not proxy_indexes:
@@ -1588,57 +5945,111 @@ class GitHubManagerApp(QMainWindow):
         else:
             self.status_label.setText("未生成有效链接")
 
+    def on_search_mode_toggled(self, checked):
+        self.search_input.setPlaceholderText("搜索文件内容..." if checked else "搜索文件...")
+        if checked:
+            self.start_content_indexing()
+        if self.search_input.text().strip():
+            self.perform_search()
+
+    def cancel_search(self):
+        for worker in self._search_workers:
+            worker.requestInterruption()
+
+    def _retire_search_worker(self, worker):
+        if worker in self._search_workers:
+            self._search_workers.remove(worker)
+        worker.deleteLater()
+
+    def on_search_text_changed(self, _text):
+        self._last_activity = time.monotonic()
+        self.search_debounce_timer.start(350 if self.search_mode_btn.isChecked() else 200)
+
+    def _current_search_cache_key(self, text, content_mode):
+        if content_mode:
+            generation = self.content_index.generation if self.content_index else -1
+        else:
+            generation = self.file_index.generation if self.file_index else -1
+        return (content_mode, text, generation)
+
     def perform_search(self):
+        self.search_debounce_timer.stop()
         text = self.search_input.text().strip().lower()
-        self.search_list.clear()
+        self._search_generation += 1
+        self.cancel_search()
+        self.search_model.clear()
         self.search_list.setVisible(True)
         self.search_list.show()
+        self._search_count = 0
+        self._search_cache_key = None
         if not text: return
-        source_root_index = self.source_model.index(self.repo_path)
-        count = self.search_recursive_populate(source_root_index, text)
+        if self.file_index is None:
+            self.status_label.setText("搜索索引不可用")
+            return
+        content_mode = self.search_mode_btn.isChecked()
+        cache_key = self._current_search_cache_key(text, content_mode)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            self._search_cache.move_to_end(cache_key)
+            self._add_search_results(cached)
+            prefix = "全文" if content_mode else ""
+            if cached:
+                self.status_label.setText(f"{prefix}找到 {len(cached)} 个匹配项 (缓存)")
+            else:
+                self.status_label.setText(f"{prefix}未找到: {text} (缓存)")
+            return
+        self._search_cache_key = cache_key
+        worker = SearchWorker(self._search_generation, text, self.file_index,
+                              content_index=self.content_index, content_mode=content_mode)
+        worker.batch_signal.connect(self.on_search_batch)
+        worker.finished_signal.connect(self.on_search_finished)
+        worker.finished.connect(lambda w=worker: self._retire_search_worker(w))
+        self._search_workers.append(worker)
+        self._search_started = time.perf_counter()
+        self.status_label.setText(f"正在搜索: {text}...")
+        worker.start()
+
+    def on_search_batch(self, generation, batch):
+        if generation != self._search_generation:
+            return
+        self._add_search_results(batch)
+        self._search_count += len(batch)
+        elapsed = time.perf_counter() - self._search_started
+        self.status_label.setText(f"搜索中... 已找到 {self._search_count} 个匹配项 ({elapsed:.2f}s)")
+
+    def on_search_finished(self, generation, count, elapsed, cancelled):
+        if generation != self._search_generation or cancelled:
+            return
+        if self._search_cache_key is not None:
+            self._search_cache[self._search_cache_key] = self.search_model.results()
+            while len(self._search_cache) > 32:
+                self._search_cache.popitem(last=False)
+        text = self.search_input.text().strip()
+        prefix = "全文" if self.search_mode_btn.isChecked() else ""
         if count > 0:
-            self.status_label.setText(f"找到 {count} 个匹配项")
+            self.status_label.setText(f"{prefix}找到 {count} 个匹配项 ({elapsed:.2f}s)")
         else:
-            self.status_label.setText(f"未找到: {text}")
-
+            self.status_label.setText(f"{prefix}未找到: {text} ({elapsed:.2f}s)")
 
-    def search_recursive_populate(self, parent_index, text):
-        count = 0
-        root_path = self.repo_path
-        for current_root, dirnames, filenames in os.walk(root_path):
-            pruned_dirs = []
-            for d in dirnames:
-                if d == "PDF_url_Gemini":
-                    continue
-                full_dir = os.path.join(current_root, d)
-                try:
-                    if QFileInfo(full_dir).isHidden():
-                        continue
-                except Exception:
-                    pass
-                pruned_dirs.append(d)
-            dirnames[:] = pruned_dirs
+    def _add_search_results(self, batch):
+        self.search_model.append_results(batch)
 
-            for name in pruned_dirs + filenames:
-                full_path = os.path.join(current_root, name)
-                try:
-                    if QFileInfo(full_path).isHidden():
-                        continue
-                except Exception:
-                    pass
-                if text in name.lower():
-                    idx = self.source_model.index(full_path)
-                    item = QListWidgetItem(name)
-                    item.setData(Qt.ItemDataRole.UserRole, full_path)
-                    if idx.isValid():
-                        item.setIcon(QIcon(self.source_model.fileIcon(idx)))
-                    self.search_list.addItem(item)
-                    count += 1
-        return count
-
-    def on_search_result_clicked(self, item):
-        file_path = item.data(Qt.ItemDataRole.UserRole)
+    def on_search_result_clicked(self, index):
+        file_path = index.data(Qt.ItemDataRole.UserRole)
         if not file_path: return
+        if not os.path.lexists(file_path) and _is_sparse_repo(self.repo_path):
+            # 只在云端的结果：先展开它的上级占位目录，占位文件写好后再定位
+            rel = os.path.relpath(file_path, self.repo_path).replace("\\", "/")
+            if rel.startswith(".."):
+                return
+            parts = rel.split("/")
+            self.placeholder_expanded.update("/".join(parts[:i]) for i in range(1, len(parts)))
+            self._reveal_after_placeholders = file_path
+            self.refresh_placeholders()
+            return
+        self._reveal_in_tree(file_path)
+
+    def _reveal_in_tree(self, file_path):
         idx = self.source_model.index(file_path)
         if idx.isValid():
             proxy_idx = self.proxy_model.mapFromSource(idx)
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+# main 在导入时就会确定配置目录，必须先把 APPDATA 指到临时目录，避免测试写入真实配置
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="git-cloud-tests-")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+
+def git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True,
+                          encoding="utf-8").stdout
+
+
+def commit_file(repo, rel, content, message=None):
+    path = os.path.join(repo, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    git(repo, "add", rel)
+    git(repo, "commit", "-q", "-m", message or f"update {rel}")
+
+
+def clone(remote, dest):
+    git(os.path.dirname(dest), "clone", "-q", remote, dest)
+    git(dest, "config", "user.name", "Test")
+    git(dest, "config", "user.email", "test@example.com")
+    return dest
+
+
+@pytest.fixture
+def remote(tmp_path):
+    bare = str(tmp_path / "remote.git")
+    git(str(tmp_path), "init", "-q", "--bare", "-b", "main", bare)
+    seed = clone(bare, str(tmp_path / "seed"))
+    git(seed, "checkout", "-q", "-b", "main")
+    commit_file(seed, "README.md", "seed\n", "init")
+    git(seed, "push", "-q", "origin", "main")
+    return bare
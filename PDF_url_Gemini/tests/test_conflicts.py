@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+import main
+from conftest import clone, commit_file, git
+
+
+@pytest.fixture
+def clones(remote, tmp_path):
+    return clone(remote, str(tmp_path / "pc")), clone(remote, str(tmp_path / "laptop"))
+
+
+def _read(repo, rel):
+    with open(os.path.join(repo, rel), encoding="utf-8") as f:
+        return f.read()
+
+
+def _push(repo):
+    git(repo, "push", "-q", "origin", "HEAD")
+
+
+def test_edit_edit_conflict_is_reported_without_strategy(clones):
+    pc, laptop = clones
+    commit_file(pc, "README.md", "from pc\n")
+    _push(pc)
+    commit_file(laptop, "README.md", "from laptop\n")
+
+    with pytest.raises(main.SyncConflictError) as exc:
+        main._pull_remote(laptop)
+    assert exc.value.paths == ["README.md"]
+    assert not main._rebase_in_progress(laptop)
+    assert _read(laptop, "README.md") == "from laptop\n"
+
+
+@pytest.mark.parametrize("strategy, expected", [("local", "from laptop\n"), ("remote", "from pc\n")])
+def test_edit_edit_conflict_resolved_per_path(clones, strategy, expected):
+    pc, laptop = clones
+    commit_file(pc, "README.md", "from pc\n")
+    commit_file(pc, "docs/other.txt", "unrelated\n")
+    _push(pc)
+    commit_file(laptop, "README.md", "from laptop\n")
+
+    pulled = main._pull_remote(laptop, strategy=strategy)
+    assert "docs/other.txt" in pulled
+    assert not main._rebase_in_progress(laptop)
+    assert _read(laptop, "README.md") == expected
+    assert _read(laptop, "docs/other.txt") == "unrelated\n"
+    _push(laptop)
+
+
+@pytest.mark.parametrize("strategy, kept", [("local", False), ("remote", True)])
+def test_modify_delete_conflict(clones, strategy, kept):
+    pc, laptop = clones
+    commit_file(pc, "README.md", "edited on pc\n")
+    _push(pc)
+    git(laptop, "rm", "-q", "README.md")
+    git(laptop, "commit", "-q", "-m", "delete readme")
+
+    main._pull_remote(laptop, strategy=strategy)
+    assert not main._rebase_in_progress(laptop)
+    assert os.path.exists(os.path.join(laptop, "README.md")) == kept
+    assert git(laptop, "status", "--porcelain") == ""
+    _push(laptop)
+
+
+@pytest.mark.parametrize("diverged", [False, True])
+@pytest.mark.parametrize("strategy", ["local", "remote"])
+def test_untracked_file_clash(clones, strategy, diverged):
+    pc, laptop = clones
+    commit_file(pc, "report.txt", "from pc\n")
+    _push(pc)
+    if diverged:
+        commit_file(laptop, "notes.txt", "laptop only\n")
+    with open(os.path.join(laptop, "report.txt"), "w", encoding="utf-8") as f:
+        f.write("untracked on laptop\n")
+
+    with pytest.raises(main.SyncConflictError) as exc:
+        main._pull_remote(laptop)
+    assert exc.value.paths == ["report.txt"]
+
+    main._pull_remote(laptop, strategy=strategy)
+    assert not main._rebase_in_progress(laptop)
+    trash = os.path.join(laptop, ".trash_bin")
+    if strategy == "local":
+        assert _read(laptop, "report.txt") == "untracked on laptop\n"
+        assert git(laptop, "status", "--porcelain") == ""
+    else:
+        assert _read(laptop, "report.txt") == "from pc\n"
+        assert [name[-len("report.txt"):] for name in os.listdir(trash)] == ["report.txt"]
+    _push(laptop)
+    assert git(pc, "pull", "-q") == ""
+    assert _read(pc, "report.txt") == _read(laptop, "report.txt")
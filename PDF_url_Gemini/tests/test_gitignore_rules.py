@@ -0,0 +1,38 @@
+import os
+import subprocess
+
+import pytest
+
+import main
+from conftest import git
+
+NAMES = ["Report [v2].pdf", "a*b.pdf", "what?.pdf", "!important.pdf", "#1 scan.pdf",
+         "trailing .pdf ", "dir [x]/back\\slash.pdf"]
+
+
+def _ignored(repo, rel):
+    result = subprocess.run(["git", "check-ignore", "-q", "--no-index", "--", rel], cwd=repo)
+    return result.returncode == 0
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = str(tmp_path / "repo")
+    git(str(tmp_path), "init", "-q", path)
+    return path
+
+
+@pytest.mark.parametrize("rel", NAMES)
+def test_rule_ignores_exactly_that_file(repo, rel):
+    with open(os.path.join(repo, ".gitignore"), "w", encoding="utf-8") as f:
+        f.write(main._gitignore_rule(rel) + "\n")
+
+    assert _ignored(repo, rel)
+
+
+def test_rules_do_not_match_lookalike_names(repo):
+    with open(os.path.join(repo, ".gitignore"), "w", encoding="utf-8") as f:
+        f.write("\n".join(main._gitignore_rule(rel) for rel in NAMES) + "\n")
+
+    for lookalike in ("Report v.pdf", "a-long-b.pdf", "whatX.pdf", "trailing .pdf", "dir x/back\\slash.pdf"):
+        assert not _ignored(repo, lookalike), lookalike
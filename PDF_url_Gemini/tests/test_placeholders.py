@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pytest
+from git import GitCommandError
+
+import main
+from conftest import clone, commit_file, git
+
+
+@pytest.fixture
+def partial(remote, tmp_path):
+    seed = clone(remote, str(tmp_path / "upload"))
+    commit_file(seed, "A/f.pdf", "report body\n")
+    commit_file(seed, "B/g.pdf", "other body\n")
+    git(seed, "push", "-q", "origin", "HEAD")
+    git(remote, "config", "uploadpack.allowFilter", "true")
+    repo = str(tmp_path / "partial")
+    worker = main.PartialCloneWorker("file://" + remote, repo)
+    results = []
+    worker.finished_signal.connect(lambda ok, message: results.append((ok, message)))
+    worker.run()
+    assert results and results[0][0], results
+    main._write_placeholders(repo, ["A/f.pdf"])
+    return repo
+
+
+def _relocate(repo, src_rel, dst_rel, keep_source=False):
+    src = os.path.join(repo, *src_rel.split("/"))
+    dst = os.path.join(repo, *dst_rel.split("/"))
+    entries = main._placeholders_under(repo, src)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if keep_source:
+        shutil.copy2(src, dst)
+        main._update_index_entries(repo, added=main._relocated_entries(repo, entries, src, dst))
+    else:
+        shutil.move(src, dst)
+        main._update_index_entries(repo, removed=entries, added=main._relocated_entries(repo, entries, src, dst))
+
+
+def _read(repo, rel):
+    with open(os.path.join(repo, *rel.split("/")), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_moved_placeholder_opens_before_sync(partial):
+    _relocate(partial, "A/f.pdf", "B/f.pdf")
+
+    main._hydrate_path(partial, "B/f.pdf")
+
+    assert _read(partial, "B/f.pdf") == "report body\n"
+    assert "S B/f.pdf" not in git(partial, "ls-files", "-t", "--", "B/f.pdf")
+    assert git(partial, "ls-files", "--", "A/f.pdf") == ""
+
+
+def test_copied_placeholder_opens_before_sync(partial):
+    _relocate(partial, "A/f.pdf", "B/copy.pdf", keep_source=True)
+
+    main._hydrate_path(partial, "B/copy.pdf")
+
+    assert _read(partial, "B/copy.pdf") == "report body\n"
+    assert os.path.getsize(os.path.join(partial, "A", "f.pdf")) == 0
+
+
+def test_hydrate_rejects_path_missing_from_index(partial):
+    with pytest.raises(GitCommandError):
+        main._hydrate_path(partial, "A/missing.pdf")
+
+
+def _search(index, text):
+    return sorted(os.path.relpath(path, index.repo_path).replace(os.sep, "/") for path, _, _, _ in index.search(text))
+
+
+def test_filename_search_finds_cloud_only_files(partial):
+    index = main.FileIndex(partial, db_path=":memory:")
+    index.reconcile()
+    assert not os.path.exists(os.path.join(partial, "B", "g.pdf"))
+    assert _search(index, "g.pdf") == ["B/g.pdf"]
+    assert _search(index, "f.pdf") == ["A/f.pdf"]
+
+    # 展开后同一路径换成磁盘上的占位文件，不会重复
+    main._write_placeholders(partial, ["B/g.pdf"])
+    index.reconcile()
+    assert _search(index, "g.pdf") == ["B/g.pdf"]
+
+    # 从索引删除后搜索结果随之消失
+    os.remove(os.path.join(partial, "B", "g.pdf"))
+    main._update_index_entries(partial, removed=main._placeholders_under(partial, os.path.join(partial, "B")))
+    index.reconcile()
+    assert _search(index, "g.pdf") == []
+    index.close()
@@ -0,0 +1,144 @@
+import os
+import zlib
+
+import pytest
+
+import main
+
+# 自适应模式默认下限 150 DPI 时参与的方案
+PROFILES = main._profiles_for_dpi_floor(150)
+
+
+def _write_pdf(path, objects):
+    # objects: [(对象号, 字典, 流数据或 None)]，不写 xref，预检本来就是顺序扫描
+    out = b"%PDF-1.5\n"
+    for num, obj_dict, stream in objects:
+        out += b"%d 0 obj\n" % num + obj_dict
+        if stream is not None:
+            out += b"\nstream\n" + stream + b"\nendstream"
+        out += b"\nendobj\n"
+    out += b"trailer\n<< /Root 1 0 R >>\n%%EOF\n"
+    with open(path, "wb") as f:
+        f.write(out)
+    return str(path)
+
+
+def _image(num, width, height, data, length=None):
+    length = length if length is not None else str(len(data)).encode()
+    return (num, b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                 b"/BitsPerComponent 8 /Filter /DCTDecode /Length " % (width, height) + length + b" >>", data)
+
+
+def _content(num, text):
+    data = zlib.compress(text)
+    return (num, b"<< /Length %d /Filter /FlateDecode >>" % len(data), data)
+
+
+def _page(resources, contents=b""):
+    return (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /XObject << "
+            + resources + b" >> >>" + contents + b" >>")
+
+
+CATALOG = [(1, b"<< /Type /Catalog /Pages 2 0 R >>", None),
+           (2, b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>", None)]
+
+
+def _jpeg_bytes(size):
+    data = os.urandom(size)
+    return data.replace(b"endstream", b"endstreaX")
+
+
+@pytest.mark.parametrize("obj_dict, expected", [
+    (b"<< /Length 123 0 R >>", None),
+    (b"<< /Length 123 >>", 123),
+    (b"<< /Length 123/Filter /FlateDecode >>", 123),
+    (b"<< /Length 45 /Width 7 0 R >>", 45),
+])
+def test_pdf_int_skips_indirect_references(obj_dict, expected):
+    assert main._pdf_int(obj_dict, b"Length") == expected
+
+
+def test_indirect_length_stream_is_measured_to_endstream(tmp_path):
+    data = _jpeg_bytes(50_000)
+    path = _write_pdf(tmp_path / "indirect.pdf", CATALOG + [
+        (3, _page(b"/Im1 4 0 R", b" /Contents 5 0 R"), None),
+        _image(4, 800, 600, data, length=b"6 0 R"),
+        (6, str(len(data)).encode(), None),
+        _content(5, b"q 200 0 0 150 100 500 cm /Im1 Do Q"),
+    ])
+
+    report = main._preflight_pdf(path)
+
+    assert len(report["images"]) == 1
+    assert len(data) <= report["images"][0]["bytes"] <= len(data) + 2
+    assert round(report["images"][0]["dpi"]) == 288
+
+
+def test_mediabox_inside_object_stream(tmp_path):
+    page = b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 1440 720] >>"
+    header = b"3 0 "
+    objstm = zlib.compress(header + page)
+    path = _write_pdf(tmp_path / "objstm.pdf", CATALOG + [
+        (7, b"<< /Type /ObjStm /N 1 /First %d /Filter /FlateDecode /Length %d >>" % (len(header), len(objstm)),
+         objstm),
+        _image(4, 2000, 1000, _jpeg_bytes(20_000)),
+    ])
+
+    report = main._preflight_pdf(path)
+
+    assert report["pages"] == 1
+    # 没有绘制信息时按 20 英寸长边铺满估算
+    assert report["effective_dpi"] == 100
+    assert report["dpi_lower_bound"]
+
+
+@pytest.mark.parametrize("form_matrix, expected_dpi", [(b"", 288), (b" /Matrix [2 0 0 2 0 0]", 144)])
+def test_image_drawn_through_form_xobject(tmp_path, form_matrix, expected_dpi):
+    form_content = zlib.compress(b"q 400 0 0 300 0 0 cm /Im1 Do Q")
+    path = _write_pdf(tmp_path / "form.pdf", CATALOG + [
+        (3, _page(b"/Fm1 5 0 R", b" /Contents 6 0 R"), None),
+        _image(4, 800, 600, _jpeg_bytes(50_000)),
+        (5, b"<< /Type /XObject /Subtype /Form /BBox [0 0 400 300]" + form_matrix
+            + b" /Resources << /XObject << /Im1 4 0 R >> >> /Filter /FlateDecode /Length %d >>" % len(form_content),
+         form_content),
+        _content(6, b"q 0.5 0 0 0.5 50 50 cm /Fm1 Do Q"),
+    ])
+
+    report = main._preflight_pdf(path)
+
+    assert [round(image["dpi"]) for image in report["images"]] == [expected_dpi]
+    assert not report["dpi_lower_bound"]
+
+
+def _low_res_scan(tmp_path, drawn):
+    # 1240x1754 铺满 A4 约 150 DPI：已经不会被下采样
+    objects = CATALOG + [_image(4, 1240, 1754, _jpeg_bytes(400_000))]
+    if drawn:
+        objects += [(3, _page(b"/Im1 4 0 R", b" /Contents 5 0 R"), None),
+                    _content(5, b"q 595 0 0 842 0 0 cm /Im1 Do Q")]
+    else:
+        objects += [(3, _page(b"/Im1 4 0 R"), None)]
+    return main._preflight_pdf(_write_pdf(tmp_path / f"scan-{drawn}.pdf", objects))
+
+
+def test_known_low_resolution_is_skipped(tmp_path):
+    report = _low_res_scan(tmp_path, drawn=True)
+
+    worthwhile, best = main._preflight_advice(report, PROFILES)
+
+    assert not report["dpi_lower_bound"]
+    assert worthwhile == []
+    assert best > report["file_bytes"] * main.PREFLIGHT_MIN_GAIN
+
+
+def test_unknown_draw_size_never_skips(tmp_path):
+    report = _low_res_scan(tmp_path, drawn=False)
+
+    worthwhile, best = main._preflight_advice(report, PROFILES)
+
+    assert report["dpi_lower_bound"]
+    assert not report["images"][0]["dpi_known"]
+    # 按下限预测收益不足，但实际 DPI 可能更高，不能据此跳过
+    assert best > report["file_bytes"] * main.PREFLIGHT_MIN_GAIN
+    assert worthwhile == list(PROFILES)
+    assert "≥" in main._describe_preflight(report, best, worthwhile)
@@ -0,0 +1,65 @@
+import time
+
+import main
+from conftest import clone, commit_file, git
+
+# 本机 1 号端口没有服务，git 会立即报 Connection refused，用来模拟断网
+UNREACHABLE_URL = "http://127.0.0.1:1/remote.git"
+
+
+def _offline_clone(remote, tmp_path):
+    repo = clone(remote, str(tmp_path / "work"))
+    commit_file(repo, "notes/a.txt", "offline change\n")
+    git(repo, "remote", "set-url", "origin", UNREACHABLE_URL)
+    return repo
+
+
+def test_network_error_markers():
+    assert main._is_network_error("fatal: unable to access 'https://github.com/a/b.git/': "
+                                  "Could not resolve host: github.com")
+    assert main._is_network_error("fatal: unable to access 'http://127.0.0.1:1/x.git/': "
+                                  "Failed to connect to 127.0.0.1 port 1: Connection refused")
+    assert main._is_network_error("fatal: unable to access 'https://github.com/a/b.git/': "
+                                  "The requested URL returned error: 502")
+    assert not main._is_network_error("fatal: unable to access 'https://github.com/a/b.git/': "
+                                      "The requested URL returned error: 403")
+    assert not main._is_network_error("remote: Permission to a/b.git denied to someone.")
+
+
+def test_offline_push_is_queued_and_retried(remote, tmp_path):
+    repo = _offline_clone(remote, tmp_path)
+    queue = main.SyncQueue(path=str(tmp_path / "sync_queue.json"))
+
+    sync = main.RepoSync(repo, sync_queue=queue)
+    success, _ = sync.run()
+    assert not success and sync.queued
+    entry = main.SyncQueue(path=queue.path).get(repo)
+    assert entry["attempts"] == 1
+    assert entry["next_retry_at"] > time.time()
+    unpushed = int(git(repo, "rev-list", "--count", "@{upstream}..HEAD"))
+    assert unpushed >= 1 and main._pending_push_count(repo) == unpushed
+    assert queue.due() == []
+
+    # 仍然断网：退避时间翻倍，条目保留
+    ok, message = main._retry_queued_push(queue, repo)
+    assert not ok and main._is_network_error(message)
+    entry = queue.get(repo)
+    assert entry["attempts"] == 2
+    assert entry["next_retry_at"] - time.time() > main.SyncQueue.BASE_DELAY_SEC
+
+    git(repo, "remote", "set-url", "origin", remote)
+    assert main._retry_queued_push(queue, repo) == (True, "")
+    assert queue.get(repo) is None
+    assert main._pending_push_count(repo) == 0
+    assert git(remote, "rev-parse", "main") == git(repo, "rev-parse", "HEAD")
+
+
+def test_non_network_failure_is_not_requeued(remote, tmp_path):
+    repo = _offline_clone(remote, tmp_path)
+    queue = main.SyncQueue(path=str(tmp_path / "sync_queue.json"))
+    queue.enqueue(repo, "Connection refused")
+
+    git(repo, "remote", "set-url", "origin", str(tmp_path / "missing.git"))
+    ok, message = main._retry_queued_push(queue, repo)
+    assert not ok and not main._is_network_error(message)
+    assert queue.get(repo) is None